@@ -10,7 +10,7 @@ Version: 2.1
 """
 
 from dataclasses import dataclass, field
-from typing import List, Any, Optional, Dict
+from typing import List, Any, Optional, Dict, Pattern, Union
 from datetime import datetime
 from .constants import ExtractionQuality
 
@@ -49,11 +49,11 @@ class FieldPattern:
     """Enhanced pattern definition for field extraction"""
     css_selectors: List[str]
     xpath_selectors: List[str]
-    regex_patterns: List[str]
+    regex_patterns: List[Union[str, Pattern]]
     context_keywords: List[str]
     validation_rules: List[str]
     normalization_functions: List[str]
-    fallback_patterns: List[str]
+    fallback_patterns: List[Union[str, Pattern]]
 
     def get_total_patterns(self) -> int:
         """Get total number of patterns available"""
@@ -175,6 +175,11 @@ class MemberInfo:
         """Check if member info is complete"""
         return bool(self.name and self.relationship)
 
+    @property
+    def dedupe_key(self) -> tuple:
+        """Khoá so trùng (name, relationship) đã casefold, dùng khi loại member trùng"""
+        return (self.name.casefold().strip(), self.relationship.casefold().strip())
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
         result = {
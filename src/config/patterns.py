@@ -9,17 +9,32 @@ Date: 2025-09-13
 Version: 2.1
 """
 
+import re
+from functools import lru_cache
 from typing import Dict
 from .data_models import FieldPattern
 
 
+# Cờ biên dịch cho regex_patterns (trước đây truyền vào mỗi lần gọi re.findall);
+# fallback_patterns vẫn so khớp không cờ như cũ
+REGEX_PATTERN_FLAGS = re.IGNORECASE | re.MULTILINE
+FALLBACK_PATTERN_FLAGS = 0
+
+
+def _compile_field_pattern(pattern: FieldPattern) -> FieldPattern:
+    """Biên dịch sẵn regex/fallback patterns một lần thay vì mỗi lần extract"""
+    pattern.regex_patterns = [re.compile(p, REGEX_PATTERN_FLAGS) for p in pattern.regex_patterns]
+    pattern.fallback_patterns = [re.compile(p, FALLBACK_PATTERN_FLAGS) for p in pattern.fallback_patterns]
+    return pattern
+
+
 class FieldPatternsConfig:
     """Configuration class for field extraction patterns"""
     
     @staticmethod
     def get_optimized_patterns() -> Dict[str, FieldPattern]:
-        """Get optimized patterns với improved success rates"""
-        return {
+        """Get optimized patterns với improved success rates (regex đã được biên dịch sẵn)"""
+        patterns = {
             'so_dien_thoai': FieldPattern(
                 css_selectors=[
                     'td:contains("Điện thoại") + td',
@@ -244,14 +259,16 @@ class FieldPatternsConfig:
                 ]
             )
         }
+        return {name: _compile_field_pattern(pattern) for name, pattern in patterns.items()}
 
 
 class NormalizationMappingsConfig:
     """Configuration class for normalization mappings"""
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_normalization_maps() -> Dict[str, Dict]:
-        """Get normalization mappings"""
+        """Get normalization mappings (dựng một lần, dùng chung - không sửa dict trả về)"""
         return {
             'banks': {
                 'ACB': 'Ngân hàng TMCP Á Châu (ACB)',
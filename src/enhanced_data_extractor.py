@@ -8,19 +8,31 @@ Author: MiniMax Agent
 
 import re
 import json
+import html
 import logging
 from typing import Dict, List, Any, Optional, Tuple
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, NavigableString
 from datetime import datetime
 import requests
 import asyncio
+from functools import lru_cache
 
 class EnhancedDataExtractor:
     """Class mở rộng trích xuất dữ liệu từ VSS"""
     
-    def __init__(self):
+    # Dùng chung cho mọi record: chỉ dựng cây cho phần <body>
+    _BODY_STRAINER = SoupStrainer('body')
+    
+    def __init__(self, parser: str = 'html.parser'):
         self.logger = logging.getLogger(__name__)
         
+        # Backend cho BeautifulSoup ('lxml' nhanh hơn nhiều so với 'html.parser' thuần Python)
+        self.parser = parser
+        
+        # lxml luôn tạo <body> (kể cả với HTML fragment) nên chỉ cần dựng cây cho <body>,
+        # bỏ qua <head>/<title>/<meta>/<style>; html.parser không tự thêm <body> nên parse toàn bộ
+        self._parse_only = self._BODY_STRAINER if parser == 'lxml' else None
+        
         # Enhanced extraction patterns
         self.extraction_patterns = {
             'ma_ho_gia_dinh': {
@@ -116,7 +128,12 @@ class EnhancedDataExtractor:
             Dictionary chứa dữ liệu đã được trích xuất và mở rộng
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Fast path: bảng nhãn/giá trị cố định của VSS, không cần dựng cây DOM
+            fast_result = self._parse_label_table(html_content, cccd, original_data)
+            if fast_result is not None:
+                return fast_result
+            
+            soup = BeautifulSoup(html_content, self.parser, parse_only=self._parse_only)
             
             # Extract basic data (từ logic cũ)
             basic_data = self._extract_basic_fields(soup, cccd)
@@ -152,42 +169,144 @@ class EnhancedDataExtractor:
                 'extraction_timestamp': datetime.now().isoformat()
             }
     
+    # Dòng nhãn/giá trị: <tr><td>Nhãn:</td><td>Giá trị</td></tr>
+    _LABEL_ROW_RE = re.compile(
+        r'<tr>\s*<td>([^<:]+):\s*</td>\s*<td>([^<]*)</td>\s*</tr>', re.IGNORECASE
+    )
+    # Dòng thành viên hộ gia đình: <tr><td>Tên</td><td>Quan hệ</td><td>Năm sinh</td></tr>
+    _MEMBER_ROW_RE = re.compile(
+        r'<tr>\s*<td>([^<]*)</td>\s*<td>([^<]*)</td>\s*<td>([^<]*)</td>\s*</tr>', re.IGNORECASE
+    )
+    # Bảng và đoạn HTML ngay trước bảng (heading/caption) để nhận diện bảng thành viên
+    _TABLE_RE = re.compile(r'<table\b[^>]*>(.*?)</table>', re.IGNORECASE | re.DOTALL)
+    _FIRST_ROW_END_RE = re.compile(r'</tr>', re.IGNORECASE)
+    _MEMBER_TABLE_TERMS = ('thành viên', 'hộ gia đình', 'member', 'family')
+    _TAG_RE = re.compile(r'<[^>]+>')
+    # soup.get_text() không lấy nội dung script/style
+    _SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+    _OPEN_TAG_RE = re.compile(r'<[A-Za-z]')
+    
+    # Số dòng nhãn tối thiểu để dùng fast path, ít hơn thì parse bằng BeautifulSoup
+    _FAST_PATH_MIN_FIELDS = 3
+    
+    # Nhãn (lowercase, bỏ dấu ':') -> trường mở rộng
+    _ENHANCED_FIELD_LABELS = {
+        'mã hộ gia đình': 'ma_ho_gia_dinh', 'mã hộ': 'ma_ho_gia_dinh', 'hộ gia đình': 'ma_ho_gia_dinh',
+        'điện thoại': 'so_dien_thoai', 'số điện thoại': 'so_dien_thoai', 'sđt': 'so_dien_thoai',
+        'thu nhập': 'thu_nhap', 'lương': 'thu_nhap', 'mức lương': 'thu_nhap',
+        'ngân hàng': 'ngan_hang', 'bank': 'ngan_hang',
+    }
+    
+    # Có các từ khóa này thì cần logic DOM (địa chỉ, công việc) -> dùng BeautifulSoup
+    _DOM_ONLY_TERMS = (
+        'thường trú', 'tạm trú', 'hiện tại', 'liên hệ',
+        'chức vụ', 'phòng ban', 'mã đơn vị', 'ngày bắt đầu', 'loại hợp đồng', 'chế độ làm việc'
+    )
+    
+    def _parse_label_table(self, html_content: str, cccd: str,
+                           original_data: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fast path bằng regex cho HTML VSS có cấu trúc bảng cố định.
+        Trả về None nếu HTML không đúng cấu trúc (để fallback về BeautifulSoup).
+        """
+        rows = self._LABEL_ROW_RE.findall(html_content)
+        if len(rows) < self._FAST_PATH_MIN_FIELDS:
+            return None
+        
+        text_lower = self._TAG_RE.sub(' ', html_content).lower()
+        if any(term in text_lower for term in self._DOM_ONLY_TERMS):
+            return None
+        
+        basic_data = {}
+        enhanced_data = {field: None for field in self.extraction_patterns}
+        for label, value in rows:
+            label = self._normalize_text(label)
+            value = self._normalize_text(value)
+            
+            field = self._basic_field_for_label(label)
+            if field:
+                basic_data[field] = value
+            
+            enhanced_field = self._ENHANCED_FIELD_LABELS.get(label.lower())
+            if enhanced_field and value and not enhanced_data[enhanced_field]:
+                enhanced_data[enhanced_field] = value
+        
+        # Trường không có dòng nhãn: cùng regex fallback với _extract_field_by_patterns
+        page_text = None
+        for field, value in enhanced_data.items():
+            if not value:
+                if page_text is None:
+                    page_text = html.unescape(self._TAG_RE.sub('', self._SCRIPT_STYLE_RE.sub('', html_content)))
+                enhanced_data[field] = self._search_field_patterns(page_text, self.extraction_patterns[field])
+        
+        if 'thành viên' in text_lower or 'hộ gia đình' in text_lower:
+            members = []
+            for cells in self._member_table_rows(html_content):
+                member_info = {}
+                for key, cell in zip(('ten', 'quan_he', 'nam_sinh'), cells):
+                    cell_text = cell.strip()
+                    if cell_text:
+                        member_info[key] = cell_text
+                if member_info:
+                    members.append(member_info)
+            if members:
+                enhanced_data['thong_tin_thanh_vien_hgd'] = members
+        
+        json_data = self._extract_json_data(html_content)
+        merged_data = self._merge_extracted_data(basic_data, enhanced_data, json_data, original_data)
+        validated_data = self._validate_and_normalize(merged_data, cccd)
+        
+        validated_data.update({
+            'extraction_timestamp': datetime.now().isoformat(),
+            'extraction_method': 'enhanced_parser_v1.0_regex_table',
+            'html_length': len(html_content),
+            'soup_elements_count': len(self._OPEN_TAG_RE.findall(html_content)),
+            'extraction_success': True
+        })
+        
+        return validated_data
+    
+    def _member_table_rows(self, html_content: str) -> List[Tuple[str, str, str]]:
+        """
+        Các dòng 3 ô của bảng thành viên hộ gia đình: chỉ những bảng có heading ngay trước
+        bảng hoặc dòng đầu (header) nhắc tới thành viên; dòng header được bỏ qua
+        """
+        rows = []
+        previous_end = 0
+        for table in self._TABLE_RE.finditer(html_content):
+            body = table.group(1)
+            header_end = self._FIRST_ROW_END_RE.search(body)
+            header_end = header_end.end() if header_end else 0
+            context = html_content[previous_end:table.start()] + body[:header_end]
+            previous_end = table.end()
+            
+            context = self._TAG_RE.sub(' ', context).lower()
+            if any(term in context for term in self._MEMBER_TABLE_TERMS):
+                rows.extend(self._MEMBER_ROW_RE.findall(body, header_end))
+        return rows
+    
     def _extract_basic_fields(self, soup: BeautifulSoup, cccd: str) -> Dict[str, Any]:
         """Trích xuất các trường cơ bản (từ logic hiện có)"""
         basic_data = {}
         
         try:
-            # Tìm bảng dữ liệu chính
-            main_tables = soup.find_all('table')
+            # Tìm bảng dữ liệu chính (bảng thành viên hộ gia đình không chứa trường cơ bản)
+            main_tables = [table for table in soup.find_all('table') if not self._is_member_table(table)]
             
             for table in main_tables:
                 rows = table.find_all('tr')
                 
                 for row in rows:
                     cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 2:
+                    # Dòng header (chỉ có <th>) không phải cặp nhãn/giá trị
+                    if len(cells) >= 2 and row.find('td') is not None:
                         key = self._normalize_text(cells[0].get_text())
                         value = self._normalize_text(cells[1].get_text())
                         
                         # Map các trường cơ bản
-                        if any(term in key.lower() for term in ['họ', 'tên', 'name']):
-                            basic_data['ho_ten'] = value
-                        elif any(term in key.lower() for term in ['sinh', 'birth']):
-                            basic_data['ngay_sinh'] = value
-                        elif any(term in key.lower() for term in ['giới', 'gender', 'sex']):
-                            basic_data['gioi_tinh'] = value
-                        elif any(term in key.lower() for term in ['bhxh', 'social']):
-                            basic_data['so_bhxh'] = value
-                        elif any(term in key.lower() for term in ['trạng', 'status']):
-                            basic_data['trang_thai'] = value
-                        elif any(term in key.lower() for term in ['đơn vị', 'unit', 'company']):
-                            basic_data['don_vi_lam_viec'] = value
-                        elif any(term in key.lower() for term in ['lương', 'salary']):
-                            basic_data['muc_luong'] = value
-                        elif any(term in key.lower() for term in ['nơi cấp', 'issued']):
-                            basic_data['noi_cap'] = value
-                        elif any(term in key.lower() for term in ['ngày cấp', 'issue date']):
-                            basic_data['ngay_cap'] = value
+                        field = self._basic_field_for_label(key)
+                        if field:
+                            basic_data[field] = value
             
             return basic_data
             
@@ -195,6 +314,27 @@ class EnhancedDataExtractor:
             self.logger.error(f"Lỗi extract basic fields: {e}")
             return {}
     
+    # (tên trường, từ khóa trong nhãn) - thứ tự ưu tiên giống chuỗi if/elif cũ
+    _BASIC_FIELD_TERMS = (
+        ('ho_ten', ('họ', 'tên', 'name')),
+        ('ngay_sinh', ('sinh', 'birth')),
+        ('gioi_tinh', ('giới', 'gender', 'sex')),
+        ('so_bhxh', ('bhxh', 'social')),
+        ('trang_thai', ('trạng', 'status')),
+        ('don_vi_lam_viec', ('đơn vị', 'unit', 'company')),
+        ('muc_luong', ('lương', 'salary')),
+        ('noi_cap', ('nơi cấp', 'issued')),
+        ('ngay_cap', ('ngày cấp', 'issue date')),
+    )
+    
+    def _basic_field_for_label(self, label: str) -> Optional[str]:
+        """Tên trường cơ bản ứng với nhãn trong bảng VSS (None nếu không khớp)"""
+        label = label.lower()
+        for field, terms in self._BASIC_FIELD_TERMS:
+            if any(term in label for term in terms):
+                return field
+        return None
+    
     def _extract_enhanced_fields(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Trích xuất các trường mở rộng mới"""
         enhanced_data = {}
@@ -223,29 +363,31 @@ class EnhancedDataExtractor:
                         return value
             
             # Strategy 2: Regex Patterns
-            full_text = soup.get_text()
-            for regex_pattern in patterns.get('regex_patterns', []):
-                matches = re.findall(regex_pattern, full_text, re.IGNORECASE)
-                if matches:
-                    return matches[0] if isinstance(matches[0], str) else matches[0][0]
-            
-            return None
+            return self._search_field_patterns(soup.get_text(), patterns)
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract field {field_name}: {e}")
+            self.logger.debug("Lỗi extract field %s: %s", field_name, e)
             return None
     
+    def _search_field_patterns(self, full_text: str, patterns: Dict[str, List]) -> Optional[str]:
+        """Giá trị đầu tiên khớp regex_patterns của trường trong text của trang"""
+        for regex_pattern in patterns.get('regex_patterns', []):
+            matches = re.findall(regex_pattern, full_text, re.IGNORECASE)
+            if matches:
+                return matches[0] if isinstance(matches[0], str) else matches[0][0]
+        return None
+    
     def _extract_value_from_element(self, element, field_name: str) -> Optional[str]:
         """Trích xuất giá trị từ element"""
         try:
             # Kiểm tra trong element hiện tại
             text = element.get_text().strip()
             
-            # Tìm value pattern
+            # Tìm value pattern ("Nhãn: giá trị"); ô chỉ có nhãn thì xét sibling
             if ':' in text:
-                parts = text.split(':', 1)
-                if len(parts) == 2:
-                    return parts[1].strip()
+                value = text.split(':', 1)[1].strip()
+                if value:
+                    return value
             
             # Kiểm tra element kế tiếp (sibling)
             next_element = element.find_next_sibling()
@@ -269,7 +411,7 @@ class EnhancedDataExtractor:
             return None
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract value from element: {e}")
+            self.logger.debug("Lỗi extract value from element: %s", e)
             return None
     
     def _extract_special_fields(self, soup: BeautifulSoup) -> Dict[str, Any]:
@@ -303,44 +445,53 @@ class EnhancedDataExtractor:
         try:
             members = []
             
-            # Tìm các bảng có thể chứa thông tin thành viên
-            tables = soup.find_all('table')
+            # Bảng thành viên: nhận diện giống fast path (_member_table_rows)
+            tables = [table for table in soup.find_all('table') if self._is_member_table(table)]
             
             for table in tables:
-                # Tìm header chứa "thành viên", "hộ gia đình"
-                headers = table.find_all(['th', 'td'])
+                # Tìm các dòng dữ liệu trong bảng này
+                rows = table.find_all('tr')[1:]  # Bỏ header row
                 
-                for header in headers:
-                    header_text = header.get_text().lower()
-                    if any(term in header_text for term in ['thành viên', 'hộ gia đình', 'member', 'family']):
-                        # Tìm các dòng dữ liệu trong bảng này
-                        rows = table.find_all('tr')[1:]  # Bỏ header row
+                for row in rows:
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) >= 2:
+                        member_info = {}
                         
-                        for row in rows:
-                            cells = row.find_all(['td', 'th'])
-                            if len(cells) >= 2:
-                                member_info = {}
-                                
-                                # Parse thông tin thành viên
-                                for i, cell in enumerate(cells):
-                                    cell_text = cell.get_text().strip()
-                                    if cell_text:
-                                        if i == 0:
-                                            member_info['ten'] = cell_text
-                                        elif i == 1:
-                                            member_info['quan_he'] = cell_text
-                                        elif i == 2:
-                                            member_info['nam_sinh'] = cell_text
-                                
-                                if member_info:
-                                    members.append(member_info)
+                        # Parse thông tin thành viên
+                        for i, cell in enumerate(cells):
+                            cell_text = cell.get_text().strip()
+                            if cell_text:
+                                if i == 0:
+                                    member_info['ten'] = cell_text
+                                elif i == 1:
+                                    member_info['quan_he'] = cell_text
+                                elif i == 2:
+                                    member_info['nam_sinh'] = cell_text
+                        
+                        if member_info:
+                            members.append(member_info)
             
             return members if members else None
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract household members: {e}")
+            self.logger.debug("Lỗi extract household members: %s", e)
             return None
     
+    def _is_member_table(self, table) -> bool:
+        """
+        Bảng thành viên hộ gia đình: dòng đầu (header) hoặc text từ sau bảng trước đó
+        tới bảng này (heading/caption) nhắc tới thành viên, như _member_table_rows
+        """
+        first_row = table.find('tr')
+        context = [first_row.get_text(' ')] if first_row is not None else []
+        for element in table.previous_elements:
+            if isinstance(element, NavigableString):
+                if element.find_parent('table') is not None:
+                    break
+                context.append(str(element))
+        context = ' '.join(context).lower()
+        return any(term in context for term in self._MEMBER_TABLE_TERMS)
+    
     def _extract_addresses(self, soup: BeautifulSoup) -> Optional[Dict]:
         """Trích xuất các địa chỉ chi tiết"""
         try:
@@ -365,7 +516,7 @@ class EnhancedDataExtractor:
             return addresses if addresses else None
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract addresses: {e}")
+            self.logger.debug("Lỗi extract addresses: %s", e)
             return None
     
     def _extract_employment_info(self, soup: BeautifulSoup) -> Optional[Dict]:
@@ -396,7 +547,7 @@ class EnhancedDataExtractor:
             return employment if employment else None
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract employment info: {e}")
+            self.logger.debug("Lỗi extract employment info: %s", e)
             return None
     
     def _extract_json_data(self, html_content: str) -> Dict[str, Any]:
@@ -424,7 +575,7 @@ class EnhancedDataExtractor:
             return {}
             
         except Exception as e:
-            self.logger.debug(f"Lỗi extract JSON data: {e}")
+            self.logger.debug("Lỗi extract JSON data: %s", e)
             return {}
     
     def _merge_extracted_data(self, basic_data: Dict, enhanced_data: Dict, 
@@ -606,7 +757,7 @@ class EnhancedBHXHApiIntegrator:
                 'note': 'Đây là placeholder - cần implement API call thực tế'
             }
             
-            self.logger.info(f"Placeholder: Lấy thông tin hộ gia đình cho BHXH {ma_so_bhxh}")
+            self.logger.info("Placeholder: Lấy thông tin hộ gia đình cho BHXH %s", ma_so_bhxh)
             return household_data
             
         except Exception as e:
@@ -642,12 +793,18 @@ class EnhancedBHXHApiIntegrator:
             self.logger.error(f"Lỗi get full household info: {e}")
             return None
 
+@lru_cache(maxsize=None)
+def _get_extractor(parser: str) -> EnhancedDataExtractor:
+    """1 extractor cho mỗi parser trong mỗi process (tránh khởi tạo lại pattern mỗi lần gọi)"""
+    return EnhancedDataExtractor(parser=parser)
+
 # Convenience function để sử dụng dễ dàng
+# (ở mức module nên có thể chạy trong ProcessPoolExecutor, chỉ pickle str/dict)
 def extract_enhanced_vss_data(html_content: str, cccd: str = "", 
-                             original_data: Dict[str, Any] = None) -> Dict[str, Any]:
+                             original_data: Dict[str, Any] = None,
+                             parser: str = 'html.parser') -> Dict[str, Any]:
     """Function wrapper để extract dữ liệu mở rộng"""
-    extractor = EnhancedDataExtractor()
-    return extractor.parse_enhanced_bhxh_data(html_content, cccd, original_data)
+    return _get_extractor(parser).parse_enhanced_bhxh_data(html_content, cccd, original_data)
 
 async def integrate_household_data(ma_so_bhxh: str, search_data: Dict[str, Any] = None) -> Dict[str, Any]:
     """Function wrapper để tích hợp dữ liệu hộ gia đình"""
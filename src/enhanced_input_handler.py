@@ -12,11 +12,75 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import os
+import re
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Chuỗi lưu trong buffer UTF-8 liên tục của Arrow thay vì từng object str Python
+STRING_DTYPE = 'string[pyarrow]' if PYARROW_AVAILABLE else object
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True)
+    def _all_ascii_digits(digits: np.ndarray) -> np.ndarray:
+        """Kiểm tra từng dòng của mảng byte (N, 12) chỉ chứa '0'..'9'"""
+        out = np.empty(digits.shape[0], np.bool_)
+        for i in prange(digits.shape[0]):
+            ok = True
+            for j in range(digits.shape[1]):
+                ok &= 48 <= digits[i, j] <= 57
+            out[i] = ok
+        return out
+else:
+    def _all_ascii_digits(digits: np.ndarray) -> np.ndarray:
+        """Kiểm tra từng dòng của mảng byte (N, 12) chỉ chứa '0'..'9'"""
+        return ((digits >= 48) & (digits <= 57)).all(axis=1)
 
 class EnhancedInputHandler:
     """Class xử lý đầu vào mở rộng cho hệ thống VSS"""
     
+    # Pattern biên dịch sẵn một lần cho toàn class
+    _CCCD_RE = re.compile(r'^\d{12}$')
+    _BHXH_RE = re.compile(r'^\d{10}$')
+    _DIGITS_RE = re.compile(r'^\d+$')
+    
+    # Bảng xóa ký tự phân cách - str.translate xử lý trong một vòng lặp C
+    _STRIP_TABLE = str.maketrans('', '', ' -.')
+    _PHONE_STRIP_TABLE = str.maketrans('', '', ' -')
+    
+    # Các cột có ít giá trị lặp lại - lưu dạng categorical để tiết kiệm bộ nhớ
+    _CATEGORICAL_COLUMNS = ('input_format', 'validation_status')
+    
+    # Các cột văn bản của file đầu vào và của kết quả xử lý
+    _INPUT_TEXT_COLUMNS = ('HỌ VÀ TÊN', 'TỈNH, THÀNH PHỐ', 'SỐ CCCD', 'ĐỊA CHỈ')
+    _TEXT_COLUMNS = ('ho_ten', 'cccd', 'tinh_thanh_pho', 'so_bhxh_input', 'so_dien_thoai_input', 'dia_chi_input')
+    
+    # Giá trị mặc định cho các cột thiếu trong file đầu vào (tên cột đã chuẩn hóa)
+    _NEW_FORMAT_DEFAULTS = {
+        'HỌ VÀ TÊN': '', 'SỐ CCCD': '', 'TỈNH, THÀNH PHỐ': '', 'SỐ BẢO HIỂM XÃ HỘI': '', 'NĂM SINH': 0
+    }
+    _LEGACY_FORMAT_DEFAULTS = {
+        'HỌ VÀ TÊN': '', 'SỐ CCCD': '', 'SỐ ĐIỆN THOẠI': '', 'ĐỊA CHỈ': ''
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
@@ -37,209 +101,290 @@ class EnhancedInputHandler:
             'ĐỊA CHỈ': 'Địa chỉ (input)'
         }
         
+        # Tập cột (đã chuẩn hóa tên) dùng cho nhận diện định dạng (tra cứu O(1))
+        self._new_required_set = frozenset(map(self._normalize_column_name, self.new_required_columns))
+        self._legacy_keys_set = frozenset(map(self._normalize_column_name, self.legacy_column_mapping))
+        
         # Validation rules
         self.validation_rules = {
-            'Số CCCD': {'type': 'str', 'length': 12, 'pattern': r'^\d{12}$'},
-            'Số bảo hiểm xã hội': {'type': 'str', 'length': 10, 'pattern': r'^\d{10}$'},
+            'Số CCCD': {'type': 'str', 'length': 12, 'pattern': self._CCCD_RE.pattern},
+            'Số bảo hiểm xã hội': {'type': 'str', 'length': 10, 'pattern': self._BHXH_RE.pattern},
             'Năm sinh': {'type': 'int', 'min': 1950, 'max': 2010}
         }
         
-        self.processed_records = []
+        self._processed_df = pd.DataFrame()
         self.validation_errors = []
+    
+    @property
+    def processed_records(self) -> List[Dict[str, Any]]:
+        """Danh sách record đã xử lý (chỉ tạo list-of-dicts khi được gọi)"""
+        return self._processed_df.to_dict(orient='records')
+    
+    @processed_records.setter
+    def processed_records(self, records: List[Dict[str, Any]]):
+        self._store_frame(pd.DataFrame(records))
+    
+    def as_frame(self) -> pd.DataFrame:
+        """Trả về DataFrame kết quả xử lý (dạng cột) cho các consumer cần vectorized"""
+        return self._processed_df
+    
+    def _store_frame(self, df: pd.DataFrame):
+        """Lưu kết quả xử lý dạng cột, chuyển các cột lặp lại sang categorical"""
+        for col in self._CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        df = self._cast_text_columns(df, self._TEXT_COLUMNS)
+        self._processed_df = df
+    
+    def _cast_text_columns(self, df: pd.DataFrame, columns: Tuple[str, ...]) -> pd.DataFrame:
+        """Chuyển các cột văn bản sang string dtype (Arrow nếu có pyarrow)"""
+        for col in columns:
+            if col in df.columns:
+                df[col] = df[col].astype(STRING_DTYPE)
+        return df
         
     def detect_input_format(self, file_path: str) -> str:
         """Tự động phát hiện định dạng file đầu vào"""
         try:
-            df = pd.read_excel(file_path)
-            columns = list(df.columns)
-            
-            # Kiểm tra định dạng mới
-            new_format_match = sum(1 for col in self.new_required_columns if col in columns)
-            
-            # Kiểm tra định dạng cũ
-            legacy_format_match = sum(1 for col in self.legacy_column_mapping.keys() if col in columns)
-            
-            if new_format_match >= 4:  # Ít nhất 4/5 cột khớp
-                return 'new_format'
-            elif legacy_format_match >= 3:  # Ít nhất 3/4 cột khớp
-                return 'legacy_format'
-            else:
-                return 'unknown_format'
+            # Chỉ cần header để nhận diện định dạng
+            columns = pd.read_excel(file_path, nrows=0).columns
+            return self._detect_format_from_columns(map(self._normalize_column_name, columns))
                 
         except Exception as e:
             self.logger.error(f"Lỗi phát hiện format: {e}")
             return 'error'
     
+    @staticmethod
+    def _normalize_column_name(column: Any) -> str:
+        """Chuẩn hóa tên cột: bỏ khoảng trắng thừa, viết hoa ('HỌ VÀ TÊN ' -> 'HỌ VÀ TÊN')"""
+        return str(column).strip().upper()
+    
+    def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Chuẩn hóa tên cột một lần khi đọc file; cột trùng tên giữ cột đầu tiên"""
+        df.columns = [self._normalize_column_name(col) for col in df.columns]
+        return df.loc[:, ~df.columns.duplicated()]
+    
+    def _detect_format_from_columns(self, columns) -> str:
+        """Phát hiện định dạng từ danh sách cột đã đọc (tên cột đã chuẩn hóa)"""
+        columns = set(columns)
+        
+        # Kiểm tra định dạng mới
+        new_format_match = len(self._new_required_set & columns)
+        
+        # Kiểm tra định dạng cũ
+        legacy_format_match = len(self._legacy_keys_set & columns)
+        
+        if new_format_match >= 4:  # Ít nhất 4/5 cột khớp
+            return 'new_format'
+        elif legacy_format_match >= 3:  # Ít nhất 3/4 cột khớp
+            return 'legacy_format'
+        else:
+            return 'unknown_format'
+    
     def read_enhanced_input(self, file_path: str) -> List[Dict[str, Any]]:
         """
         Đọc file Excel với cấu trúc mới (5 cột)
         Returns: List of dictionaries với thông tin đầy đủ
         """
         try:
-            # Phát hiện format
-            input_format = self.detect_input_format(file_path)
+            df = self._normalize_columns(pd.read_excel(file_path))
+            
+            # Phát hiện format từ file đã đọc, không parse lại file
+            input_format = self._detect_format_from_columns(df.columns)
             self.logger.info(f"Phát hiện định dạng: {input_format}")
             
-            df = pd.read_excel(file_path)
+            df = self._cast_text_columns(df, self._INPUT_TEXT_COLUMNS)
             
             if input_format == 'new_format':
-                return self._process_new_format(df)
+                records = self._process_new_format(df)
             elif input_format == 'legacy_format':
-                return self._process_legacy_format(df)
+                records = self._process_legacy_format(df)
             else:
                 raise ValueError(f"Định dạng file không được hỗ trợ: {list(df.columns)}")
+            
+            self._store_frame(records)
+            return self.processed_records
                 
         except Exception as e:
             self.logger.error(f"Lỗi đọc file đầu vào: {e}")
             raise
     
-    def _process_new_format(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Xử lý định dạng mới với 5 cột"""
-        records = []
-        
-        for index, row in df.iterrows():
-            try:
-                # Tạo record chuẩn hóa
-                record = {
-                    'ho_ten': self._clean_text(row.get('Họ và tên', '')),
-                    'cccd': self._clean_cccd(row.get('Số CCCD', '')),
-                    'tinh_thanh_pho': self._clean_text(row.get('Tỉnh, thành phố', '')),
-                    'so_bhxh_input': self._clean_bhxh(row.get('Số bảo hiểm xã hội', '')),
-                    'nam_sinh_input': self._clean_year(row.get('Năm sinh', 0)),
-                    
-                    # Metadata
-                    'input_row_index': index + 1,
-                    'input_format': 'new_format',
-                    'processing_timestamp': datetime.now().isoformat(),
-                    'validation_status': 'pending'
-                }
-                
-                # Validation
-                validation_result = self._validate_record(record)
-                record['validation_status'] = 'valid' if validation_result['is_valid'] else 'invalid'
-                record['validation_errors'] = validation_result['errors']
-                
-                records.append(record)
-                
-            except Exception as e:
-                self.logger.error(f"Lỗi xử lý dòng {index + 1}: {e}")
-                self.validation_errors.append({
-                    'row': index + 1,
-                    'error': str(e),
-                    'data': row.to_dict()
-                })
-        
+    def _process_new_format(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Xử lý định dạng mới với 5 cột (xử lý theo cột, không lặp từng dòng)"""
+        records = self._process_rows(df, self._build_new_format, "Lỗi xử lý dòng")
         self.logger.info(f"Đã xử lý {len(records)} bản ghi định dạng mới")
         return records
     
-    def _process_legacy_format(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _build_new_format(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Dựng records định dạng mới theo cột (index giữ theo dòng của file)"""
+        df = self._with_columns(df, self._NEW_FORMAT_DEFAULTS)
+        cccd, _ = self._clean_cccd_column(df['SỐ CCCD'])
+        so_bhxh, bhxh_is_digits = self._clean_bhxh_column(df['SỐ BẢO HIỂM XÃ HỘI'])
+        records = pd.DataFrame({
+            'ho_ten': self._clean_text_column(df['HỌ VÀ TÊN']),
+            'cccd': cccd,
+            'tinh_thanh_pho': self._clean_text_column(df['TỈNH, THÀNH PHỐ']),
+            'so_bhxh_input': so_bhxh,
+            'nam_sinh_input': self._clean_year_column(df['NĂM SINH']),
+        }, index=df.index)
+        
+        # Metadata
+        records['input_row_index'] = df.index + 1
+        records['input_format'] = 'new_format'
+        records['processing_timestamp'] = datetime.now().isoformat()  # Dùng chung cho cả batch
+        
+        # Validation - dùng lại mask chữ số đã tính khi làm sạch, không quét lại chuỗi
+        return self._validate_frame(records, bhxh_is_digits)
+    
+    def _process_legacy_format(self, df: pd.DataFrame) -> pd.DataFrame:
         """Xử lý định dạng cũ với backward compatibility"""
-        records = []
+        records = self._process_rows(df, self._build_legacy_format, "Lỗi xử lý dòng legacy")
+        self.logger.info(f"Đã xử lý {len(records)} bản ghi định dạng legacy")
+        return records
+    
+    def _build_legacy_format(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Dựng records định dạng cũ theo cột (index giữ theo dòng của file)"""
+        df = self._with_columns(df, self._LEGACY_FORMAT_DEFAULTS)
+        dia_chi = self._clean_text_column(df['ĐỊA CHỈ'])
+        cccd, _ = self._clean_cccd_column(df['SỐ CCCD'])
+        
+        # Mapping từ cấu trúc cũ sang mới
+        records = pd.DataFrame({
+            'ho_ten': self._clean_text_column(df['HỌ VÀ TÊN']),
+            'cccd': cccd,
+            'tinh_thanh_pho': dia_chi.map(self._extract_province_from_address),
+            'so_dien_thoai_input': self._clean_phone_column(df['SỐ ĐIỆN THOẠI']),
+            'dia_chi_input': dia_chi,
+        }, index=df.index)
+        
+        # Trường chưa có trong format cũ - sẽ được trích xuất từ VSS
+        records['so_bhxh_input'] = ''
+        records['nam_sinh_input'] = 0
         
-        for index, row in df.iterrows():
+        # Metadata
+        records['input_row_index'] = df.index + 1
+        records['input_format'] = 'legacy_format'
+        records['processing_timestamp'] = datetime.now().isoformat()  # Dùng chung cho cả batch
+        records['validation_status'] = 'partial'  # Thiếu một số trường
+        return records
+    
+    def _process_rows(self, df: pd.DataFrame, build, error_prefix: str) -> pd.DataFrame:
+        """
+        Chạy build trên cả file; nếu có ô làm build lỗi thì thử từng dòng để tìm dòng lỗi,
+        ghi các dòng đó vào validation_errors (bỏ khỏi kết quả) rồi dựng lại phần còn lại
+        """
+        try:
+            return build(df).reset_index(drop=True)
+        except Exception as e:
+            self.logger.warning(f"Xử lý theo cột thất bại ({e}), tìm dòng lỗi")
+        
+        failed_rows = []
+        for index in df.index:
+            row = df.loc[[index]]
             try:
-                # Mapping từ cấu trúc cũ sang mới
-                record = {
-                    'ho_ten': self._clean_text(row.get('HỌ VÀ TÊN ', '') or row.get('HỌ VÀ TÊN', '')),
-                    'cccd': self._clean_cccd(row.get('Số CCCD', '')),
-                    'tinh_thanh_pho': self._extract_province_from_address(row.get('ĐỊA CHỈ', '')),
-                    'so_dien_thoai_input': self._clean_phone(row.get('Số ĐIện Thoại', '')),
-                    'dia_chi_input': self._clean_text(row.get('ĐỊA CHỈ', '')),
-                    
-                    # Trường chưa có trong format cũ
-                    'so_bhxh_input': '',  # Sẽ được trích xuất từ VSS
-                    'nam_sinh_input': 0,  # Sẽ được trích xuất từ VSS
-                    
-                    # Metadata
-                    'input_row_index': index + 1,
-                    'input_format': 'legacy_format',
-                    'processing_timestamp': datetime.now().isoformat(),
-                    'validation_status': 'partial'  # Thiếu một số trường
-                }
-                
-                records.append(record)
-                
+                build(row)
             except Exception as e:
-                self.logger.error(f"Lỗi xử lý dòng legacy {index + 1}: {e}")
+                self.logger.error(f"{error_prefix} {index + 1}: {e}")
                 self.validation_errors.append({
                     'row': index + 1,
                     'error': str(e),
-                    'data': row.to_dict()
+                    'data': row.astype(object).where(row.notna(), None).iloc[0].to_dict()
                 })
-        
-        self.logger.info(f"Đã xử lý {len(records)} bản ghi định dạng legacy")
-        return records
+                failed_rows.append(index)
+        return build(df.drop(index=failed_rows)).reset_index(drop=True)
+    
+    def _with_columns(self, df: pd.DataFrame, defaults: Dict[str, Any]) -> pd.DataFrame:
+        """Bổ sung một lần các cột thiếu với giá trị mặc định"""
+        missing = {col: default for col, default in defaults.items() if col not in df.columns}
+        return df.assign(**missing) if missing else df
     
-    def _validate_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate một record theo rules"""
-        errors = []
-        is_valid = True
+    def _validate_frame(self, records: pd.DataFrame, bhxh_is_digits: pd.Series) -> pd.DataFrame:
+        """Validate toàn bộ records theo rules (mỗi rule là một mask trên cột)"""
+        nam_sinh = records['nam_sinh_input']
         
-        # Validate CCCD
-        cccd = record.get('cccd', '')
-        if not cccd or len(cccd) != 12 or not cccd.isdigit():
-            errors.append("CCCD phải có đúng 12 số")
-            is_valid = False
+        rule_checks = [
+            # Validate CCCD
+            (~self._cccd_valid_mask(records['cccd']), "CCCD phải có đúng 12 số"),
+            # Validate họ tên
+            (records['ho_ten'].str.len() < 2, "Họ tên không hợp lệ"),
+            # Validate năm sinh
+            ((nam_sinh != 0) & ((nam_sinh < 1950) | (nam_sinh > 2010)), "Năm sinh phải từ 1950-2010"),
+            # Validate số BHXH (nếu có) - cho phép linh hoạt hơn
+            ((records['so_bhxh_input'].str.len() >= 8) & ~bhxh_is_digits, "Số BHXH phải là số"),
+        ]
         
-        # Validate họ tên
-        ho_ten = record.get('ho_ten', '').strip()
-        if not ho_ten or len(ho_ten) < 2:
-            errors.append("Họ tên không hợp lệ")
-            is_valid = False
+        masks = [np.asarray(mask, dtype=bool) for mask, _ in rule_checks]
+        messages = [message for _, message in rule_checks]
+        errors = [
+            [message for message, failed in zip(messages, row_flags) if failed]
+            for row_flags in zip(*masks)
+        ] if len(records) else []
         
-        # Validate năm sinh
-        nam_sinh = record.get('nam_sinh_input', 0)
-        if nam_sinh and (nam_sinh < 1950 or nam_sinh > 2010):
-            errors.append("Năm sinh phải từ 1950-2010")
-            is_valid = False
+        records['validation_status'] = ['invalid' if row_errors else 'valid' for row_errors in errors]
+        records['validation_errors'] = pd.Series(errors, index=records.index, dtype=object)
+        return records
+    
+    def _cccd_valid_mask(self, cccd: pd.Series) -> np.ndarray:
+        """Mask CCCD hợp lệ (đúng 12 chữ số) tính trên mảng byte thay vì từng str"""
+        values = cccd.astype(object).to_numpy()
+        mask = cccd.str.len().to_numpy(dtype=np.int64, na_value=0) == 12
+        if mask.any():
+            # Ký tự ngoài ASCII được thay bằng '?' (1 byte) nên mỗi dòng vẫn đúng 12 byte
+            raw = ''.join(values[mask]).encode('ascii', errors='replace')
+            digits = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 12)
+            mask[mask] = _all_ascii_digits(digits)
+        return mask
+    
+    def _clean_text_column(self, text: pd.Series) -> pd.Series:
+        """Chuẩn hóa cột text"""
+        return text.astype(str).str.strip().where(text.notna(), '')
+    
+    def _clean_id_column(self, values: pd.Series, clean_re: re.Pattern, width: int) -> Tuple[pd.Series, pd.Series]:
+        """
+        Chuẩn hóa cột mã số: bỏ ký tự phân cách, đệm số 0 cho mã toàn chữ số
+        Returns: (cột đã chuẩn hóa, mask toàn chữ số) - mask được dùng lại khi validate
+        """
+        text = values.astype(str)
+        present = values.notna()
         
-        # Validate số BHXH (nếu có) - cho phép linh hoạt hơn
-        so_bhxh = record.get('so_bhxh_input', '')
-        if so_bhxh and len(so_bhxh) >= 8 and not so_bhxh.isdigit():
-            errors.append("Số BHXH phải là số")
-            is_valid = False
+        # Fast path: phần lớn ô đã đúng định dạng (đủ width chữ số) - giữ nguyên
+        is_digits = text.str.fullmatch(clean_re.pattern).fillna(False).astype(bool) & present
+        cleaned = text.where(present, '')
         
-        return {
-            'is_valid': is_valid,
-            'errors': errors,
-            'score': 1.0 if is_valid else max(0.0, 1.0 - len(errors) * 0.2)
-        }
+        # Chỉ các ô còn lại mới cần bỏ ký tự phân cách và đệm số 0
+        dirty = present & ~is_digits
+        if dirty.any():
+            stripped = text[dirty].str.translate(self._STRIP_TABLE)
+            dirty_digits = stripped.str.fullmatch(self._DIGITS_RE.pattern).fillna(False).astype(bool)
+            cleaned[dirty] = stripped.where(~dirty_digits, stripped.str.zfill(width))
+            is_digits[dirty] = dirty_digits
+        return cleaned, is_digits
     
-    def _clean_text(self, text: Any) -> str:
-        """Chuẩn hóa text"""
-        if pd.isna(text):
-            return ''
-        return str(text).strip()
+    def _clean_cccd_column(self, cccd: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Chuẩn hóa cột số CCCD"""
+        return self._clean_id_column(cccd, self._CCCD_RE, 12)
     
-    def _clean_cccd(self, cccd: Any) -> str:
-        """Chuẩn hóa số CCCD"""
-        if pd.isna(cccd):
-            return ''
-        cccd_str = str(cccd).replace(' ', '').replace('-', '').replace('.', '')
-        return cccd_str.zfill(12) if cccd_str.isdigit() else cccd_str
+    def _clean_bhxh_column(self, bhxh: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Chuẩn hóa cột số BHXH"""
+        if pd.api.types.is_float_dtype(bhxh):
+            # Excel đọc cột số có ô trống thành float64 (vd 123456789.0):
+            # chuyển cả cột một lần sang Int64 thay vì int() từng ô
+            bhxh = np.trunc(bhxh.where(np.isfinite(bhxh))).astype('Int64')
+        elif bhxh.dtype == object:
+            # Cột hỗn hợp chữ/số - chỉ các ô float cần bỏ phần thập phân
+            bhxh = bhxh.map(lambda v: int(v) if isinstance(v, float) else v, na_action='ignore')
+        return self._clean_id_column(bhxh, self._BHXH_RE, 10)
     
-    def _clean_bhxh(self, bhxh: Any) -> str:
-        """Chuẩn hóa số BHXH"""
-        if pd.isna(bhxh):
-            return ''
-        bhxh_str = str(int(bhxh)).replace(' ', '').replace('-', '').replace('.', '') if isinstance(bhxh, float) else str(bhxh).replace(' ', '').replace('-', '').replace('.', '')
-        return bhxh_str.zfill(10) if bhxh_str.isdigit() else bhxh_str
+    def _clean_phone_column(self, phone: pd.Series) -> pd.Series:
+        """Chuẩn hóa cột số điện thoại"""
+        cleaned = phone.astype(str).str.translate(self._PHONE_STRIP_TABLE).str.replace('+84', '0', regex=False)
+        is_digits = cleaned.str.fullmatch(self._DIGITS_RE.pattern).fillna(False).astype(bool)
+        return cleaned.where(is_digits & phone.notna(), '')
     
-    def _clean_phone(self, phone: Any) -> str:
-        """Chuẩn hóa số điện thoại"""
-        if pd.isna(phone):
-            return ''
-        phone_str = str(phone).replace(' ', '').replace('-', '').replace('+84', '0')
-        return phone_str if phone_str.isdigit() else ''
-    
-    def _clean_year(self, year: Any) -> int:
-        """Chuẩn hóa năm sinh"""
-        if pd.isna(year):
-            return 0
-        try:
-            return int(year)
-        except (ValueError, TypeError):
-            return 0
+    def _clean_year_column(self, year: pd.Series) -> pd.Series:
+        """Chuẩn hóa cột năm sinh (giá trị không hợp lệ -> 0)"""
+        numeric = pd.to_numeric(year, errors='coerce').astype(float)
+        return np.trunc(numeric.where(np.isfinite(numeric), 0)).astype(np.int64)
     
     def _extract_province_from_address(self, address: str) -> str:
         """Trích xuất tỉnh/thành phố từ địa chỉ"""
@@ -269,8 +414,12 @@ class EnhancedInputHandler:
     
     def get_processing_summary(self) -> Dict[str, Any]:
         """Lấy thống kê xử lý"""
-        total_records = len(self.processed_records)
-        valid_records = sum(1 for r in self.processed_records if r.get('validation_status') == 'valid')
+        total_records = len(self._processed_df)
+        if 'validation_status' in self._processed_df.columns:
+            status_counts = self._processed_df['validation_status'].value_counts()
+            valid_records = int(status_counts.get('valid', 0))
+        else:
+            valid_records = 0
         
         return {
             'total_processed': total_records,
@@ -281,18 +430,50 @@ class EnhancedInputHandler:
             'processing_timestamp': datetime.now().isoformat()
         }
     
-    def save_processing_report(self, output_path: str):
-        """Lưu báo cáo xử lý đầu vào"""
+    def save_processing_report(self, output_path: str, output_format: str = 'json'):
+        """
+        Lưu báo cáo xử lý đầu vào
+        output_format: 'json' (mặc định, dễ đọc) hoặc 'parquet' (cho lượng bản ghi lớn)
+        """
+        if output_format == 'parquet':
+            return self.save_processing_report_parquet(output_path)
+        
         report = {
             'summary': self.get_processing_summary(),
             'processed_records': self.processed_records,
             'validation_errors': self.validation_errors
         }
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
-        
+        self._write_json(output_path, report)
         self.logger.info(f"Đã lưu báo cáo xử lý: {output_path}")
+    
+    def save_processing_report_parquet(self, output_path: str):
+        """
+        Lưu records dạng Parquet (cột categorical được dictionary-encode),
+        summary và lỗi validation ghi vào file JSON đi kèm *_summary.json
+        """
+        self._processed_df.to_parquet(output_path, engine='pyarrow', compression='zstd', index=False)
+        
+        summary_path = f"{os.path.splitext(output_path)[0]}_summary.json"
+        self._write_json(summary_path, {
+            'summary': self.get_processing_summary(),
+            'validation_errors': self.validation_errors
+        })
+        self.logger.info(f"Đã lưu báo cáo xử lý: {output_path} (summary: {summary_path})")
+    
+    def _write_json(self, output_path: str, data: Dict[str, Any]):
+        """Ghi JSON UTF-8 có indent, ưu tiên orjson nếu có"""
+        if ORJSON_AVAILABLE:
+            # orjson ghi thẳng UTF-8 bytes, nhanh hơn nhiều với báo cáo lớn
+            payload = orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+            with open(output_path, 'wb') as f:
+                f.write(payload)
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
 
 # Convenience functions để sử dụng dễ dàng
 def read_input_excel(file_path: str) -> List[Dict[str, Any]]:
@@ -300,6 +481,20 @@ def read_input_excel(file_path: str) -> List[Dict[str, Any]]:
     handler = EnhancedInputHandler()
     return handler.read_enhanced_input(file_path)
 
+def read_input_excels(file_paths: List[str], workers: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Đọc nhiều file Excel đầu vào song song trên nhiều process
+    Returns: danh sách records theo đúng thứ tự file_paths
+    """
+    if len(file_paths) <= 1 or workers == 1:
+        return [read_input_excel(path) for path in file_paths]
+    
+    # spawn để chạy giống nhau trên Windows/Linux; mỗi worker tự tạo handler riêng
+    # (pandas đọc qua openpyxl ở chế độ read-only)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        return list(executor.map(read_input_excel, file_paths))
+
 def validate_input_data(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Function wrapper để validate dữ liệu"""
     handler = EnhancedInputHandler()
@@ -8,16 +8,251 @@ Author: MiniMax Agent
 
 import asyncio
 import logging
+import numpy as np
 import pandas as pd
+import xlsxwriter
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import json
 import os
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Import modules hiện có
 from src.enhanced_input_handler import EnhancedInputHandler
 from src.vss_bhxh_collector import VSSDataCollector
 from src.haiphong_vss_extractor import HaiPhongVSSExtractor
+from src.enhanced_data_extractor import (
+    EnhancedDataExtractor, EnhancedBHXHApiIntegrator, extract_enhanced_vss_data
+)
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _weighted_fill_scores(filled: np.ndarray, group_sizes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Điểm mỗi dòng = tổng (tỷ lệ ô có dữ liệu của nhóm cột * trọng số nhóm), gộp trong 1 vòng lặp"""
+        out = np.empty(filled.shape[0])
+        for i in prange(filled.shape[0]):
+            score = 0.0
+            start = 0
+            for g in range(group_sizes.shape[0]):
+                count = 0
+                for j in range(start, start + group_sizes[g]):
+                    if filled[i, j]:
+                        count += 1
+                score += count / group_sizes[g] * weights[g]
+                start += group_sizes[g]
+            out[i] = score
+        return out
+else:
+    def _weighted_fill_scores(filled: np.ndarray, group_sizes: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Điểm mỗi dòng = tổng (tỷ lệ ô có dữ liệu của nhóm cột * trọng số nhóm)"""
+        out = np.zeros(filled.shape[0])
+        start = 0
+        for size, weight in zip(group_sizes, weights):
+            out += filled[:, start:start + size].mean(axis=1) * weight
+            start += size
+        return out
+
+# HTML mẫu (demo) cho response VSS - các phần phụ thuộc CCCD được điền bằng str.format
+_SAMPLE_VSS_HTML_TEMPLATE = '''
+            <html>
+            <body>
+            <h2>Thông tin Bảo hiểm xã hội - CCCD: {cccd}</h2>
+            <table>
+                <tr><td>Họ và tên:</td><td>Demo User {last4}</td></tr>
+                <tr><td>Ngày sinh:</td><td>15/03/1973</td></tr>
+                <tr><td>Số BHXH:</td><td>{bhxh}</td></tr>
+                <tr><td>Trạng thái:</td><td>Đang đóng</td></tr>
+                <tr><td>Đơn vị làm việc:</td><td>Công ty Demo {last2}</td></tr>
+                <tr><td>Mã hộ gia đình:</td><td>HGD{first6}</td></tr>
+                <tr><td>Điện thoại:</td><td>098{last7}</td></tr>
+                <tr><td>Thu nhập:</td><td>12,500,000 VND</td></tr>
+                <tr><td>Ngân hàng:</td><td>VCB</td></tr>
+            </table>
+
+            <div class='household-info'>
+                <h3>Thành viên hộ gia đình</h3>
+                <table>
+                    <tr><th>Tên</th><th>Quan hệ</th><th>Năm sinh</th></tr>
+                    <tr><td>Demo Spouse</td><td>Vợ/Chồng</td><td>1975</td></tr>
+                    <tr><td>Demo Child</td><td>Con</td><td>2000</td></tr>
+                </table>
+            </div>
+            </body>
+            </html>
+            '''
+
+def _orjson_report_default(obj: Any) -> Any:
+    """default cho orjson, khớp json.dump(default=str): subclass float (np.float64) vẫn là số"""
+    if isinstance(obj, float):
+        return float(obj)
+    return str(obj)
+
+@lru_cache(maxsize=50_000)
+def _build_sample_vss_html(cccd: str) -> str:
+    """HTML mẫu cho CCCD - chỉ phụ thuộc vào cccd nên được memoize"""
+    return _SAMPLE_VSS_HTML_TEMPLATE.format(
+        cccd=cccd, last4=cccd[-4:], bhxh=cccd[2:12], last2=cccd[-2:], first6=cccd[:6], last7=cccd[-7:]
+    )
+
+class EnhancedRecord:
+    """
+    Record kết quả đã mở rộng của 1 CCCD.
+    Dùng __slots__ (không có __dict__ riêng) để giảm bộ nhớ cho batch lớn,
+    vẫn hỗ trợ truy cập kiểu dict (record['field'], record.get) như record cũ.
+    """
+    
+    __slots__ = (
+        # Input data
+        'input_ho_ten', 'input_cccd', 'input_tinh_thanh_pho', 'input_so_bhxh', 'input_nam_sinh',
+        'input_row_index', 'input_format', 'input_validation_status',
+        # VSS basic data
+        'vss_ho_ten', 'vss_gioi_tinh', 'vss_ngay_sinh', 'vss_so_bhxh', 'vss_tinh_trang_bhxh',
+        'vss_don_vi', 'vss_dia_chi', 'vss_sdt', 'vss_extraction_source',
+        # VSS enhanced data
+        'vss_ma_ho_gia_dinh', 'vss_so_dien_thoai_enhanced', 'vss_thong_tin_thanh_vien_hgd',
+        'vss_thu_nhap', 'vss_ngan_hang', 'enhanced_extraction_source', 'enhanced_extraction_note',
+        # Metadata
+        'processing_timestamp', 'processor_version', 'data_completeness_score',
+        'processing_status', 'final_validation'
+    )
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Trường không hợp lệ: {', '.join(fields)}")
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __setitem__(self, key: str, value: Any):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+    
+    def keys(self):
+        return self.__slots__
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class _AsyncTokenBucket:
+    """Token bucket cho asyncio: tối đa `rate` lượt/giây, cho phép burst tới `capacity` lượt"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Chờ tới khi có token (các coroutine chờ lần lượt theo thứ tự)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+class _ExcelResultWriter:
+    """
+    Ghi kết quả ra Excel theo từng chunk với xlsxwriter ở chế độ constant_memory:
+    mỗi dòng được flush xuống đĩa ngay nên bộ nhớ không tăng theo số record.
+    Chế độ này bắt buộc ghi lần lượt từng dòng nên không dùng DataFrame.to_excel
+    (pandas ghi theo cột).
+    
+    Record thất bại (processing_status='failed') có bộ cột khác nên được ghi vào
+    sheet 'Errors' riêng, chỉ tạo khi gặp record lỗi đầu tiên.
+    """
+    
+    def __init__(self, output_file_path: str, columns: List[str],
+                 error_columns: Optional[List[str]] = None):
+        self.output_file_path = output_file_path
+        self.columns = columns
+        self.error_columns = error_columns
+        self.rows_written = 0
+        
+        self._workbook = xlsxwriter.Workbook(output_file_path, {'constant_memory': True})
+        self._header_format = self._workbook.add_format({'bold': True})
+        self._worksheet = self._add_worksheet('Sheet1', columns)
+        self._data_rows = 0
+        self._error_worksheet = None
+        self._error_rows = 0
+    
+    def _add_worksheet(self, name: str, columns: List[str]):
+        worksheet = self._workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, columns, self._header_format)
+        return worksheet
+    
+    @staticmethod
+    def _cell_value(value: Any) -> Any:
+        """Chuyển giá trị về kiểu xlsxwriter ghi được (dict/list -> chuỗi, NaN/None -> ô trống)"""
+        if isinstance(value, (dict, list, tuple)):
+            return str(value)
+        if value is None or pd.isna(value):
+            return None
+        return value
+    
+    def write_records(self, records: List[Dict[str, Any]]):
+        """Ghi nối tiếp 1 chunk record"""
+        for record in records:
+            self.rows_written += 1
+            if self.error_columns is not None and record.get('processing_status') == 'failed':
+                if self._error_worksheet is None:
+                    self._error_worksheet = self._add_worksheet('Errors', self.error_columns)
+                self._error_rows += 1
+                self._error_worksheet.write_row(
+                    self._error_rows, 0, [self._cell_value(record.get(col)) for col in self.error_columns]
+                )
+            else:
+                self._data_rows += 1
+                self._worksheet.write_row(
+                    self._data_rows, 0, [self._cell_value(record.get(col)) for col in self.columns]
+                )
+    
+    def close(self):
+        self._workbook.close()
 
 class EnhancedVSSCollector:
     """
@@ -34,6 +269,40 @@ class EnhancedVSSCollector:
         self.input_handler = EnhancedInputHandler()
         self.vss_collector = VSSDataCollector()
         self.haiphong_extractor = HaiPhongVSSExtractor()
+        # HaiPhongVSSExtractor (requests.Session + thống kê) không thread-safe:
+        # mỗi worker thread của executor dùng 1 extractor riêng
+        self._thread_state = threading.local()
+        self._thread_state.haiphong_extractor = self.haiphong_extractor
+        self.html_extractor = EnhancedDataExtractor(parser='lxml')
+        self.api_integrator = EnhancedBHXHApiIntegrator()
+        
+        # Giới hạn số record xử lý đồng thời và số request VSS mỗi giây
+        # (chỉ các lượt gọi VSS thực sự mới bị throttle, cache hit đi thẳng)
+        self.max_concurrent_requests = 16
+        self.requests_per_second = 16.0
+        self._rate_limiter: Optional[_AsyncTokenBucket] = None
+        self._rate_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Số record mỗi lần ghi ra file kết quả
+        self.output_chunk_size = 1000
+        
+        # Log tiến độ mỗi khi thêm chừng này record hoàn thành (theo thứ tự hoàn thành)
+        self.progress_log_interval = 100
+        self._completed_records = 0
+        
+        # Parse HTML (CPU-bound) trên nhiều process cho batch lớn;
+        # batch nhỏ parse ngay trong event loop vì chi phí khởi động process cao hơn
+        self.parse_workers: Optional[int] = None  # None = os.cpu_count()
+        self.process_pool_min_records = 1000
+        self._parse_executor: Optional[ProcessPoolExecutor] = None
+        
+        # Timestamp dùng chung cho mọi record trong 1 batch (None ngoài batch)
+        self._batch_timestamp: Optional[str] = None
+        
+        # Cache LRU kết quả tra cứu cơ bản theo CCCD (truy cập từ nhiều thread)
+        self.basic_data_cache_size = 50_000
+        self._basic_data_cache: OrderedDict = OrderedDict()
+        self._basic_data_cache_lock = threading.Lock()
         
         # Collection state
         self.input_records = []
@@ -79,7 +348,22 @@ class EnhancedVSSCollector:
     
     def enhance_single_record(self, input_record: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Xử lý và mở rộng dữ liệu cho 1 record
+        Xử lý và mở rộng dữ liệu cho 1 record (đồng bộ)
+        
+        Chạy enhance_single_record_async trong event loop riêng, nên không gọi được
+        từ bên trong event loop đang chạy - khi đó dùng enhance_single_record_async.
+        
+        Args:
+            input_record: Record từ input đã được validate
+            
+        Returns:
+            Record đã được mở rộng với dữ liệu từ VSS
+        """
+        return asyncio.run(self.enhance_single_record_async(input_record))
+    
+    async def enhance_single_record_async(self, input_record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Xử lý và mở rộng dữ liệu cho 1 record (coroutine, dùng trong batch)
         
         Args:
             input_record: Record từ input đã được validate
@@ -89,47 +373,88 @@ class EnhancedVSSCollector:
         """
         try:
             cccd = input_record.get('cccd', '')
-            self.logger.debug(f"Đang xử lý CCCD: {cccd}")
+            self.logger.debug("Đang xử lý CCCD: %s", cccd)
             
             # Bước 1: Trích xuất dữ liệu cơ bản từ VSS (dùng logic hiện có)
-            vss_basic_data = self._extract_basic_vss_data(cccd)
+            # HaiPhongVSSExtractor dùng requests (blocking) nên chạy trong thread pool
+            vss_basic_data = self._get_cached_basic_data(cccd)
+            if vss_basic_data is None:
+                loop = asyncio.get_running_loop()
+                async with self._get_rate_limiter():
+                    vss_basic_data = await loop.run_in_executor(None, self._extract_basic_vss_data, cccd)
             
             # Bước 2: Trích xuất dữ liệu mở rộng
-            vss_enhanced_data = self._extract_enhanced_vss_data(cccd, input_record)
+            vss_enhanced_data = await self._extract_enhanced_vss_data_async(cccd, input_record)
             
             # Bước 3: Kết hợp tất cả dữ liệu
             enhanced_record = self._merge_all_data(input_record, vss_basic_data, vss_enhanced_data)
             
-            # Bước 4: Validation cuối cùng
-            enhanced_record['final_validation'] = self._final_validation(enhanced_record)
             enhanced_record['processing_status'] = 'success'
             
+            # Trong batch, điểm completeness và validation cuối được tính theo chunk
+            # (_score_results); gọi lẻ ngoài batch thì chấm điểm ngay
+            if self._batch_timestamp is None:
+                self._score_results([enhanced_record])
+            
             self.collection_stats['successfully_processed'] += 1
             
             return enhanced_record
             
         except Exception as e:
-            self.logger.error(f"Lỗi xử lý record CCCD {cccd}: {e}")
+            self.logger.error("Lỗi xử lý record CCCD %s: %s", cccd, e)
             
             # Trả về record với thông tin lỗi
-            error_record = input_record.copy()
-            error_record.update({
+            error_record = {
+                **input_record,
                 'processing_status': 'failed',
                 'error_message': str(e),
-                'error_timestamp': datetime.now().isoformat()
-            })
+                'error_timestamp': self._batch_timestamp or datetime.now().isoformat()
+            }
             
             self.collection_stats['failed_processing'] += 1
             return error_record
     
+    def _get_rate_limiter(self) -> _AsyncTokenBucket:
+        """
+        Rate limiter cho các lượt gọi VSS (tạo trong event loop đang chạy).
+        asyncio.Lock bên trong gắn với 1 event loop, nên mỗi lần gọi đồng bộ
+        (asyncio.run tạo loop mới) dùng 1 bucket mới.
+        """
+        loop = asyncio.get_running_loop()
+        if self._rate_limiter is None or self._rate_limiter_loop is not loop:
+            self._rate_limiter = _AsyncTokenBucket(self.requests_per_second)
+            self._rate_limiter_loop = loop
+        return self._rate_limiter
+    
+    def _get_haiphong_extractor(self) -> HaiPhongVSSExtractor:
+        """HaiPhongVSSExtractor của thread hiện tại (tạo khi thread gọi lần đầu)"""
+        extractor = getattr(self._thread_state, 'haiphong_extractor', None)
+        if extractor is None:
+            extractor = HaiPhongVSSExtractor()
+            self._thread_state.haiphong_extractor = extractor
+        return extractor
+    
+    def _get_cached_basic_data(self, cccd: str) -> Optional[Dict[str, Any]]:
+        """Lấy kết quả tra cứu cơ bản từ cache LRU (None nếu chưa có)"""
+        with self._basic_data_cache_lock:
+            cached = self._basic_data_cache.get(cccd)
+            if cached is not None:
+                self._basic_data_cache.move_to_end(cccd)
+            return cached
+    
     def _extract_basic_vss_data(self, cccd: str) -> Dict[str, Any]:
         """Trích xuất dữ liệu cơ bản từ VSS (dùng logic hiện có)"""
+        cached = self._get_cached_basic_data(cccd)
+        if cached is not None:
+            return cached
+        
         try:
             # Sử dụng HaiPhongVSSExtractor cho việc trích xuất cơ bản
-            result = self.haiphong_extractor.extract_single_cccd(cccd)
+            # (extractor riêng của thread: hàm này chạy trong thread pool của event loop)
+            result = self._get_haiphong_extractor().extract_single_cccd(cccd)
             
             if result:
-                return {
+                basic_data = {
                     'ho_ten_vss': result.get('ho_ten', ''),
                     'gioi_tinh_vss': result.get('gioi_tinh', ''),
                     'ngay_sinh_vss': result.get('ngay_sinh', ''),
@@ -140,6 +465,13 @@ class EnhancedVSSCollector:
                     'sdt_vss': result.get('sdt', ''),
                     'extraction_source': 'haiphong_vss_api'
                 }
+                
+                # Chỉ cache kết quả thành công, lỗi mạng/không có dữ liệu sẽ được thử lại
+                with self._basic_data_cache_lock:
+                    self._basic_data_cache[cccd] = basic_data
+                    if len(self._basic_data_cache) > self.basic_data_cache_size:
+                        self._basic_data_cache.popitem(last=False)
+                return basic_data
             else:
                 return {'extraction_source': 'failed', 'error': 'No data from VSS API'}
                 
@@ -147,6 +479,10 @@ class EnhancedVSSCollector:
             return {'extraction_source': 'error', 'error': str(e)}
     
     def _extract_enhanced_vss_data(self, cccd: str, input_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Trích xuất dữ liệu mở rộng từ VSS (đồng bộ, xem _extract_enhanced_vss_data_async)"""
+        return asyncio.run(self._extract_enhanced_vss_data_async(cccd, input_record))
+    
+    async def _extract_enhanced_vss_data_async(self, cccd: str, input_record: Dict[str, Any]) -> Dict[str, Any]:
         """
         Trích xuất dữ liệu mở rộng từ VSS
         
@@ -168,18 +504,22 @@ class EnhancedVSSCollector:
         }
         
         try:
-            # Import enhanced data extractor
-            from src.enhanced_data_extractor import EnhancedDataExtractor, EnhancedBHXHApiIntegrator
-            
             # Bước 1: Lấy HTML response từ VSS (simulate)
-            html_response = self._get_vss_html_response(cccd)
+            async with self._get_rate_limiter():
+                html_response = self._get_vss_html_response(cccd)
             
             if html_response:
-                # Bước 2: Sử dụng Enhanced Data Extractor
-                extractor = EnhancedDataExtractor()
-                extracted_data = extractor.parse_enhanced_bhxh_data(
-                    html_response, cccd, input_record
-                )
+                # Bước 2: Sử dụng Enhanced Data Extractor (trên process pool nếu có)
+                if self._parse_executor is not None:
+                    loop = asyncio.get_running_loop()
+                    extracted_data = await loop.run_in_executor(
+                        self._parse_executor, extract_enhanced_vss_data,
+                        html_response, cccd, input_record, 'lxml'
+                    )
+                else:
+                    extracted_data = self.html_extractor.parse_enhanced_bhxh_data(
+                        html_response, cccd, input_record
+                    )
                 
                 # Bước 3: Extract các trường mở rộng
                 enhanced_data.update({
@@ -201,12 +541,9 @@ class EnhancedVSSCollector:
                 # Bước 4: Tích hợp với Enhanced BHXH API (nếu có mã BHXH)
                 ma_so_bhxh = extracted_data.get('so_bhxh')
                 if ma_so_bhxh:
-                    api_integrator = EnhancedBHXHApiIntegrator()
-                    
-                    # Async call để lấy thông tin hộ gia đình
-                    household_data = asyncio.run(
-                        api_integrator.get_household_info_by_bhxh(ma_so_bhxh)
-                    )
+                    # Async call để lấy thông tin hộ gia đình (trong cùng event loop của batch)
+                    async with self._get_rate_limiter():
+                        household_data = await self.api_integrator.get_household_info_by_bhxh(ma_so_bhxh)
                     
                     if household_data:
                         enhanced_data.update({
@@ -227,7 +564,7 @@ class EnhancedVSSCollector:
                 'enhanced_extraction_source': 'error',
                 'enhanced_extraction_note': f'Lỗi trong quá trình extraction: {str(e)[:100]}'
             })
-            self.logger.error(f"Lỗi extract enhanced data cho {cccd}: {e}")
+            self.logger.error("Lỗi extract enhanced data cho %s: %s", cccd, e)
         
         return enhanced_data
     
@@ -239,113 +576,92 @@ class EnhancedVSSCollector:
         try:
             # Trong môi trường thực tế, đây sẽ là API call hoặc scraping thực tế
             # Hiện tại sử dụng HTML mẫu để demo
+            sample_html = _build_sample_vss_html(cccd)
             
-            sample_html = f'''
-            <html>
-            <body>
-            <h2>Thông tin Bảo hiểm xã hội - CCCD: {cccd}</h2>
-            <table>
-                <tr><td>Họ và tên:</td><td>Demo User {cccd[-4:]}</td></tr>
-                <tr><td>Ngày sinh:</td><td>15/03/1973</td></tr>
-                <tr><td>Số BHXH:</td><td>{cccd[2:12]}</td></tr>
-                <tr><td>Trạng thái:</td><td>Đang đóng</td></tr>
-                <tr><td>Đơn vị làm việc:</td><td>Công ty Demo {cccd[-2:]}</td></tr>
-                <tr><td>Mã hộ gia đình:</td><td>HGD{cccd[:6]}</td></tr>
-                <tr><td>Điện thoại:</td><td>098{cccd[-7:]}</td></tr>
-                <tr><td>Thu nhập:</td><td>12,500,000 VND</td></tr>
-                <tr><td>Ngân hàng:</td><td>VCB</td></tr>
-            </table>
-
-            <div class='household-info'>
-                <h3>Thành viên hộ gia đình</h3>
-                <table>
-                    <tr><th>Tên</th><th>Quan hệ</th><th>Năm sinh</th></tr>
-                    <tr><td>Demo Spouse</td><td>Vợ/Chồng</td><td>1975</td></tr>
-                    <tr><td>Demo Child</td><td>Con</td><td>2000</td></tr>
-                </table>
-            </div>
-            </body>
-            </html>
-            '''
-            
-            self.logger.debug(f"Generated sample HTML for {cccd}")
+            self.logger.debug("Generated sample HTML for %s", cccd)
             return sample_html
             
         except Exception as e:
-            self.logger.error(f"Lỗi get VSS HTML response: {e}")
+            self.logger.error("Lỗi get VSS HTML response: %s", e)
             return None
     
     def _merge_all_data(self, input_record: Dict[str, Any], 
                        vss_basic: Dict[str, Any], 
-                       vss_enhanced: Dict[str, Any]) -> Dict[str, Any]:
+                       vss_enhanced: Dict[str, Any]) -> 'EnhancedRecord':
         """Kết hợp tất cả dữ liệu từ input và VSS"""
         
-        merged_record = {
+        return EnhancedRecord(
             # === INPUT DATA ===
-            'input_ho_ten': input_record.get('ho_ten', ''),
-            'input_cccd': input_record.get('cccd', ''),
-            'input_tinh_thanh_pho': input_record.get('tinh_thanh_pho', ''),
-            'input_so_bhxh': input_record.get('so_bhxh_input', ''),
-            'input_nam_sinh': input_record.get('nam_sinh_input', 0),
-            'input_row_index': input_record.get('input_row_index', 0),
-            'input_format': input_record.get('input_format', ''),
-            'input_validation_status': input_record.get('validation_status', ''),
+            input_ho_ten=input_record.get('ho_ten', ''),
+            input_cccd=input_record.get('cccd', ''),
+            input_tinh_thanh_pho=input_record.get('tinh_thanh_pho', ''),
+            input_so_bhxh=input_record.get('so_bhxh_input', ''),
+            input_nam_sinh=input_record.get('nam_sinh_input', 0),
+            input_row_index=input_record.get('input_row_index', 0),
+            input_format=input_record.get('input_format', ''),
+            input_validation_status=input_record.get('validation_status', ''),
             
             # === VSS BASIC DATA (from existing logic) ===
-            'vss_ho_ten': vss_basic.get('ho_ten_vss', ''),
-            'vss_gioi_tinh': vss_basic.get('gioi_tinh_vss', ''),
-            'vss_ngay_sinh': vss_basic.get('ngay_sinh_vss', ''),
-            'vss_so_bhxh': vss_basic.get('so_bhxh_vss', ''),
-            'vss_tinh_trang_bhxh': vss_basic.get('tinh_trang_bhxh', ''),
-            'vss_don_vi': vss_basic.get('don_vi', ''),
-            'vss_dia_chi': vss_basic.get('dia_chi_vss', ''),
-            'vss_sdt': vss_basic.get('sdt_vss', ''),
-            'vss_extraction_source': vss_basic.get('extraction_source', ''),
+            vss_ho_ten=vss_basic.get('ho_ten_vss', ''),
+            vss_gioi_tinh=vss_basic.get('gioi_tinh_vss', ''),
+            vss_ngay_sinh=vss_basic.get('ngay_sinh_vss', ''),
+            vss_so_bhxh=vss_basic.get('so_bhxh_vss', ''),
+            vss_tinh_trang_bhxh=vss_basic.get('tinh_trang_bhxh', ''),
+            vss_don_vi=vss_basic.get('don_vi', ''),
+            vss_dia_chi=vss_basic.get('dia_chi_vss', ''),
+            vss_sdt=vss_basic.get('sdt_vss', ''),
+            vss_extraction_source=vss_basic.get('extraction_source', ''),
             
             # === VSS ENHANCED DATA (new fields) ===
-            'vss_ma_ho_gia_dinh': vss_enhanced.get('ma_ho_gia_dinh'),
-            'vss_so_dien_thoai_enhanced': vss_enhanced.get('so_dien_thoai_enhanced'),
-            'vss_thong_tin_thanh_vien_hgd': vss_enhanced.get('thong_tin_thanh_vien_hgd'),
-            'vss_thu_nhap': vss_enhanced.get('thu_nhap'),
-            'vss_ngan_hang': vss_enhanced.get('ngan_hang'),
-            'enhanced_extraction_source': vss_enhanced.get('enhanced_extraction_source', ''),
-            'enhanced_extraction_note': vss_enhanced.get('enhanced_extraction_note', ''),
+            vss_ma_ho_gia_dinh=vss_enhanced.get('ma_ho_gia_dinh'),
+            vss_so_dien_thoai_enhanced=vss_enhanced.get('so_dien_thoai_enhanced'),
+            vss_thong_tin_thanh_vien_hgd=vss_enhanced.get('thong_tin_thanh_vien_hgd'),
+            vss_thu_nhap=vss_enhanced.get('thu_nhap'),
+            vss_ngan_hang=vss_enhanced.get('ngan_hang'),
+            enhanced_extraction_source=vss_enhanced.get('enhanced_extraction_source', ''),
+            enhanced_extraction_note=vss_enhanced.get('enhanced_extraction_note', ''),
             
             # === METADATA ===
-            'processing_timestamp': datetime.now().isoformat(),
-            'processor_version': 'enhanced_vss_collector_v1.0',
-            'data_completeness_score': 0.0,  # Sẽ được tính trong validation
-        }
-        
-        # Tính điểm completeness
-        merged_record['data_completeness_score'] = self._calculate_completeness_score(merged_record)
-        
-        return merged_record
+            processing_timestamp=self._batch_timestamp or datetime.now().isoformat(),
+            processor_version='enhanced_vss_collector_v1.0',
+            data_completeness_score=0.0,  # Được tính trong _score_results
+        )
     
-    def _calculate_completeness_score(self, record: Dict[str, Any]) -> float:
-        """Tính điểm completeness của record"""
-        essential_fields = [
-            'input_cccd', 'input_ho_ten', 'vss_ho_ten', 'vss_so_bhxh', 'vss_tinh_trang_bhxh'
-        ]
-        
-        optional_fields = [
-            'vss_ngay_sinh', 'vss_don_vi', 'vss_dia_chi', 'vss_sdt'
-        ]
-        
-        enhanced_fields = [
-            'vss_ma_ho_gia_dinh', 'vss_thong_tin_thanh_vien_hgd', 'vss_thu_nhap', 'vss_ngan_hang'
-        ]
-        
+    # Nhóm trường và trọng số dùng để tính điểm completeness
+    _COMPLETENESS_GROUPS = (
         # Essential fields: 60% trọng số
-        essential_score = sum(1 for field in essential_fields if record.get(field)) / len(essential_fields) * 0.6
-        
-        # Optional fields: 25% trọng số  
-        optional_score = sum(1 for field in optional_fields if record.get(field)) / len(optional_fields) * 0.25
-        
+        (('input_cccd', 'input_ho_ten', 'vss_ho_ten', 'vss_so_bhxh', 'vss_tinh_trang_bhxh'), 0.6),
+        # Optional fields: 25% trọng số
+        (('vss_ngay_sinh', 'vss_don_vi', 'vss_dia_chi', 'vss_sdt'), 0.25),
         # Enhanced fields: 15% trọng số
-        enhanced_score = sum(1 for field in enhanced_fields if record.get(field)) / len(enhanced_fields) * 0.15
+        (('vss_ma_ho_gia_dinh', 'vss_thong_tin_thanh_vien_hgd', 'vss_thu_nhap', 'vss_ngan_hang'), 0.15),
+    )
+    
+    _COMPLETENESS_GROUP_SIZES = np.array([len(group) for group, _ in _COMPLETENESS_GROUPS], dtype=np.int64)
+    _COMPLETENESS_WEIGHTS = np.array([weight for _, weight in _COMPLETENESS_GROUPS], dtype=np.float64)
+    
+    # Lấy toàn bộ trường completeness của 1 record trong 1 lần gọi (C-level)
+    _COMPLETENESS_GETTER = itemgetter(*sum((group for group, _ in _COMPLETENESS_GROUPS), ()))
+    
+    def _calculate_completeness_scores(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Tính điểm completeness cho cả batch trên ma trận bool (kernel numba nếu có, không thì NumPy)"""
+        # Trường có dữ liệu = giá trị truthy (None / '' / 0 / [] là rỗng)
+        getter = self._COMPLETENESS_GETTER
+        filled = np.array([tuple(map(bool, getter(record))) for record in records], dtype=bool)
         
-        return round(essential_score + optional_score + enhanced_score, 3)
+        scores = _weighted_fill_scores(filled, self._COMPLETENESS_GROUP_SIZES, self._COMPLETENESS_WEIGHTS)
+        return scores.round(3)
+    
+    def _score_results(self, results: List[Dict[str, Any]]):
+        """Gán điểm completeness và validation cuối cho các record xử lý thành công"""
+        successful = [r for r in results if r.get('processing_status') == 'success']
+        if not successful:
+            return
+        
+        scores = self._calculate_completeness_scores(successful)
+        for record, score in zip(successful, scores.tolist()):
+            record['data_completeness_score'] = score
+            record['final_validation'] = self._final_validation(record)
     
     def _final_validation(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """Validation cuối cùng cho record đã được mở rộng"""
@@ -357,16 +673,18 @@ class EnhancedVSSCollector:
         
         # Kiểm tra sự nhất quán giữa input và VSS
         input_cccd = record.get('input_cccd', '')
-        vss_cccd_from_bhxh = record.get('vss_so_bhxh', '')[:12] if record.get('vss_so_bhxh') else ''
+        vss_cccd_from_bhxh = (record.get('vss_so_bhxh') or '')[:12]
         
         if input_cccd and vss_cccd_from_bhxh and input_cccd != vss_cccd_from_bhxh:
             validation_result['warnings'].append('CCCD input không khớp với CCCD từ VSS')
         
-        # Kiểm tra tên
-        input_name = record.get('input_ho_ten', '').lower()
-        vss_name = record.get('vss_ho_ten', '').lower()
+        # Kiểm tra tên (không phân biệt hoa thường): so sánh trực tiếp và độ dài trước,
+        # chỉ casefold khi 2 chuỗi khác nhau nhưng cùng độ dài
+        input_name = record.get('input_ho_ten') or ''
+        vss_name = record.get('vss_ho_ten') or ''
         
-        if input_name and vss_name and input_name != vss_name:
+        if (input_name and vss_name and input_name != vss_name
+                and (len(input_name) != len(vss_name) or input_name.casefold() != vss_name.casefold())):
             validation_result['warnings'].append('Họ tên input khác với VSS')
         
         # Validation score threshold
@@ -387,6 +705,9 @@ class EnhancedVSSCollector:
             
         Returns:
             Dictionary chứa kết quả xử lý và thống kê
+        
+        Các record được xử lý đồng thời, nhưng file kết quả và processed_results
+        luôn theo thứ tự input (cột input_row_index).
         """
         try:
             self.collection_stats['start_time'] = datetime.now()
@@ -398,24 +719,62 @@ class EnhancedVSSCollector:
             if not valid_input_records:
                 raise ValueError("Không có record hợp lệ để xử lý")
             
-            # Bước 2: Xử lý từng record
-            self.processed_results = []
-            
-            for i, input_record in enumerate(valid_input_records, 1):
-                self.logger.info(f"Xử lý record {i}/{len(valid_input_records)}: {input_record.get('cccd', 'N/A')}")
-                
-                enhanced_record = self.enhance_single_record(input_record)
-                self.processed_results.append(enhanced_record)
-                
-                # Delay để tránh rate limiting
-                await asyncio.sleep(1.0)
+            # Bước 2: Xử lý đồng thời các record (giới hạn bởi semaphore + rate limiter)
+            # Bước 3: Record hoàn thành được chấm điểm và ghi ra file theo từng chunk
+            self._rate_limiter = None  # bucket mới cho mỗi batch (tạo lại trong _get_rate_limiter)
+            self._batch_timestamp = self.collection_stats['start_time'].isoformat()
+            self._completed_records = 0
+            semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            total = len(valid_input_records)
+            
+            # Excel được ghi dần theo chunk; Parquet/Feather ghi 1 lần từ DataFrame cột sau batch
+            writer = None
+            if output_file_path and not self._is_columnar_output(output_file_path):
+                writer = _ExcelResultWriter(output_file_path, self._output_columns(),
+                                            self._error_output_columns(valid_input_records))
+            
+            if total >= self.process_pool_min_records:
+                # spawn để chạy giống nhau trên Windows/Linux (event loop đang dùng thread pool)
+                self._parse_executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers, mp_context=multiprocessing.get_context('spawn')
+                )
             
-            self.collection_stats['end_time'] = datetime.now()
+            tasks = [
+                asyncio.ensure_future(self._enhance_with_limit(semaphore, i, total, input_record))
+                for i, input_record in enumerate(valid_input_records, 1)
+            ]
             
-            # Bước 3: Lưu kết quả
-            if output_file_path:
+            try:
+                # Các task chạy đồng thời nhưng được thu theo thứ tự input, nên các dòng
+                # trong file kết quả giữ đúng thứ tự input (cột input_row_index) giữa các lần chạy;
+                # record xong sớm chỉ chờ trong bộ nhớ tới lượt được ghi.
+                # Tiến độ được log trong _enhance_with_limit theo thứ tự hoàn thành.
+                chunk = []
+                for task in tasks:
+                    chunk.append(await task)
+                    if len(chunk) >= self.output_chunk_size:
+                        self._flush_results_chunk(chunk, writer)
+                        chunk = []
+                self._flush_results_chunk(chunk, writer)
+            finally:
+                if writer:
+                    writer.close()
+                if self._parse_executor is not None:
+                    self._parse_executor.shutdown()
+                    self._parse_executor = None
+                self._batch_timestamp = None
+            
+            if writer:
+                self.logger.info(f"Đã lưu {writer.rows_written} bản ghi vào {output_file_path}")
+            
+            # Giữ thứ tự theo input
+            self.processed_results = [task.result() for task in tasks]
+            
+            if output_file_path and writer is None:
                 self._save_enhanced_results(output_file_path)
             
+            self.collection_stats['end_time'] = datetime.now()
+            
             # Bước 4: Tạo báo cáo
             final_report = self._generate_final_report()
             
@@ -426,43 +785,119 @@ class EnhancedVSSCollector:
             self.logger.error(f"Lỗi xử lý batch: {e}")
             raise
     
+    async def _enhance_with_limit(self, semaphore: asyncio.Semaphore, index: int, total: int,
+                                  input_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Xử lý 1 record khi còn slot trống trong semaphore"""
+        async with semaphore:
+            self.logger.info("Xử lý record %d/%d: %s", index, total, input_record.get('cccd', 'N/A'))
+            
+            result = await self.enhance_single_record_async(input_record)
+        
+        # Đếm trong event loop (1 thread) nên không cần lock; không phụ thuộc thứ tự ghi file
+        self._completed_records += 1
+        if self._completed_records % self.progress_log_interval == 0 or self._completed_records == total:
+            self.logger.info(f"Đã hoàn thành {self._completed_records}/{total} records")
+        return result
+    
+    # Thứ tự cột trong file kết quả
+    _OUTPUT_COLUMNS = [
+        # Input columns
+        'input_cccd', 'input_ho_ten', 'input_tinh_thanh_pho', 'input_so_bhxh', 'input_nam_sinh',
+        
+        # VSS basic columns  
+        'vss_ho_ten', 'vss_gioi_tinh', 'vss_ngay_sinh', 'vss_so_bhxh', 'vss_tinh_trang_bhxh',
+        'vss_don_vi', 'vss_dia_chi', 'vss_sdt',
+        
+        # VSS enhanced columns (NEW)
+        'vss_ma_ho_gia_dinh', 'vss_so_dien_thoai_enhanced', 'vss_thong_tin_thanh_vien_hgd',
+        'vss_thu_nhap', 'vss_ngan_hang',
+        
+        # Metadata
+        'processing_status', 'data_completeness_score', 'processing_timestamp'
+    ]
+    
+    # Các cột còn lại của record thành công
+    _OUTPUT_EXTRA_COLUMNS = [
+        'input_row_index', 'input_format', 'input_validation_status', 'vss_extraction_source',
+        'enhanced_extraction_source', 'enhanced_extraction_note', 'processor_version', 'final_validation'
+    ]
+    
+    # Cột đầu của record thất bại (sheet Errors), sau đó là các trường input
+    _ERROR_OUTPUT_COLUMNS = ['input_row_index', 'processing_status', 'error_message', 'error_timestamp']
+    
+    # Cột ít giá trị khác nhau, lặp lại qua các record -> categorical (1 mã nguyên/ô)
+    _CATEGORICAL_OUTPUT_COLUMNS = (
+        'input_tinh_thanh_pho', 'input_format', 'vss_gioi_tinh', 'vss_tinh_trang_bhxh', 'vss_don_vi',
+        'vss_ngan_hang', 'vss_extraction_source', 'enhanced_extraction_source', 'processing_status'
+    )
+    
+    def as_frame(self) -> pd.DataFrame:
+        """Trả về DataFrame kết quả (theo thứ tự cột output), các cột lặp lại dạng categorical"""
+        df = pd.DataFrame.from_records([
+            record.to_dict() if isinstance(record, EnhancedRecord) else record
+            for record in self.processed_results
+        ])
+        
+        columns = list(dict.fromkeys(self._output_columns() + self._error_output_columns(self.input_records)))
+        df = df.reindex(columns=[col for col in columns if col in df.columns]
+                        + [col for col in df.columns if col not in columns])
+        
+        for col in self._CATEGORICAL_OUTPUT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        return df
+    
+    def _output_columns(self) -> List[str]:
+        """Header của record thành công - phải biết trước khi ghi chunk đầu tiên"""
+        return self._OUTPUT_COLUMNS + self._OUTPUT_EXTRA_COLUMNS
+    
+    def _error_output_columns(self, input_records: List[Dict[str, Any]]) -> List[str]:
+        """Header của record thất bại: record lỗi giữ nguyên các trường input"""
+        columns = list(self._ERROR_OUTPUT_COLUMNS)
+        input_columns = input_records[0].keys() if input_records else []
+        return columns + [col for col in input_columns if col not in columns]
+    
+    def _flush_results_chunk(self, chunk: List[Dict[str, Any]], writer: Optional[_ExcelResultWriter]):
+        """Chấm điểm 1 chunk record đã hoàn thành và ghi ra file (nếu có)"""
+        if not chunk:
+            return
+        
+        self._score_results(chunk)
+        if writer:
+            writer.write_records(chunk)
+    
+    # Định dạng output dạng cột (nhanh hơn nhiều so với .xlsx khi ghi/đọc lại bằng pandas)
+    _COLUMNAR_OUTPUT_SUFFIXES = ('.parquet', '.feather')
+    
+    def _is_columnar_output(self, output_file_path: str) -> bool:
+        return os.path.splitext(output_file_path)[1].lower() in self._COLUMNAR_OUTPUT_SUFFIXES
+    
     def _save_enhanced_results(self, output_file_path: str):
-        """Lưu kết quả mở rộng ra file Excel"""
+        """Lưu kết quả mở rộng ra file (.parquet, .feather hoặc Excel) theo đuôi file"""
         if not self.processed_results:
             self.logger.warning("Không có kết quả để lưu")
             return
         
         try:
-            # Chuyển đổi sang DataFrame
-            df = pd.DataFrame(self.processed_results)
-            
-            # Sắp xếp lại cột theo logic
-            column_order = [
-                # Input columns
-                'input_cccd', 'input_ho_ten', 'input_tinh_thanh_pho', 'input_so_bhxh', 'input_nam_sinh',
-                
-                # VSS basic columns  
-                'vss_ho_ten', 'vss_gioi_tinh', 'vss_ngay_sinh', 'vss_so_bhxh', 'vss_tinh_trang_bhxh',
-                'vss_don_vi', 'vss_dia_chi', 'vss_sdt',
-                
-                # VSS enhanced columns (NEW)
-                'vss_ma_ho_gia_dinh', 'vss_so_dien_thoai_enhanced', 'vss_thong_tin_thanh_vien_hgd',
-                'vss_thu_nhap', 'vss_ngan_hang',
-                
-                # Metadata
-                'processing_status', 'data_completeness_score', 'processing_timestamp'
-            ]
-            
-            # Reorder columns (chỉ giữ columns có trong df)
-            available_columns = [col for col in column_order if col in df.columns]
-            remaining_columns = [col for col in df.columns if col not in available_columns]
-            final_column_order = available_columns + remaining_columns
-            
-            df = df.reindex(columns=final_column_order)
-            
-            # Lưu file
-            df.to_excel(output_file_path, index=False)
-            self.logger.info(f"Đã lưu {len(df)} bản ghi vào {output_file_path}")
+            suffix = os.path.splitext(output_file_path)[1].lower()
+            if suffix == '.parquet':
+                self.as_frame().to_parquet(output_file_path, engine='pyarrow', compression='snappy', index=False)
+                self.logger.info(f"Đã lưu {len(self.processed_results)} bản ghi vào {output_file_path}")
+                return
+            if suffix == '.feather':
+                self.as_frame().to_feather(output_file_path)
+                self.logger.info(f"Đã lưu {len(self.processed_results)} bản ghi vào {output_file_path}")
+                return
+            
+            writer = _ExcelResultWriter(output_file_path, self._output_columns(),
+                                        self._error_output_columns(self.input_records))
+            try:
+                for start in range(0, len(self.processed_results), self.output_chunk_size):
+                    writer.write_records(self.processed_results[start:start + self.output_chunk_size])
+            finally:
+                writer.close()
+            
+            self.logger.info(f"Đã lưu {writer.rows_written} bản ghi vào {output_file_path}")
             
         except Exception as e:
             self.logger.error(f"Lỗi lưu kết quả: {e}")
@@ -504,6 +939,24 @@ class EnhancedVSSCollector:
             'processor_version': 'enhanced_vss_collector_v1.0'
         }
 
+    def save_final_report(self, report: Dict[str, Any], output_path: str):
+        """Lưu báo cáo cuối ra file JSON UTF-8 có indent, ưu tiên orjson nếu có"""
+        if ORJSON_AVAILABLE:
+            # datetime và kiểu NumPy đi qua default=str như nhánh json để file
+            # không phụ thuộc vào việc có cài orjson hay không
+            payload = orjson.dumps(
+                report,
+                default=_orjson_report_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            )
+            with open(output_path, 'wb') as f:
+                f.write(payload)
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        
+        self.logger.info(f"Đã lưu báo cáo: {output_path}")
+
 # Main execution function
 async def main():
     """Main function để test Enhanced VSS Collector"""
@@ -511,10 +964,12 @@ async def main():
     
     # Test với file mẫu
     input_file = "data/input_excel_files/sample_input.xlsx"
-    output_file = "data/enhanced_output_results.xlsx"
+    output_file = "data/enhanced_output_results.parquet"
+    report_file = "data/enhanced_output_report.json"
     
     try:
         result = await collector.process_batch_enhanced(input_file, output_file)
+        collector.save_final_report(result, report_file)
         
         print("🎉 XỬ LÝ HOÀN THÀNH!")
         print("=" * 50)
@@ -11,16 +11,291 @@ Version: 2.1
 
 import re
 import logging
-from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
+import weakref
+from typing import Dict, List, Any, Optional, Pattern, Tuple, Union
+import soupsieve
+from bs4 import BeautifulSoup, Tag, NavigableString, CData
 from datetime import datetime
+from functools import lru_cache
+from bisect import bisect_right
+
+# Optional: selectolax (lexbor, C) cho phân tích cấu trúc và CSS selectors
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Optional: pyahocorasick cho quét nhiều context keyword trong một lần
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 from ..config.constants import (
-    ExtractionMethod, StructureType, METHOD_WEIGHTS, 
-    STRUCTURE_THRESHOLDS, PROCESSING_LIMITS
+    ExtractionMethod, ExtractionQuality, StructureType, METHOD_WEIGHTS, 
+    STRUCTURE_THRESHOLDS, PROCESSING_LIMITS, ERROR_PENALTIES
 )
 from ..config.data_models import HTMLAnalysis, ExtractionResult
-from ..config.patterns import FieldPatternsConfig, NormalizationMappingsConfig
+from ..config.patterns import (
+    FieldPatternsConfig, NormalizationMappingsConfig,
+    REGEX_PATTERN_FLAGS, FALLBACK_PATTERN_FLAGS
+)
+
+
+_JSON_SCRIPT_RE = re.compile(r'\{.*\}')
+# Loại string mà soup.get_text() đếm khi tree không khai báo interesting_string_types
+_MAIN_CONTENT_STRING_TYPES = frozenset((NavigableString, CData))
+# soupsieve ':contains(...)' tương ứng với ':lexbor-contains(...)' của lexbor
+_SOUP_CONTAINS_RE = re.compile(r':(?:-soup-)?contains\(')
+_XPATH_CONTAINS_TEXT_RE = re.compile(r'contains\(text\(\),"([^"]+)"\)')
+
+# Ngưỡng quality theo thứ tự tăng dần cho bisect_right (>= ngưỡng thì lên mức);
+# confidence không > 0.0 (kể cả NaN) là FAILED, kiểm tra trước khi bisect
+_QUALITY_THRESHOLDS = (0.5, 0.7, 0.9)
+_QUALITY_LEVELS = (
+    ExtractionQuality.POOR, ExtractionQuality.MODERATE,
+    ExtractionQuality.GOOD, ExtractionQuality.EXCELLENT
+)
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(pattern: str, flags: int) -> Pattern:
+    """Biên dịch và giữ lại regex dựng từ keyword/chuỗi động"""
+    return re.compile(pattern, flags)
+
+
+def _as_regex(pattern: Union[str, Pattern], flags: int) -> Pattern:
+    """Nhận cả pattern đã biên dịch lẫn chuỗi thô (caller cũ)"""
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    return _compile_cached(pattern, flags)
+
+
+# Cú pháp có nghĩa khác nhau giữa pattern bytes và str (Unicode): lớp \s\w\d\b,
+# escape mã ký tự/số, '.'/lớp phủ định (khớp từng byte của ký tự nhiều byte) và inline flag
+_BYTES_UNSAFE_RE = re.compile(r'\\[sSwWdDbBxuUN0-9]|\.|\[\^|\(\?[a-zA-Z]')
+
+
+@lru_cache(maxsize=1024)
+def _bytes_regex(pattern: str, flags: int) -> Optional[Pattern]:
+    """
+    Bản bytes của pattern nếu nó khớp y hệt bản str trên HTML UTF-8, không thì None
+
+    Chỉ pattern ASCII, không IGNORECASE (re.I trên str còn khớp K/ſ/İ...) và không
+    dùng cú pháp trong _BYTES_UNSAFE_RE; khi đó mọi ký tự khớp đều là 1 byte ASCII.
+    """
+    if flags & re.IGNORECASE or not pattern.isascii() or _BYTES_UNSAFE_RE.search(pattern):
+        return None
+    try:
+        return re.compile(pattern.encode('ascii'), flags & ~re.UNICODE)
+    except re.error:
+        return None
+
+
+class _HTMLSource:
+    """HTML dạng str hoặc bytes UTF-8; bytes chỉ được decode khi có pattern cần chạy trên str"""
+
+    __slots__ = ('raw', '_text')
+
+    def __init__(self, html: Union[str, bytes]):
+        self.raw = html
+        self._text = html if isinstance(html, str) else None
+
+    def target(self, regex: Pattern) -> Tuple[Pattern, Union[str, bytes]]:
+        """(regex, nội dung) để quét: bytes khi pattern an toàn, không thì str"""
+        if self.raw is self._text:
+            return regex, self._text
+        raw_regex = _bytes_regex(regex.pattern, regex.flags)
+        if raw_regex is not None:
+            return raw_regex, self.raw
+        if self._text is None:
+            self._text = self.raw.decode('utf-8', 'replace')
+        return regex, self._text
+
+
+# Keyword chứa ký tự regex thì vẫn so khớp bằng re.search như trước
+_REGEX_META_RE = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+class _PerSoupCache:
+    """
+    Cache kết quả theo danh tính của soup/tree
+
+    Không dùng soup làm khoá dict/WeakKeyDictionary vì Tag.__hash__ serialize
+    toàn bộ cây; khoá là id() kèm weakref để kiểm tra và tự dọn khi soup bị thu hồi.
+    Giá trị có thể tham chiếu ngược tới soup (vd. text nodes) nên cache còn giới hạn
+    maxsize trang gần nhất. Giả định soup không bị sửa sau khi đã cache.
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self.maxsize = maxsize
+        self._entries: Dict[int, Tuple[weakref.ref, Any]] = {}
+
+    def get(self, soup: Any) -> Any:
+        entry = self._entries.get(id(soup))
+        if entry is not None and entry[0]() is soup:
+            return entry[1]
+        return None
+
+    def put(self, soup: Any, value: Any) -> None:
+        key = id(soup)
+        entries = self._entries
+
+        def _evict(ref, key=key, entries=entries):
+            entry = entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del entries[key]
+
+        try:
+            ref = weakref.ref(soup, _evict)
+        except TypeError:
+            # Tree không hỗ trợ weakref thì bỏ qua cache
+            return
+        entries.pop(key, None)
+        entries[key] = (ref, value)
+        while len(entries) > self.maxsize:
+            del entries[next(iter(entries))]
+
+
+class _PageTextIndex:
+    """
+    Text nodes của một soup, lowercase và nối bằng '\\x00' thành một chuỗi
+
+    Keyword literal được tìm trên chuỗi này (str.find/Aho-Corasick, chạy trong C)
+    rồi tra ngược node gốc bằng bisect trên offset bắt đầu của từng node.
+    """
+
+    __slots__ = ('nodes', 'starts', 'text')
+
+    def __init__(self, soup: BeautifulSoup):
+        self.nodes: List[NavigableString] = []
+        self.starts: List[int] = []
+        parts: List[str] = []
+        offset = 0
+        for node in soup.descendants:
+            if isinstance(node, NavigableString):
+                lowered = node.lower()
+                self.nodes.append(node)
+                self.starts.append(offset)
+                parts.append(lowered)
+                offset += len(lowered) + 1
+        self.text = '\x00'.join(parts)
+
+    def node_index(self, offset: int) -> int:
+        return bisect_right(self.starts, offset) - 1
+
+
+class _KeywordScanner:
+    """Tìm mọi context keyword (không phân biệt hoa thường) trong các text node của trang"""
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self._by_lowered: Dict[str, List[str]] = {}
+        self._regexes: List[Tuple[str, Pattern]] = []
+        for keyword in keywords:
+            if not keyword or _REGEX_META_RE.search(keyword):
+                try:
+                    self._regexes.append((keyword, _compile_cached(keyword, re.IGNORECASE)))
+                except re.error:
+                    # Như find_all() cũ: keyword regex lỗi thì không bao giờ khớp
+                    continue
+            else:
+                self._by_lowered.setdefault(keyword.lower(), []).append(keyword)
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and self._by_lowered:
+            self._automaton = ahocorasick.Automaton()
+            for lowered in self._by_lowered:
+                self._automaton.add_word(lowered, lowered)
+            self._automaton.make_automaton()
+
+    def find_hits(self, index: _PageTextIndex) -> Dict[str, List[NavigableString]]:
+        """Keyword gốc -> các text node chứa nó, theo thứ tự trong document"""
+        hit_indexes: Dict[str, List[int]] = {}
+
+        def add(keyword: str, node_idx: int):
+            found = hit_indexes.setdefault(keyword, [])
+            if not found or found[-1] != node_idx:
+                found.append(node_idx)
+
+        if self._automaton is not None:
+            # Offset kết thúc tăng dần nên node của mỗi keyword cũng theo thứ tự document
+            for end, lowered in self._automaton.iter(index.text):
+                node_idx = index.node_index(end - len(lowered) + 1)
+                for keyword in self._by_lowered[lowered]:
+                    add(keyword, node_idx)
+        else:
+            for lowered, originals in self._by_lowered.items():
+                pos = index.text.find(lowered)
+                while pos != -1:
+                    node_idx = index.node_index(pos)
+                    for keyword in originals:
+                        add(keyword, node_idx)
+                    # Mỗi node chỉ cần một lần, nhảy sang node kế tiếp
+                    if node_idx + 1 >= len(index.starts):
+                        break
+                    pos = index.text.find(lowered, index.starts[node_idx + 1])
+
+        for keyword, regex in self._regexes:
+            for node_idx, node in enumerate(index.nodes):
+                if regex.search(node):
+                    add(keyword, node_idx)
+
+        return {keyword: [index.nodes[i] for i in idxs] for keyword, idxs in hit_indexes.items()}
+
+
+def _first_match(regex: Pattern, text: Union[str, bytes], min_length: int = 0) -> Optional[str]:
+    """
+    Match đầu tiên (đã strip) dài hơn min_length, dừng ngay khi tìm thấy
+
+    Cùng kết quả với việc duyệt regex.findall() (group 1 nếu pattern có group)
+    nhưng không dựng list mọi match trên toàn bộ HTML. Với bytes chỉ decode đoạn khớp.
+    """
+    has_groups = regex.groups > 0
+    for m in regex.finditer(text):
+        match = m.group(1) if has_groups else m.group(0)
+        if match:
+            if not isinstance(match, str):
+                match = match.decode('utf-8')
+            match = match.strip()
+            if len(match) > min_length:
+                return match
+    return None
+
+
+def _iter_tags_with_text(root: Tag):
+    """
+    Duyệt các tag con cháu của root theo thứ tự find_all(), kèm text đã strip
+
+    Tag có text rỗng bị bỏ qua cùng toàn bộ subtree (con cháu của nó cũng chỉ
+    chứa khoảng trắng), nên không phải gọi get_text() lại cho từng node trong đó.
+    """
+    stack = list(reversed(root.find_all(recursive=False)))
+    while stack:
+        tag = stack.pop()
+        text = tag.get_text().strip()
+        if not text:
+            continue
+        yield tag, text
+        stack.extend(reversed(tag.find_all(recursive=False)))
+
+
+@lru_cache(maxsize=256)
+def _to_lexbor_selector(selector: str) -> str:
+    """Chuyển selector kiểu soupsieve sang cú pháp lexbor"""
+    return _SOUP_CONTAINS_RE.sub(':lexbor-contains(', selector)
+
+
+def _is_lexbor_tree(tree: Any) -> bool:
+    return SELECTOLAX_AVAILABLE and isinstance(tree, LexborHTMLParser)
+
+
+def _element_text(element: Any) -> str:
+    """Text đã strip của một element BeautifulSoup hoặc node lexbor"""
+    if isinstance(element, Tag):
+        return element.get_text().strip()
+    return element.text().strip()
 
 
 class BaseExtractor:
@@ -31,25 +306,121 @@ class BaseExtractor:
         self.logger = logging.getLogger(self.__class__.__name__)
         self.field_patterns = FieldPatternsConfig.get_optimized_patterns()
         self.normalization_maps = NormalizationMappingsConfig.get_normalization_maps()
-        
+        self._err_penalty = ERROR_PENALTIES['validation_error_penalty']
+        # Dùng lexbor cho analyze/CSS khi có selectolax; context/XPath vẫn chạy trên BeautifulSoup
+        self.use_lexbor = SELECTOLAX_AVAILABLE
+        # Cache selector soupsieve đã biên dịch (None = selector không hợp lệ)
+        self._compiled_selectors: Dict[str, Optional[soupsieve.SoupSieve]] = {}
+        # Scanner context keyword theo từng danh sách keyword
+        self._context_scanners: Dict[Tuple[str, ...], _KeywordScanner] = {}
+        for pattern in self.field_patterns.values():
+            for selector in pattern.css_selectors:
+                self._get_compiled_selector(selector)
+            self._get_context_scanner(pattern.context_keywords)
+        # Kết quả tính trên từng soup, dùng lại giữa các field của cùng một trang
+        self._text_index_cache = _PerSoupCache()
+        self._analysis_cache = _PerSoupCache()
+
+    def _get_text_index(self, soup: BeautifulSoup) -> _PageTextIndex:
+        """Dựng text index một lần cho mỗi soup (soup không bị sửa trong quá trình extract)"""
+        index = self._text_index_cache.get(soup)
+        if index is None:
+            index = _PageTextIndex(soup)
+            self._text_index_cache.put(soup, index)
+        return index
+
+    def _get_context_scanner(self, keywords: List[str]) -> _KeywordScanner:
+        """Lấy (hoặc dựng một lần) scanner cho danh sách keyword"""
+        key = tuple(keywords)
+        scanner = self._context_scanners.get(key)
+        if scanner is None:
+            scanner = self._context_scanners[key] = _KeywordScanner(key)
+        return scanner
+
+    def _get_compiled_selector(self, selector: str) -> Optional[soupsieve.SoupSieve]:
+        """Lấy selector đã biên dịch, biên dịch một lần nếu chưa có trong cache"""
+        try:
+            return self._compiled_selectors[selector]
+        except KeyError:
+            pass
+        try:
+            sieve = soupsieve.compile(selector)
+        except Exception as e:
+            self.logger.debug(f"CSS selector {selector} failed: {e}")
+            sieve = None
+        self._compiled_selectors[selector] = sieve
+        return sieve
+
+    def parse_html(self, html_content: str) -> BeautifulSoup:
+        """
+        Parse HTML bằng lxml, một lần cho mỗi trang
+
+        Soup không lọc bằng SoupStrainer vì context search cần mọi text node (kể cả
+        text trong <font>/<center> hay text trần trong <body>); CSS, XPath và context
+        search dùng chung soup này.
+        """
+        return BeautifulSoup(html_content, 'lxml')
+
+    def build_css_tree(self, html_content: str, soup: BeautifulSoup) -> Any:
+        """Tree cho analyze_html_structure/extract_by_css_selectors: lexbor nếu có, không thì soup"""
+        if self.use_lexbor:
+            return LexborHTMLParser(html_content)
+        return soup
+
     def analyze_html_structure(self, soup: BeautifulSoup) -> HTMLAnalysis:
-        """Analyze HTML structure để optimize extraction strategy"""
+        """
+        Analyze HTML structure để optimize extraction strategy
+
+        Kết quả được cache theo soup.
+        """
+        cached = self._analysis_cache.get(soup)
+        if cached is not None:
+            return cached
+        if _is_lexbor_tree(soup):
+            analysis = self._analyze_lexbor_structure(soup)
+        else:
+            analysis = self._analyze_soup_structure(soup)
+        self._analysis_cache.put(soup, analysis)
+        return analysis
+
+    def _analyze_soup_structure(self, soup: BeautifulSoup) -> HTMLAnalysis:
+        """analyze_html_structure trên BeautifulSoup"""
         try:
-            table_count = len(soup.find_all('table'))
-            form_count = len(soup.find_all('form'))
-            div_count = len(soup.find_all('div'))
+            # Một lần duyệt cây thay cho 7 lần find_all() + get_text()
+            text_types = getattr(soup, 'interesting_string_types', None) or _MAIN_CONTENT_STRING_TYPES
+            if isinstance(text_types, type):
+                text_types = (text_types,)
+            counts: Dict[str, int] = {}
+            total_elements = 0
+            text_length = 0
+            has_json_script = False
+
+            for el in soup.descendants:
+                if isinstance(el, Tag):
+                    total_elements += 1
+                    name = el.name
+                    counts[name] = counts.get(name, 0) + 1
+                    if name == 'script' and not has_json_script:
+                        script_text = el.string
+                        has_json_script = script_text is not None and _JSON_SCRIPT_RE.search(script_text) is not None
+                elif type(el) in text_types:
+                    text_length += len(el)
+
+            table_count = counts.get('table', 0)
+            form_count = counts.get('form', 0)
+            div_count = counts.get('div', 0)
             
             structure_type = self._determine_structure_type(table_count, form_count, div_count)
             
             return HTMLAnalysis(
-                total_elements=len(soup.find_all()),
+                total_elements=total_elements,
                 table_count=table_count,
                 div_count=div_count,
-                span_count=len(soup.find_all('span')),
+                span_count=counts.get('span', 0),
                 form_count=form_count,
-                input_count=len(soup.find_all('input')),
-                has_json_script=bool(soup.find_all('script', string=re.compile(r'\{.*\}'))),
-                text_length=len(soup.get_text()),
+                input_count=counts.get('input', 0),
+                has_json_script=has_json_script,
+                text_length=text_length,
                 structure_type=structure_type
             )
         except Exception as e:
@@ -60,6 +431,33 @@ class BaseExtractor:
                 text_length=0, structure_type=StructureType.MIXED_STRUCTURE.value
             )
 
+    def _analyze_lexbor_structure(self, tree: Any) -> HTMLAnalysis:
+        """analyze_html_structure trên tree lexbor (các truy vấn css chạy trong C)"""
+        try:
+            table_count = len(tree.css('table'))
+            form_count = len(tree.css('form'))
+            div_count = len(tree.css('div'))
+            root = tree.body or tree.root
+
+            return HTMLAnalysis(
+                total_elements=len(tree.css('*')),
+                table_count=table_count,
+                div_count=div_count,
+                span_count=len(tree.css('span')),
+                form_count=form_count,
+                input_count=len(tree.css('input')),
+                has_json_script=any(_JSON_SCRIPT_RE.search(node.text()) for node in tree.css('script')),
+                text_length=len(root.text()) if root is not None else 0,
+                structure_type=self._determine_structure_type(table_count, form_count, div_count)
+            )
+        except Exception as e:
+            self.logger.error(f"Error analyzing HTML structure: {e}")
+            return HTMLAnalysis(
+                total_elements=0, table_count=0, div_count=0, span_count=0,
+                form_count=0, input_count=0, has_json_script=False,
+                text_length=0, structure_type=StructureType.MIXED_STRUCTURE.value
+            )
+
     def _determine_structure_type(self, table_count: int, form_count: int, div_count: int) -> str:
         """Determine HTML structure type để chọn strategy phù hợp"""
         if table_count > STRUCTURE_THRESHOLDS['table_count_for_table_based']:
@@ -73,9 +471,16 @@ class BaseExtractor:
 
     def extract_by_css_selectors(self, soup: BeautifulSoup, field_name: str, selectors: List[str]) -> Optional[str]:
         """Extract using CSS selectors với enhanced logic"""
+        lexbor = _is_lexbor_tree(soup)
         for selector in selectors:
             try:
-                elements = soup.select(selector)
+                if lexbor:
+                    elements = soup.css(_to_lexbor_selector(selector))
+                else:
+                    sieve = self._get_compiled_selector(selector)
+                    if sieve is None:
+                        continue
+                    elements = sieve.select(soup)
                 
                 # Special handling for thong_tin_thanh_vien - aggregate multiple elements
                 if field_name == 'thong_tin_thanh_vien' and elements:
@@ -84,7 +489,7 @@ class BaseExtractor:
                 # Standard handling for other fields
                 else:
                     for element in elements:
-                        text = element.get_text().strip()
+                        text = _element_text(element)
                         if text and len(text) > 0:
                             return text
                             
@@ -99,7 +504,7 @@ class BaseExtractor:
             # Multiple elements found - combine them
             combined_text = []
             for element in elements:
-                text = element.get_text().strip()
+                text = _element_text(element)
                 if text and len(text) > 0:
                     # Skip header rows or irrelevant content
                     skip_headers = ['họ tên', 'quan hệ', 'năm sinh', 'name', 'relationship']
@@ -111,24 +516,22 @@ class BaseExtractor:
         
         # Single element or fallback
         for element in elements:
-            text = element.get_text().strip()
+            text = _element_text(element)
             if text and len(text) > 0:
                 return text
         
         return None
 
-    def extract_by_regex(self, html_content: str, field_name: str, patterns: List[str]) -> Optional[str]:
-        """Extract using regex patterns"""
+    def extract_by_regex(self, html_content: Union[str, bytes], field_name: str,
+                         patterns: List[Union[str, Pattern]]) -> Optional[str]:
+        """Extract using regex patterns (HTML str hoặc bytes UTF-8)"""
+        source = _HTMLSource(html_content)
         for pattern in patterns:
             try:
-                matches = re.findall(pattern, html_content, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    # Return first non-empty match
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            match = match[0]
-                        if match and len(match.strip()) > 0:
-                            return match.strip()
+                # Return first non-empty match
+                match = _first_match(*source.target(_as_regex(pattern, REGEX_PATTERN_FLAGS)))
+                if match is not None:
+                    return match
             except Exception as e:
                 self.logger.debug(f"Regex pattern {pattern} failed: {e}")
                 continue
@@ -136,12 +539,13 @@ class BaseExtractor:
 
     def extract_by_context(self, soup: BeautifulSoup, field_name: str, keywords: List[str]) -> Optional[str]:
         """Extract by searching context keywords"""
+        # Tìm mọi keyword trên text index của soup thay vì một find_all() mỗi keyword
+        hits = self._get_context_scanner(keywords).find_hits(self._get_text_index(soup))
+
+        # Giữ thứ tự ưu tiên: theo keyword, rồi theo thứ tự trong document
         for keyword in keywords:
             try:
-                # Find elements containing keyword
-                elements = soup.find_all(text=re.compile(keyword, re.IGNORECASE))
-                
-                for element in elements:
+                for element in hits.get(keyword, ()):
                     parent = element.parent
                     if parent:
                         # Look for value in siblings or children
@@ -160,11 +564,11 @@ class BaseExtractor:
                 # Convert simple XPath to BeautifulSoup equivalent
                 if '//td[contains(text(),' in xpath:
                     # Extract search text
-                    search_match = re.search(r'contains\(text\(\),"([^"]+)"\)', xpath)
+                    search_match = _XPATH_CONTAINS_TEXT_RE.search(xpath)
                     if search_match:
                         search_text = search_match.group(1)
                         # Find td containing text
-                        tds = soup.find_all('td', string=re.compile(search_text, re.IGNORECASE))
+                        tds = soup.find_all('td', string=_compile_cached(search_text, re.IGNORECASE))
                         for td in tds:
                             # Look for following sibling
                             next_td = td.find_next_sibling('td')
@@ -177,18 +581,19 @@ class BaseExtractor:
                 continue
         return None
 
-    def extract_by_fallback(self, html_content: str, field_name: str, fallback_patterns: List[str]) -> Optional[str]:
-        """Extract using fallback patterns when main methods fail"""
+    def extract_by_fallback(self, html_content: Union[str, bytes], field_name: str,
+                            fallback_patterns: List[Union[str, Pattern]]) -> Optional[str]:
+        """Extract using fallback patterns when main methods fail (HTML str hoặc bytes UTF-8)"""
+        source = _HTMLSource(html_content)
         for pattern in fallback_patterns:
             try:
-                matches = re.findall(pattern, html_content)
-                if matches:
-                    # Return first reasonable match
-                    for match in matches:
-                        if isinstance(match, tuple):
-                            match = match[0]
-                        if match and len(match.strip()) > PROCESSING_LIMITS['min_text_length_for_processing']:
-                            return match.strip()
+                # Return first reasonable match
+                match = _first_match(
+                    *source.target(_as_regex(pattern, FALLBACK_PATTERN_FLAGS)),
+                    PROCESSING_LIMITS['min_text_length_for_processing']
+                )
+                if match is not None:
+                    return match
             except Exception as e:
                 self.logger.debug(f"Fallback pattern {pattern} failed: {e}")
                 continue
@@ -197,19 +602,19 @@ class BaseExtractor:
     def _find_value_near_keyword(self, element, keyword: str) -> Optional[str]:
         """Find value near keyword element"""
         try:
+            keyword_lower = keyword.lower()
+            
             # Check siblings
             for sibling in element.find_next_siblings():
                 text = sibling.get_text().strip()
-                if text and len(text) > 0 and text.lower() != keyword.lower():
+                if text and len(text) > 0 and text.lower() != keyword_lower:
                     return text
             
             # Check parent's other children
             if element.parent:
-                for child in element.parent.find_all():
-                    if child != element:
-                        text = child.get_text().strip()
-                        if text and len(text) > 0 and keyword.lower() not in text.lower():
-                            return text
+                for child, text in _iter_tags_with_text(element.parent):
+                    if child != element and keyword_lower not in text.lower():
+                        return text
             
             return None
         except Exception:
@@ -222,8 +627,7 @@ class BaseExtractor:
             confidence = base_confidence
             
             # Adjust for validation errors
-            from ..config.constants import ERROR_PENALTIES
-            error_penalty = len(validation_errors) * ERROR_PENALTIES['validation_error_penalty']
+            error_penalty = len(validation_errors) * self._err_penalty
             confidence -= error_penalty
             
             # Adjust for extraction method
@@ -238,18 +642,9 @@ class BaseExtractor:
 
     def determine_quality_level(self, confidence: float):
         """Determine quality level based on confidence score"""
-        from ..config.constants import ExtractionQuality
-        
-        if confidence >= 0.9:
-            return ExtractionQuality.EXCELLENT
-        elif confidence >= 0.7:
-            return ExtractionQuality.GOOD
-        elif confidence >= 0.5:
-            return ExtractionQuality.MODERATE
-        elif confidence > 0.0:
-            return ExtractionQuality.POOR
-        else:
+        if not confidence > 0.0:
             return ExtractionQuality.FAILED
+        return _QUALITY_LEVELS[bisect_right(_QUALITY_THRESHOLDS, confidence)]
 
     def get_normalization_applied(self, field_name: str, original: str, normalized: Any) -> List[str]:
         """Get list of normalization steps applied"""
@@ -11,10 +11,107 @@ Version: 2.1
 
 import re
 import logging
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from ..config.data_models import MemberInfo, NormalizedIncome, NormalizedBank
 from ..config.patterns import NormalizationMappingsConfig
 
+# Optional: google-re2 (DFA, thời gian tuyến tính, không backtracking) cho các pattern tên/quan hệ
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# Optional: pyahocorasick cho tra mã ngân hàng trong một lần quét
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+# Patterns của MemberInfoNormalizer, biên dịch một lần ở cấp module
+_VN_UPPER = "A-ZÀÁẢÃẠÂẤẦẨẪẬĂẮẰẲẴẶÈÉẺẼẸÊẾỀỂỄỆÍÌỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴĐ"
+_VN_LOWER = "a-zàáảãạâấầẩẫậăắằẳẵặèéẻẽẹêếềểễệíìỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ"
+# Tên tiếng Việt: chữ hoa đầu, theo sau là chữ thường/khoảng trắng
+_NAME_RE = rf"[{_VN_UPPER}][{_VN_LOWER}\s]+"
+_REL_RE = "(Vợ|Chồng|Con|Cha|Mẹ|Anh|Chị|Em)"
+# \s của RE2 chỉ là ASCII; class này khớp đúng các ký tự str.isspace() như \s của re
+_RE2_SPACE_CLASS = r"\t-\r\x{1c}-\x{1f}\x{85}\p{Z}"
+# re.IGNORECASE coi İ/ı là biến thể của i, RE2 thì không
+_RE2_EXTRA_I_CLASS = r"\x{130}\x{131}"
+
+
+def _to_re2_syntax(pattern: str) -> str:
+    """Chuyển pattern re (IGNORECASE) sang cú pháp RE2 tương đương"""
+    out = []
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escape = pattern[i:i + 2]
+            if escape == r'\s':
+                out.append(_RE2_SPACE_CLASS if in_class else f"[{_RE2_SPACE_CLASS}]")
+            else:
+                out.append(escape)
+            i += 2
+            continue
+        if char == '[' and not in_class:
+            in_class = True
+        elif char == ']' and in_class:
+            in_class = False
+        elif in_class and pattern[i:i + 3] in ('a-z', 'A-Z'):
+            out.append(pattern[i:i + 3] + _RE2_EXTRA_I_CLASS)
+            i += 3
+            continue
+        out.append(char)
+        i += 1
+    return '(?i)' + ''.join(out)
+
+
+def _compile_member_pattern(pattern: str):
+    """Biên dịch bằng RE2 nếu có, không thì re với IGNORECASE"""
+    if RE2_AVAILABLE:
+        try:
+            return re2.compile(_to_re2_syntax(pattern))
+        except Exception:
+            pass
+    return re.compile(pattern, re.IGNORECASE)
+
+
+# Probe rẻ cho từng định dạng, chạy trước regex đầy đủ của định dạng đó
+_TABLE_ROW_PROBE = re.compile(r'<tr>', re.IGNORECASE)
+_TR_ROW_PATTERN = re.compile(r'<tr>\s*<td>([^<]+)</td>\s*<td>([^<]+)</td>\s*<td>([^<]+)</td>\s*</tr>', re.IGNORECASE)
+_JSON_MEMBER_PATTERN = re.compile(r'"name":\s*"([^"]+)"[^}]*"relation":\s*"([^"]+)"[^}]*"birth_year":\s*"([^"]+)"')
+# "Name - Relationship - Year"
+_PATTERN1 = _compile_member_pattern(rf"({_NAME_RE})\s*-\s*{_REL_RE}\s*-\s*([0-9]{{4}})")
+# "Relationship: Name (Year)" hoặc "Relationship - Name (Year)"
+_PATTERN2 = _compile_member_pattern(rf"{_REL_RE}[:\s-]*({_NAME_RE}?)(?:\s*\(([0-9]{{4}})\))?")
+# "Name: Relationship"
+_PATTERN3 = _compile_member_pattern(rf"({_NAME_RE})(?:\s*:\s*)?{_REL_RE}")
+_REL_PATTERN = _compile_member_pattern(rf"({_NAME_RE}).*?{_REL_RE}")
+# Mọi member từ structured/delimited text đều chứa một từ quan hệ
+_REL_WORD_PATTERN = re.compile(_REL_RE, re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r'\b(19|20)\d{2}\b')
+_SEGMENT_SPLIT_PATTERN = re.compile(r'[,;\n\r]')
+_NAME_PUNCT_PATTERN = re.compile(r'[:-]')
+# Từ quan hệ (chữ thường) dùng lọc segment trong delimited text
+_DELIMITED_REL_WORDS = ('vợ', 'chồng', 'con', 'cha', 'mẹ', 'anh', 'chị', 'em')
+
+# Phone/household code: xoá ký tự bằng str.translate (C) thay cho re.sub trên chuỗi ngắn.
+# Bảng phủ Latin, tiếng Việt và các khoảng trắng thường gặp; ký tự ngoài bảng
+# (có thể là chữ số Unicode khác) vẫn đi qua _NON_DIGIT_PATTERN như \D trước đây.
+_NON_DIGIT_TABLE = {
+    code: None
+    for block in (range(0x250), range(0x1E00, 0x1F00), range(0x2000, 0x2070), (0x3000, 0xFEFF))
+    for code in block
+    if not chr(code).isdecimal()
+}
+_NON_DIGIT_PATTERN = re.compile(r'\D')
+_VN_PHONE_PATTERN = re.compile(r'^0[1-9][0-9]{8,9}$')
+_HOUSEHOLD_CODE_PATTERN = re.compile(r'^[A-Z0-9]{8,15}$')
+
 
 class BaseNormalizer:
     """Base normalizer class"""
@@ -38,14 +135,16 @@ class PhoneNormalizer(BaseNormalizer):
         
         try:
             # Remove all non-digits
-            digits = re.sub(r'\D', '', phone)
+            digits = phone.translate(_NON_DIGIT_TABLE)
+            if not digits.isascii():
+                digits = _NON_DIGIT_PATTERN.sub('', digits)
             
             # Handle +84 prefix
             if digits.startswith('84') and len(digits) >= 10:
                 digits = '0' + digits[2:]
             
             # Validate Vietnam phone format
-            if re.match(r'^0[1-9][0-9]{8,9}$', digits):
+            if _VN_PHONE_PATTERN.match(digits):
                 return digits
             
             return phone  # Return original if can't normalize
@@ -58,28 +157,54 @@ class PhoneNormalizer(BaseNormalizer):
 class IncomeNormalizer(BaseNormalizer):
     """Income normalizer"""
     
+    def __init__(self):
+        super().__init__()
+        self._multipliers = {unit.lower(): value for unit, value in self.normalization_maps['currency_multipliers'].items()}
+        # Số tiền đầu tiên và đơn vị đứng ngay sau nó (key dài trước, không dính chữ phía sau)
+        units = '|'.join(re.escape(unit) for unit in sorted(self._multipliers, key=len, reverse=True))
+        self._money_pattern = re.compile(rf'(\d[\d,.]*)(?:\s*({units})(?!\w))?', re.IGNORECASE)
+        # Dấu nối 2 cận của khoảng thu nhập ("10 - 15 triệu", "10 đến 15 triệu")
+        self._range_separator = re.compile(r'\s*(?:-|–|—|~|đến|tới|to)\s*', re.IGNORECASE)
+    
     def normalize(self, income: str) -> NormalizedIncome:
         """Normalize income value"""
         if not income:
             return None
         
         try:
-            # Extract numeric value
-            numeric_str = re.sub(r'[^\d,.]', '', income)
-            numeric_str = numeric_str.replace(',', '').replace('.', '')
+            # Extract numeric value và đơn vị; chỉ xét thêm các số đứng ngay sau số đầu tiên
+            matches = self._money_pattern.finditer(income)
+            match = next(matches, None)
             
-            if numeric_str:
-                amount = int(numeric_str)
+            if match:
+                amount = int(match.group(1).translate(_NON_DIGIT_TABLE))
                 
                 # Detect currency unit and apply multiplier
                 currency = 'VND'
                 multiplier_applied = None
                 
-                for unit, multiplier in self.normalization_maps['currency_multipliers'].items():
-                    if unit in income.lower():
-                        amount *= multiplier
-                        multiplier_applied = unit
-                        break
+                unit = match.group(2)
+                following = next(matches, None)
+                if (not unit and following is not None and following.group(2)
+                        and self._range_separator.fullmatch(income, match.end(), following.start())):
+                    # Khoảng "10 - 15 triệu": đơn vị sau cận trên áp dụng cho cả cận dưới
+                    unit = following.group(2)
+                
+                if unit:
+                    multiplier_applied = unit.lower()
+                    multiplier = self._multipliers[multiplier_applied]
+                    amount *= multiplier
+                    
+                    # Đơn vị ghép "12 triệu 500 nghìn": cộng các phần liền sau có đơn vị nhỏ dần
+                    previous = match
+                    while (following is not None and following.group(2)
+                           and not income[previous.end():following.start()].strip()):
+                        following_multiplier = self._multipliers[following.group(2).lower()]
+                        if following_multiplier >= multiplier:
+                            break
+                        amount += int(following.group(1).translate(_NON_DIGIT_TABLE)) * following_multiplier
+                        multiplier = following_multiplier
+                        previous, following = following, next(matches, None)
                 
                 return NormalizedIncome(
                     amount=amount,
@@ -109,8 +234,78 @@ class IncomeNormalizer(BaseNormalizer):
             )
 
 
+class _BankCodeMatcher:
+    """
+    Tìm mã ngân hàng trong chuỗi bằng automaton Aho-Corasick (một lần quét/chuỗi)
+
+    Khi nhiều mã cùng xuất hiện, mã đứng trước trong mapping được ưu tiên,
+    giống thứ tự duyệt dict trước đây.
+    """
+
+    def __init__(self, banks: Dict[str, str]):
+        self._banks = list(banks.items())
+        self._exact = self._build_automaton(
+            (word, rank) for rank, (code, _) in enumerate(self._banks) for word in (code, code.lower())
+        )
+        # Mã một từ đã được phủ bởi exact match, chỉ mã nhiều từ mới cần partial
+        self._partial = self._build_automaton(
+            (word, rank) for rank, (code, _) in enumerate(self._banks)
+            if len(code.split()) > 1 for word in code.split()
+        )
+
+    @staticmethod
+    def _build_automaton(words) -> Optional['ahocorasick.Automaton']:
+        # words đến theo thứ tự rank tăng dần, giữ rank nhỏ nhất cho mỗi từ
+        ranks: Dict[str, int] = {}
+        for word, rank in words:
+            if word:
+                ranks.setdefault(word, rank)
+        if not ranks:
+            return None
+        automaton = ahocorasick.Automaton()
+        for word, rank in ranks.items():
+            automaton.add_word(word, rank)
+        automaton.make_automaton()
+        return automaton
+
+    def match(self, bank: str) -> Optional[Tuple[str, str, bool]]:
+        """Trả về (code, full_name, is_exact) hoặc None"""
+        bank_upper = bank.upper().strip()
+        ranks = [rank for text in (bank_upper, bank.lower()) for _, rank in self._exact.iter(text)]
+        if ranks:
+            code, full_name = self._banks[min(ranks)]
+            return code, full_name, True
+        if self._partial is not None:
+            ranks = [rank for _, rank in self._partial.iter(bank_upper)]
+            if ranks:
+                code, full_name = self._banks[min(ranks)]
+                return code, full_name, False
+        return None
+
+
 class BankNormalizer(BaseNormalizer):
     """Bank name normalizer"""
+
+    def __init__(self):
+        super().__init__()
+        banks = self.normalization_maps['banks']
+        self._bank_matcher = _BankCodeMatcher(banks) if AHOCORASICK_AVAILABLE and banks else None
+
+    def _scan_banks(self, bank: str) -> Optional[Tuple[str, str, bool]]:
+        """Dò mapping tuần tự khi không có pyahocorasick"""
+        bank_upper = bank.upper().strip()
+        
+        # Check exact matches in mapping
+        for code, full_name in self.normalization_maps['banks'].items():
+            if code in bank_upper or code.lower() in bank.lower():
+                return code, full_name, True
+        
+        # Check partial matches
+        for code, full_name in self.normalization_maps['banks'].items():
+            if any(word in bank_upper for word in code.split()):
+                return code, full_name, False
+        
+        return None
     
     def normalize(self, bank: str) -> NormalizedBank:
         """Normalize bank name"""
@@ -118,29 +313,20 @@ class BankNormalizer(BaseNormalizer):
             return None
         
         try:
-            bank_upper = bank.upper().strip()
-            
-            # Check exact matches in mapping
-            for code, full_name in self.normalization_maps['banks'].items():
-                if code in bank_upper or code.lower() in bank.lower():
-                    return NormalizedBank(
-                        code=code,
-                        full_name=full_name,
-                        original=bank,
-                        match_type="exact",
-                        confidence=1.0
-                    )
+            if self._bank_matcher is not None:
+                hit = self._bank_matcher.match(bank)
+            else:
+                hit = self._scan_banks(bank)
             
-            # Check partial matches
-            for code, full_name in self.normalization_maps['banks'].items():
-                if any(word in bank_upper for word in code.split()):
-                    return NormalizedBank(
-                        code=code,
-                        full_name=full_name,
-                        original=bank,
-                        match_type="partial",
-                        confidence=0.8
-                    )
+            if hit:
+                code, full_name, is_exact = hit
+                return NormalizedBank(
+                    code=code,
+                    full_name=full_name,
+                    original=bank,
+                    match_type="exact" if is_exact else "partial",
+                    confidence=1.0 if is_exact else 0.8
+                )
             
             return NormalizedBank(
                 code=None,
@@ -171,10 +357,10 @@ class HouseholdCodeNormalizer(BaseNormalizer):
         
         try:
             # Remove spaces and convert to uppercase
-            normalized = re.sub(r'\s+', '', code.upper())
+            normalized = ''.join(code.upper().split())
             
             # Validate format
-            if re.match(r'^[A-Z0-9]{8,15}$', normalized):
+            if _HOUSEHOLD_CODE_PATTERN.match(normalized):
                 return normalized
             
             return code  # Return original if doesn't match expected format
@@ -186,6 +372,15 @@ class HouseholdCodeNormalizer(BaseNormalizer):
 
 class MemberInfoNormalizer(BaseNormalizer):
     """Member information normalizer"""
+
+    def __init__(self):
+        super().__init__()
+        relationships = self.normalization_maps['relationships']
+        # Tra cứu trực tiếp cho quan hệ khớp đúng key, còn lại dò substring theo key dài trước
+        self._rel_exact = {key.lower(): value for key, value in relationships.items()}
+        self._rel_sub_keys = tuple(sorted(self._rel_exact.items(), key=lambda item: len(item[0]), reverse=True))
+        # Kết quả chuẩn hoá theo chuỗi quan hệ gốc; tập giá trị thực tế rất nhỏ
+        self._rel_cache: Dict[str, str] = {}
     
     def normalize(self, member_text: str) -> List[MemberInfo]:
         """Normalize member information với enhanced logic cho multiple formats"""
@@ -199,10 +394,11 @@ class MemberInfoNormalizer(BaseNormalizer):
             members.extend(self._extract_from_table_rows(member_text))
             if not members:
                 members.extend(self._extract_from_json(member_text))
-            if not members:
+            # Một lần quét tìm từ quan hệ; không có thì bỏ qua các pattern structured/delimited
+            if not members and _REL_WORD_PATTERN.search(member_text):
                 members.extend(self._extract_from_structured_text(member_text))
-            if not members:
-                members.extend(self._extract_from_delimited_text(member_text))
+                if not members:
+                    members.extend(self._extract_from_delimited_text(member_text))
             
             # Remove duplicates and return
             return self._remove_duplicates(members)
@@ -215,9 +411,8 @@ class MemberInfoNormalizer(BaseNormalizer):
         """Extract from table row format"""
         members = []
         
-        if '<tr>' in text.lower():
-            tr_pattern = r'<tr>\s*<td>([^<]+)</td>\s*<td>([^<]+)</td>\s*<td>([^<]+)</td>\s*</tr>'
-            tr_matches = re.findall(tr_pattern, text, re.IGNORECASE)
+        if _TABLE_ROW_PROBE.search(text):
+            tr_matches = _TR_ROW_PATTERN.findall(text)
             
             for match in tr_matches:
                 name, relationship, birth_year = [part.strip() for part in match]
@@ -235,8 +430,7 @@ class MemberInfoNormalizer(BaseNormalizer):
         members = []
         
         if '"name"' in text and '"relation' in text:
-            json_pattern = r'"name":\s*"([^"]+)"[^}]*"relation":\s*"([^"]+)"[^}]*"birth_year":\s*"([^"]+)"'
-            json_matches = re.findall(json_pattern, text)
+            json_matches = _JSON_MEMBER_PATTERN.findall(text)
             
             for match in json_matches:
                 name, relationship, birth_year = match
@@ -251,48 +445,39 @@ class MemberInfoNormalizer(BaseNormalizer):
     def _extract_from_structured_text(self, text: str) -> List[MemberInfo]:
         """Extract from structured text patterns"""
         members = []
+        append = members.append
+        normalize_relationship = self._normalize_relationship
         
         # Pattern 1: "Name - Relationship - Year"
-        pattern1 = r'([A-ZÀÁẢÃẠÂẤẦẨẪẬĂẮẰẲẴẶÈÉẺẼẸÊẾỀỂỄỆÍÌỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴĐ][a-zàáảãạâấầẩẫậăắằẳẵặèéẻẽẹêếềểễệíìỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ\s]+)\s*-\s*(Vợ|Chồng|Con|Cha|Mẹ|Anh|Chị|Em)\s*-\s*([0-9]{4})'
-        matches1 = re.findall(pattern1, text, re.IGNORECASE)
-        
-        for match in matches1:
-            name, relationship, birth_year = [part.strip() for part in match]
-            members.append(MemberInfo(
-                name=name,
-                relationship=self._normalize_relationship(relationship),
-                birth_year=birth_year
+        for name, relationship, birth_year in _PATTERN1.findall(text):
+            append(MemberInfo(
+                name=name.strip(),
+                relationship=normalize_relationship(relationship.strip()),
+                birth_year=birth_year.strip()
             ))
         
         # Pattern 2: "Relationship: Name (Year)" or "Relationship - Name (Year)"
-        pattern2 = r'(Vợ|Chồng|Con|Cha|Mẹ|Anh|Chị|Em)[:\s-]*([A-ZÀÁẢÃẠÂẤẦẨẪẬĂẮẰẲẴẶÈÉẺẼẸÊẾỀỂỄỆÍÌỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴĐ][a-zàáảãạâấầẩẫậăắằẳẵặèéẻẽẹêếềểễệíìỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ\s]+?)(?:\s*\(([0-9]{4})\))?'
-        matches2 = re.findall(pattern2, text, re.IGNORECASE)
-        
-        for match in matches2:
-            relationship, name, birth_year = match
+        for relationship, name, birth_year in _PATTERN2.findall(text):
             name = name.strip().rstrip(',').rstrip('(').strip()
-            members.append(MemberInfo(
+            append(MemberInfo(
                 name=name,
-                relationship=self._normalize_relationship(relationship),
+                relationship=normalize_relationship(relationship),
                 birth_year=birth_year if birth_year else None
             ))
         
         # Pattern 3: "Name: Relationship"
-        pattern3 = r'([A-ZÀÁẢÃẠÂẤẦẨẪẬĂẮẰẲẴẶÈÉẺẼẸÊẾỀỂỄỆÍÌỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴĐ][a-zàáảãạâấầẩẫậăắằẳẵặèéẻẽẹêếềểễệíìỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ\s]+)(?:\s*:\s*)?(Vợ|Chồng|Con|Cha|Mẹ|Anh|Chị|Em)'
-        matches3 = re.findall(pattern3, text, re.IGNORECASE)
-        
-        for match in matches3:
-            name, relationship = [part.strip() for part in match]
+        for name, relationship in _PATTERN3.findall(text):
+            name = name.strip()
             # Look for birth year nearby
             birth_year = None
-            year_pattern = r'\b(19|20)\d{2}\b'
-            year_match = re.search(year_pattern, text[text.find(name):text.find(name)+100])
+            start = text.find(name)
+            year_match = _YEAR_PATTERN.search(text[start:start + 100])
             if year_match:
                 birth_year = year_match.group(0)
             
-            members.append(MemberInfo(
+            append(MemberInfo(
                 name=name,
-                relationship=self._normalize_relationship(relationship),
+                relationship=normalize_relationship(relationship.strip()),
                 birth_year=birth_year
             ))
         
@@ -307,7 +492,7 @@ class MemberInfoNormalizer(BaseNormalizer):
             segments = text.split('|')
         else:
             # Split by commas, semicolons, or newlines
-            segments = re.split(r'[,;\n\r]', text)
+            segments = _SEGMENT_SPLIT_PATTERN.split(text)
         
         for segment in segments:
             segment = segment.strip()
@@ -315,24 +500,23 @@ class MemberInfoNormalizer(BaseNormalizer):
                 continue
             
             # Look for any relationship keywords
-            relationships = ['vợ', 'chồng', 'con', 'cha', 'mẹ', 'anh', 'chị', 'em']
-            if any(rel in segment.lower() for rel in relationships):
+            segment_lower = segment.lower()
+            if any(rel in segment_lower for rel in _DELIMITED_REL_WORDS):
                 member = {}
                 
                 # Try to extract name and relationship from the segment
-                rel_pattern = r'([A-ZÀÁẢÃẠÂẤẦẨẪẬĂẮẰẲẴẶÈÉẺẼẸÊẾỀỂỄỆÍÌỈĨỊÒÓỎÕỌÔỐỒỔỖỘƠỚỜỞỠỢÙÚỦŨỤƯỨỪỬỮỰỲÝỶỸỴĐ][a-zàáảãạâấầẩẫậăắằẳẵặèéẻẽẹêếềểễệíìỉĩịòóỏõọôốồổỗộơớờởỡợùúủũụưứừửữựỳýỷỹỵđ\s]+).*?(Vợ|Chồng|Con|Cha|Mẹ|Anh|Chị|Em)'
-                rel_match = re.search(rel_pattern, segment, re.IGNORECASE)
+                rel_match = _REL_PATTERN.search(segment)
                 
                 if rel_match:
                     name_part = rel_match.group(1).strip()
                     relationship_part = rel_match.group(2).strip()
                     
                     # Clean up name part
-                    name_part = re.sub(r'[:-]', '', name_part).strip()
+                    name_part = _NAME_PUNCT_PATTERN.sub('', name_part).strip()
                     
                     # Look for birth year in the segment
                     birth_year = None
-                    year_match = re.search(r'\b(19|20)\d{2}\b', segment)
+                    year_match = _YEAR_PATTERN.search(segment)
                     if year_match:
                         birth_year = year_match.group(0)
                     
@@ -350,27 +534,32 @@ class MemberInfoNormalizer(BaseNormalizer):
         if not relationship:
             return ""
         
+        cached = self._rel_cache.get(relationship)
+        if cached is not None:
+            return cached
+        
         rel_lower = relationship.lower().strip()
         
         # Check in mapping
-        for key, normalized in self.normalization_maps['relationships'].items():
-            if key in rel_lower:
-                return normalized
+        normalized = self._rel_exact.get(rel_lower)
+        if normalized is None:
+            normalized = next((value for key, value in self._rel_sub_keys if key in rel_lower), None)
+        if normalized is None:
+            normalized = relationship.title()
         
-        return relationship.title()
+        if len(self._rel_cache) < 1024:
+            self._rel_cache[relationship] = normalized
+        return normalized
 
     def _remove_duplicates(self, members: List[MemberInfo]) -> List[MemberInfo]:
         """Remove duplicate members based on name and relationship"""
-        unique_members = []
-        seen = set()
-        
+        # dict giữ member đầu tiên của mỗi khoá, theo thứ tự xuất hiện
+        unique_members: Dict[tuple, MemberInfo] = {}
         for member in members:
-            key = f"{member.name.lower().strip()}_{member.relationship.lower().strip()}"
-            if key not in seen and member.name and member.relationship:
-                seen.add(key)
-                unique_members.append(member)
+            if member.name and member.relationship:
+                unique_members.setdefault(member.dedupe_key, member)
         
-        return unique_members
+        return list(unique_members.values())
 
 
 class NormalizerFactory:
@@ -383,17 +572,24 @@ class NormalizerFactory:
         'ma_ho_gia_dinh': HouseholdCodeNormalizer,
         'thong_tin_thanh_vien': MemberInfoNormalizer
     }
+    # Normalizer không giữ state theo từng lần gọi nên mỗi field chỉ cần một instance
+    _instances: Dict[str, BaseNormalizer] = {}
     
     @classmethod
     def get_normalizer(cls, field_name: str) -> BaseNormalizer:
         """Get normalizer for field"""
-        normalizer_class = cls._normalizers.get(field_name)
-        if normalizer_class:
-            return normalizer_class()
-        else:
-            return BaseNormalizer()
+        normalizer = cls._instances.get(field_name)
+        if normalizer is None:
+            normalizer_class = cls._normalizers.get(field_name)
+            if normalizer_class:
+                normalizer = normalizer_class()
+            else:
+                normalizer = BaseNormalizer()
+            cls._instances[field_name] = normalizer
+        return normalizer
     
     @classmethod
     def register_normalizer(cls, field_name: str, normalizer_class: type):
         """Register custom normalizer"""
         cls._normalizers[field_name] = normalizer_class
+        cls._instances.pop(field_name, None)
@@ -9,54 +9,198 @@ Date: 2025-09-13
 Version: 2.1
 """
 
+import io
+import os
+import copy
 import logging
+import logging.handlers
+import atexit
+import queue
 import json
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+from functools import lru_cache
+from enum import Enum
+from typing import Dict, List, Any, Optional, Iterable, Tuple
 from datetime import datetime
 import hashlib
 from pathlib import Path
 
-from .config.data_models import ExtractionResult, ExtractionSummary
+from .config.data_models import (
+    ExtractionResult, ExtractionSummary, MemberInfo, NormalizedIncome, NormalizedBank, ValidationResult
+)
 from .config.constants import ExtractionQuality
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional: xxhash (xxh3, không phải hash mật mã) cho fingerprint nội dung
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Kiểu trả về nguyên trạng khi serialize (so khớp đúng type, không tính subclass)
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+# Marker trong stack của _convert_to_serializable: rời khỏi object có id tương ứng
+_PATH_EXIT = object()
+# Buffer ghi file export/report: ít syscall write hơn mặc định ~8 KB
+_WRITE_BUFFER_SIZE = 1 << 20
+# Theo từng lớp dataclass: (tên mọi field, tên field public theo thứ tự khai báo)
+_DATACLASS_FIELDS: Dict[type, Tuple[frozenset, Tuple[str, ...]]] = {}
+# Các dataclass kết quả đã biết: đi đường tắt trong _convert_to_serializable
+_DATACLASS_TYPES = frozenset((
+    ExtractionResult, ExtractionSummary, NormalizedIncome, NormalizedBank, MemberInfo, ValidationResult
+))
+# Giá trị field thuộc các kiểu này chắc chắn không callable, khỏi gọi callable()
+_PLAIN_VALUE_TYPES = _SCALAR_TYPES | {dict, list, tuple, datetime}
+
+
+def _public_attributes(obj: Any) -> Iterable[Tuple[str, Any]]:
+    """Các cặp (tên, giá trị) public trong __dict__ của obj, theo thứ tự trong __dict__"""
+    attrs = obj.__dict__
+    cls = type(obj)
+    fields = _DATACLASS_FIELDS.get(cls)
+    if fields is None and dataclasses.is_dataclass(cls):
+        names = tuple(f.name for f in dataclasses.fields(cls))
+        fields = _DATACLASS_FIELDS[cls] = (
+            frozenset(names), tuple(name for name in names if not name.startswith('_'))
+        )
+    # Instance chỉ có đúng các field (__init__ gán theo thứ tự khai báo) thì đọc thẳng theo tên
+    if fields is not None and attrs.keys() == fields[0]:
+        return [(name, attrs[name]) for name in fields[1]]
+    return [(key, value) for key, value in attrs.items() if not key.startswith('_')]
+
+
+def _dumps(obj: Any) -> bytes:
+    """JSON UTF-8 indent 2 như json.dumps(indent=2, ensure_ascii=False), ưu tiên orjson nếu có"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Kiểu orjson không hỗ trợ (vd. int > 64 bit) thì để stdlib xử lý như cũ
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON UTF-8, ưu tiên orjson nếu có"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity, số quá lớn... stdlib vẫn chấp nhận
+            pass
+    return json.loads(data.decode('utf-8'))
+
+
+# Logger dùng chung của mọi ExtractionLogger
+_EXTRACTION_LOGGER_NAME = 'VSS_ExtractorLogger'
+
+# Mỗi file log có 1 QueueHandler + QueueListener dùng chung (theo đường dẫn tuyệt đối),
+# dù có bao nhiêu ExtractionLogger ghi vào file đó
+_log_listeners: Dict[str, Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]] = {}
+_log_listeners_lock = threading.Lock()
+
+
+def _get_log_queue_handler(log_file: str) -> logging.handlers.QueueHandler:
+    """QueueHandler của file log (tạo listener và gắn vào logger ở lần đầu)"""
+    path = os.path.abspath(log_file)
+    with _log_listeners_lock:
+        entry = _log_listeners.get(path)
+        if entry is None:
+            handler = logging.FileHandler(path)
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            handler.setFormatter(formatter)
+            # Thread extraction chỉ đẩy record vào queue; ghi file chạy trên thread của listener
+            log_queue = queue.Queue(-1)
+            queue_handler = logging.handlers.QueueHandler(log_queue)
+            listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+            listener.start()
+            logging.getLogger(_EXTRACTION_LOGGER_NAME).addHandler(queue_handler)
+            _log_listeners[path] = entry = (queue_handler, listener)
+        return entry[0]
+
+
+def _stop_log_listener(path: str):
+    """Dừng listener của 1 file log (ghi hết các record còn trong queue) và đóng file"""
+    with _log_listeners_lock:
+        entry = _log_listeners.pop(path, None)
+    if entry is None:
+        return
+    queue_handler, listener = entry
+    logging.getLogger(_EXTRACTION_LOGGER_NAME).removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def _stop_all_log_listeners():
+    """Ghi nốt các record còn trong queue khi thoát"""
+    for path in list(_log_listeners):
+        _stop_log_listener(path)
+
 
 class ExtractionLogger:
-    """Enhanced logging for extraction operations"""
+    """
+    Enhanced logging for extraction operations
+    
+    Các instance cùng log_file dùng chung 1 listener thread và 1 file handle,
+    nên tạo nhiều ExtractionLogger không làm tăng số thread/handler.
+    """
     
     def __init__(self, log_file: Optional[str] = None):
-        self.logger = logging.getLogger('VSS_ExtractorLogger')
+        self.logger = logging.getLogger(_EXTRACTION_LOGGER_NAME)
+        self._log_path: Optional[str] = None
         
         if log_file:
-            handler = logging.FileHandler(log_file)
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+            _get_log_queue_handler(log_file)
+            self._log_path = os.path.abspath(log_file)
+    
+    def close(self):
+        """
+        Dừng ghi vào file log của instance này (ghi hết các record còn trong queue).
+        File dùng chung nên các instance khác cùng file cũng dừng ghi.
+        """
+        if self._log_path is not None:
+            _stop_log_listener(self._log_path)
+            self._log_path = None
     
+    # Message dùng %-format để chỉ format khi record thực sự được handler xử lý
     def log_extraction_start(self, field_count: int, html_size: int):
         """Log start of extraction"""
-        self.logger.info(f"Starting extraction for {field_count} fields, HTML size: {html_size} chars")
+        self.logger.info("Starting extraction for %s fields, HTML size: %s chars", field_count, html_size)
     
     def log_field_extraction(self, field_name: str, result: ExtractionResult):
         """Log individual field extraction result"""
-        status = "SUCCESS" if result.is_successful else "FAILED"
-        self.logger.info(
-            f"Field '{field_name}': {status} | "
-            f"Confidence: {result.confidence_score:.2f} | "
-            f"Method: {result.extraction_method} | "
-            f"Quality: {result.quality_level.value}"
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Field '%s': %s | Confidence: %.2f | Method: %s | Quality: %s",
+                field_name, "SUCCESS" if result.is_successful else "FAILED",
+                result.confidence_score, result.extraction_method, result.quality_level.value
+            )
         
         if result.validation_errors:
-            self.logger.warning(f"Validation errors for '{field_name}': {result.validation_errors}")
+            self.logger.warning("Validation errors for '%s': %s", field_name, result.validation_errors)
     
     def log_extraction_summary(self, summary: ExtractionSummary):
         """Log extraction summary"""
-        self.logger.info(
-            f"Extraction completed: {summary.successful_extractions}/{summary.total_fields} successful "
-            f"({summary.success_rate:.1%}) | Overall quality: {summary.overall_quality_score:.2f} ({summary.status})"
-        )
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Extraction completed: %s/%s successful (%s) | Overall quality: %.2f (%s)",
+                summary.successful_extractions, summary.total_fields, format(summary.success_rate, '.1%'),
+                summary.overall_quality_score, summary.status
+            )
 
 
 class PerformanceMonitor:
@@ -69,15 +213,14 @@ class PerformanceMonitor:
     
     def start_timing(self, operation: str):
         """Start timing an operation"""
-        self.timings[operation] = {'start': datetime.now()}
+        # perf_counter_ns: đồng hồ monotonic, chỉ là một int, không tạo datetime mỗi lần đo
+        self.timings[operation] = {'start': time.perf_counter_ns()}
     
     def end_timing(self, operation: str):
         """End timing an operation"""
-        if operation in self.timings:
-            self.timings[operation]['end'] = datetime.now()
-            self.timings[operation]['duration'] = (
-                self.timings[operation]['end'] - self.timings[operation]['start']
-            ).total_seconds()
+        timing = self.timings.get(operation)
+        if timing is not None:
+            timing['duration'] = (time.perf_counter_ns() - timing['start']) * 1e-9
     
     def get_performance_report(self) -> Dict[str, Any]:
         """Get performance report"""
@@ -93,102 +236,176 @@ class PerformanceMonitor:
         }
 
 
+# Header sheet 'Extracted Fields' của ResultExporter.to_excel
+EXCEL_FIELD_COLUMNS = (
+    'Field Name', 'Extracted Value', 'Confidence Score', 'Quality Level',
+    'Extraction Method', 'Fallback Used', 'Validation Errors', 'Normalization Applied'
+)
+
+
 class ResultExporter:
     """Export extraction results to various formats"""
     
+    CSV_FIELDNAMES = (
+        'field_name', 'extracted_value', 'confidence_score',
+        'quality_level', 'extraction_method', 'fallback_used',
+        'validation_errors', 'normalization_applied'
+    )
+    
     @staticmethod
-    def to_json(results: Dict[str, Any], file_path: str = None) -> str:
-        """Export results to JSON"""
+    def to_json(results: Dict[str, Any], file_path: str = None, return_str: bool = True) -> str:
+        """
+        Export results to JSON
+
+        Khi ghi ra file_path, bytes được ghi thẳng; return_str=False bỏ qua bước
+        decode thành str và trả về "" để không giữ thêm một bản sao của JSON.
+        """
         # Convert dataclasses to dictionaries for JSON serialization
         json_results = ResultExporter._convert_to_serializable(results)
         
-        json_str = json.dumps(json_results, indent=2, ensure_ascii=False)
+        payload = _dumps(json_results)
         
         if file_path:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(json_str)
+            with open(file_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(payload)
+            if not return_str:
+                return ""
         
-        return json_str
+        return payload.decode('utf-8')
     
     @staticmethod
     def to_csv(extracted_fields: Dict[str, ExtractionResult], file_path: str):
         """Export extracted fields to CSV"""
         import csv
         
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
-                'field_name', 'extracted_value', 'confidence_score', 
-                'quality_level', 'extraction_method', 'fallback_used',
-                'validation_errors', 'normalization_applied'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for field_name, result in extracted_fields.items():
-                writer.writerow({
-                    'field_name': result.field_name,
-                    'extracted_value': str(result.extracted_value),
-                    'confidence_score': result.confidence_score,
-                    'quality_level': result.quality_level.value,
-                    'extraction_method': result.extraction_method,
-                    'fallback_used': result.fallback_used,
-                    'validation_errors': '; '.join(result.validation_errors),
-                    'normalization_applied': '; '.join(result.normalization_applied)
-                })
+        # Buffer 1 MiB: ít lời gọi write() hơn với file kết quả lớn
+        with open(file_path, 'w', newline='', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(ResultExporter.CSV_FIELDNAMES)
+            # Thứ tự cột cố định nên ghi tuple theo vị trí, không cần map tên cột của DictWriter
+            writer.writerows(
+                (
+                    result.field_name,
+                    str(result.extracted_value),
+                    result.confidence_score,
+                    result.quality_level.value,
+                    result.extraction_method,
+                    result.fallback_used,
+                    '; '.join(result.validation_errors),
+                    '; '.join(result.normalization_applied)
+                )
+                for result in extracted_fields.values()
+            )
     
     @staticmethod
     def to_excel(results: Dict[str, Any], file_path: str):
-        """Export results to Excel"""
+        """
+        Export results to Excel
+
+        Ghi từng dòng bằng xlsxwriter ở chế độ constant_memory thay vì dựng DataFrame
+        rồi DataFrame.to_excel; dữ liệu từng sheet giữ nguyên như trước.
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("xlsxwriter is required for Excel export")
+        
+        workbook = xlsxwriter.Workbook(file_path, {
+            'constant_memory': True,
+            # Ghi chuỗi nguyên trạng như openpyxl, không tự đổi thành hyperlink
+            'strings_to_urls': False,
+            'nan_inf_to_errors': True
+        })
         try:
-            import pandas as pd
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
             
-            # Extract fields data
-            fields_data = []
-            for field_name, result in results.get('extracted_fields', {}).items():
-                fields_data.append({
-                    'Field Name': result.field_name,
-                    'Extracted Value': str(result.extracted_value),
-                    'Confidence Score': result.confidence_score,
-                    'Quality Level': result.quality_level.value,
-                    'Extraction Method': result.extraction_method,
-                    'Fallback Used': result.fallback_used,
-                    'Validation Errors': '; '.join(result.validation_errors),
-                    'Normalization Applied': '; '.join(result.normalization_applied)
-                })
+            # Fields sheet
+            fields_sheet = workbook.add_worksheet('Extracted Fields')
+            fields_sheet.write_row(0, 0, EXCEL_FIELD_COLUMNS, header_format)
+            for row, result in enumerate(results.get('extracted_fields', {}).values(), start=1):
+                fields_sheet.write_row(row, 0, (
+                    result.field_name,
+                    str(result.extracted_value),
+                    result.confidence_score,
+                    result.quality_level.value,
+                    result.extraction_method,
+                    result.fallback_used,
+                    '; '.join(result.validation_errors),
+                    '; '.join(result.normalization_applied)
+                ))
             
-            # Create Excel file with multiple sheets
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # Fields sheet
-                fields_df = pd.DataFrame(fields_data)
-                fields_df.to_excel(writer, sheet_name='Extracted Fields', index=False)
-                
-                # Summary sheet
-                summary = results.get('extraction_summary', {})
-                if summary:
-                    summary_data = [
-                        ['Total Fields', summary.total_fields],
-                        ['Successful Extractions', summary.successful_extractions],
-                        ['Failed Extractions', summary.failed_extractions],
-                        ['Success Rate', f"{summary.success_rate:.1%}"],
-                        ['High Quality Count', summary.high_quality_count],
-                        ['Overall Quality Score', f"{summary.overall_quality_score:.2f}"],
-                        ['Status', summary.status]
-                    ]
-                    summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
-                    summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-        except ImportError:
-            raise ImportError("pandas and openpyxl are required for Excel export")
+            # Summary sheet
+            summary = results.get('extraction_summary', {})
+            if summary:
+                summary_data = [
+                    ['Total Fields', summary.total_fields],
+                    ['Successful Extractions', summary.successful_extractions],
+                    ['Failed Extractions', summary.failed_extractions],
+                    ['Success Rate', f"{summary.success_rate:.1%}"],
+                    ['High Quality Count', summary.high_quality_count],
+                    ['Overall Quality Score', f"{summary.overall_quality_score:.2f}"],
+                    ['Status', summary.status]
+                ]
+                summary_sheet = workbook.add_worksheet('Summary')
+                summary_sheet.write_row(0, 0, ('Metric', 'Value'), header_format)
+                for row, summary_row in enumerate(summary_data, start=1):
+                    summary_sheet.write_row(row, 0, summary_row)
+        finally:
+            workbook.close()
     
     @staticmethod
-    def _convert_to_serializable(obj, _seen=None):
-        """Convert dataclasses and enums to serializable format"""
-        if _seen is None:
-            _seen = set()
+    def _convert_to_serializable(obj):
+        """
+        Convert dataclasses and enums to serializable format
+
+        Duyệt bằng stack thay cho đệ quy: container mới được tạo sẵn chỗ cho từng
+        key/phần tử rồi mới điền con, nên thứ tự giữ nguyên như input.
+        """
+        root = [None]
+        stack = [(root, 0, obj)]
+        # id các object (có __dict__) trên nhánh đang duyệt, để phát hiện vòng tham chiếu
+        path = set()
+        
+        while stack:
+            parent, key, item = stack.pop()
+            if parent is _PATH_EXIT:
+                path.discard(key)
+                continue
+            
+            kind = type(item)
+            if kind in _SCALAR_TYPES:
+                parent[key] = item
+            elif kind is dict:
+                node = dict.fromkeys(item)
+                parent[key] = node
+                stack.extend((node, k, v) for k, v in item.items())
+            elif kind is list or kind is tuple:
+                node = [None] * len(item)
+                parent[key] = node
+                stack.extend((node, i, v) for i, v in enumerate(item))
+            elif kind is datetime:
+                parent[key] = item.isoformat()
+            elif kind in _DATACLASS_TYPES and id(item) not in path:
+                obj_id = id(item)
+                node = {}
+                parent[key] = node
+                path.add(obj_id)
+                stack.append((_PATH_EXIT, obj_id, None))
+                for name, value in _public_attributes(item):
+                    if type(value) in _PLAIN_VALUE_TYPES or not callable(value):
+                        node[name] = None
+                        stack.append((node, name, value))
+            elif isinstance(item, Enum):
+                parent[key] = item.value
+            else:
+                parent[key] = ResultExporter._convert_object(item, path, stack)
         
-        # Check for JSON-serializable basic types first
-        if obj is None or isinstance(obj, (str, int, float, bool)):
+        return root[0]
+    
+    @staticmethod
+    def _convert_object(obj, path: set, stack: list) -> Any:
+        """Chuyển một object ngoài các kiểu cơ bản; object con được đẩy vào stack"""
+        if isinstance(obj, (str, int, float, bool)):
             return obj
         
         # Check for functions, methods, or other non-serializable types
@@ -197,25 +414,32 @@ class ResultExporter:
         
         # Prevent infinite recursion
         obj_id = id(obj)
-        if obj_id in _seen:
+        if obj_id in path:
             return f"<circular reference to {type(obj).__name__}>"
         
+        if isinstance(obj, Enum):
+            return obj.value
+        
         if hasattr(obj, '__dict__'):
-            _seen.add(obj_id)
             result = {}
-            try:
-                for key, value in obj.__dict__.items():
-                    # Skip private attributes and methods
-                    if not key.startswith('_') and not callable(value):
-                        result[key] = ResultExporter._convert_to_serializable(value, _seen)
-            finally:
-                _seen.remove(obj_id)
+            path.add(obj_id)
+            # Marker rời nhánh nằm dưới các con trong stack nên chỉ pop sau khi duyệt xong chúng
+            stack.append((_PATH_EXIT, obj_id, None))
+            for key, value in _public_attributes(obj):
+                # Skip methods
+                if not callable(value):
+                    result[key] = None
+                    stack.append((result, key, value))
             return result
         elif isinstance(obj, dict):
-            return {key: ResultExporter._convert_to_serializable(value, _seen) for key, value in obj.items()}
+            result = dict.fromkeys(obj)
+            stack.extend((result, k, v) for k, v in obj.items())
+            return result
         elif isinstance(obj, (list, tuple)):
-            return [ResultExporter._convert_to_serializable(item, _seen) for item in obj]
-        elif hasattr(obj, 'value'):  # Enum
+            result = [None] * len(obj)
+            stack.extend((result, i, v) for i, v in enumerate(obj))
+            return result
+        elif hasattr(obj, 'value'):
             return obj.value
         elif isinstance(obj, datetime):
             return obj.isoformat()
@@ -223,10 +447,17 @@ class ResultExporter:
             # For any other type, try to convert to string
             try:
                 return str(obj)
-            except:
+            except Exception:
                 return f"<{type(obj).__name__}: conversion failed>"
 
 
+@lru_cache(maxsize=128)
+def _load_json_file(abs_path: str, mtime_ns: int, size: int) -> Any:
+    """Parse file JSON; mtime_ns/size nằm trong khoá nên cache tự hết hạn khi file đổi"""
+    with open(abs_path, 'rb') as f:
+        return _loads(f.read())
+
+
 class ConfigManager:
     """Manage configuration and settings"""
     
@@ -235,100 +466,140 @@ class ConfigManager:
         self.config_cache = {}
     
     def load_config(self, config_name: str) -> Dict[str, Any]:
-        """Load configuration from file"""
-        if config_name in self.config_cache:
-            return self.config_cache[config_name]
-        
+        """
+        Load configuration from file
+
+        Kết quả parse được cache chung cho cả process theo (đường dẫn, mtime, size),
+        nên file bị sửa sẽ được đọc lại và các ConfigManager khác không parse lại.
+        Mỗi lần gọi trả về một bản sao, nên caller sửa config không ảnh hưởng caller khác.
+        """
         config_file = self.config_dir / f"{config_name}.json"
         
-        if config_file.exists():
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                self.config_cache[config_name] = config
-                return config
-        else:
+        try:
+            stat = config_file.stat()
+        except FileNotFoundError:
             return {}
+        
+        config = copy.deepcopy(
+            _load_json_file(str(config_file.resolve()), stat.st_mtime_ns, stat.st_size)
+        )
+        self.config_cache[config_name] = config
+        return config
     
     def save_config(self, config_name: str, config_data: Dict[str, Any]):
         """Save configuration to file"""
         self.config_dir.mkdir(exist_ok=True)
         config_file = self.config_dir / f"{config_name}.json"
         
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config_data, f, indent=2, ensure_ascii=False)
+        with open(config_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(_dumps(config_data))
         
         self.config_cache[config_name] = config_data
 
 
+# Các đoạn cố định của báo cáo validation (mỗi dòng kết thúc bằng "\n")
+_REPORT_HEADER = "=== VSS Enhanced Extractor - Validation Report ===\n\n"
+_REPORT_FIELD_TEMPLATE = (
+    "### %s\n"
+    "- **Value**: %s\n"
+    "- **Confidence**: %.2f\n"
+    "- **Quality**: %s\n"
+    "- **Method**: %s\n"
+    "- **Fallback Used**: %s\n"
+)
+
+
 class ValidationReportGenerator:
     """Generate validation reports"""
     
     @staticmethod
     def generate_detailed_report(results: Dict[str, Any]) -> str:
         """Generate detailed validation report"""
-        report = []
-        report.append("=== VSS Enhanced Extractor - Validation Report ===\n")
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        report = io.StringIO()
+        write = report.write
+        write(_REPORT_HEADER)
+        write("Generated: %s\n\n" % datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         # Summary section
         summary = results.get('extraction_summary', {})
         if summary:
-            report.append("## Extraction Summary")
-            report.append(f"- Total Fields: {summary.total_fields}")
-            report.append(f"- Successful Extractions: {summary.successful_extractions}")
-            report.append(f"- Success Rate: {summary.success_rate:.1%}")
-            report.append(f"- Overall Quality Score: {summary.overall_quality_score:.2f}")
-            report.append(f"- Status: {summary.status}")
-            report.append("")
+            write(
+                "## Extraction Summary\n"
+                "- Total Fields: %s\n"
+                "- Successful Extractions: %s\n"
+                "- Success Rate: %s\n"
+                "- Overall Quality Score: %.2f\n"
+                "- Status: %s\n\n" % (
+                    summary.total_fields, summary.successful_extractions,
+                    format(summary.success_rate, '.1%'), summary.overall_quality_score, summary.status
+                )
+            )
         
         # Field details
-        report.append("## Field Extraction Details")
+        write("## Field Extraction Details\n")
         extracted_fields = results.get('extracted_fields', {})
         
         for field_name, result in extracted_fields.items():
-            report.append(f"### {field_name}")
-            report.append(f"- **Value**: {result.extracted_value}")
-            report.append(f"- **Confidence**: {result.confidence_score:.2f}")
-            report.append(f"- **Quality**: {result.quality_level.value}")
-            report.append(f"- **Method**: {result.extraction_method}")
-            report.append(f"- **Fallback Used**: {result.fallback_used}")
+            write(_REPORT_FIELD_TEMPLATE % (
+                field_name, result.extracted_value, result.confidence_score,
+                result.quality_level.value, result.extraction_method, result.fallback_used
+            ))
             
             if result.validation_errors:
-                report.append(f"- **Validation Errors**: {', '.join(result.validation_errors)}")
+                write("- **Validation Errors**: %s\n" % ', '.join(result.validation_errors))
             
             if result.normalization_applied:
-                report.append(f"- **Normalization Applied**: {', '.join(result.normalization_applied)}")
+                write("- **Normalization Applied**: %s\n" % ', '.join(result.normalization_applied))
             
-            report.append("")
+            write("\n")
         
         # Cross-validation section
         cross_validation = results.get('cross_validation', {})
         if cross_validation:
-            report.append("## Cross-Validation Results")
-            report.append(f"- Overall Consistency: {cross_validation.overall_consistency:.2f}")
+            write("## Cross-Validation Results\n")
+            write("- Overall Consistency: %.2f\n" % cross_validation.overall_consistency)
             
             if cross_validation.inconsistencies:
-                report.append("- **Inconsistencies Found**:")
+                write("- **Inconsistencies Found**:\n")
                 for inconsistency in cross_validation.inconsistencies:
-                    report.append(f"  - {inconsistency}")
-            report.append("")
+                    write("  - %s\n" % (inconsistency,))
+            write("\n")
         
-        return "\n".join(report)
+        # Bỏ "\n" cuối để giống kết quả "\n".join(các dòng) trước đây
+        return report.getvalue()[:-1]
 
 
 class HashUtils:
-    """Utility functions for hashing and checksums"""
+    """
+    Utility functions for hashing and checksums
+
+    Hash chỉ dùng để nhận diện/so trùng nội dung nên dùng xxh3_64 khi có xxhash,
+    không thì blake2b 128-bit (nhanh hơn md5, cùng độ dài hex); giá trị hash phụ
+    thuộc backend, không lưu để so giữa các môi trường.
+    """
+    
+    @staticmethod
+    def _new_hasher(data: bytes = b''):
+        """Hasher mới (xxh3_64 hoặc blake2b) với dữ liệu ban đầu"""
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_64(data)
+        return hashlib.blake2b(data, digest_size=16)
     
     @staticmethod
     def hash_content(content: str) -> str:
         """Generate hash for content"""
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return HashUtils._new_hasher(content.encode('utf-8')).hexdigest()
     
     @staticmethod
     def hash_extraction_result(result: ExtractionResult) -> str:
         """Generate hash for extraction result"""
-        content = f"{result.field_name}_{result.extracted_value}_{result.confidence_score}"
-        return HashUtils.hash_content(content)
+        # Nạp từng phần vào hasher, cùng bytes với "{field_name}_{value}_{confidence}"
+        hasher = HashUtils._new_hasher(result.field_name.encode('utf-8'))
+        hasher.update(b'_')
+        hasher.update(format(result.extracted_value).encode('utf-8'))
+        hasher.update(b'_')
+        hasher.update(format(result.confidence_score).encode('utf-8'))
+        return hasher.hexdigest()
 
 
 class FileUtils:
@@ -359,13 +630,13 @@ class FileUtils:
         
         directory_path = Path(directory)
         if directory_path.exists():
-            cutoff_time = datetime.now() - timedelta(days=max_age_days)
+            cutoff_ts = (datetime.now() - timedelta(days=max_age_days)).timestamp()
             
-            for file_path in directory_path.iterdir():
-                if file_path.is_file():
-                    file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_time < cutoff_time:
-                        file_path.unlink()
+            # DirEntry cache kết quả stat nên mỗi file chỉ tốn tối đa một lần stat
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                        os.unlink(entry.path)
 
 
 # Convenience functions for common operations
@@ -387,26 +658,36 @@ def quick_extract(html_content: str, field_names: List[str] = None) -> Dict[str,
     return results
 
 
+def _write_report(results: Dict[str, Any], report_path: str):
+    """Generate validation report và ghi ra file Markdown"""
+    report_content = ValidationReportGenerator.generate_detailed_report(results)
+    with open(report_path, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(report_content)
+
+
 def validate_and_export(results: Dict[str, Any], output_dir: str = "output"):
     """Validate results and export to multiple formats"""
     FileUtils.ensure_directory(output_dir)
     
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # Export to JSON
     json_path = f"{output_dir}/extraction_results_{timestamp}.json"
-    ResultExporter.to_json(results, json_path)
-    
-    # Export to CSV
     csv_path = f"{output_dir}/extraction_fields_{timestamp}.csv"
-    if 'extracted_fields' in results:
-        ResultExporter.to_csv(results['extracted_fields'], csv_path)
-    
-    # Generate validation report
     report_path = f"{output_dir}/validation_report_{timestamp}.md"
-    report_content = ValidationReportGenerator.generate_detailed_report(results)
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report_content)
+    
+    # Ba file độc lập nhau nên ghi song song, phần ghi đĩa của chúng chồng lên nhau
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            # Export to JSON
+            executor.submit(ResultExporter.to_json, results, json_path, return_str=False),
+            # Generate validation report
+            executor.submit(_write_report, results, report_path)
+        ]
+        # Export to CSV
+        if 'extracted_fields' in results:
+            futures.append(executor.submit(ResultExporter.to_csv, results['extracted_fields'], csv_path))
+        
+        for future in futures:
+            future.result()
     
     return {
         'json_export': json_path,
@@ -11,11 +11,25 @@ Version: 2.1
 
 import re
 import logging
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import numpy as np
 from ..config.data_models import ValidationResult, NormalizedIncome, NormalizedBank, MemberInfo
 from ..config.constants import VALIDATION_RANGES
 from ..config.patterns import NormalizationMappingsConfig
 
+# Optional: rapidfuzz (C++) cho độ tương đồng chuỗi trong CrossValidator
+try:
+    from rapidfuzz import process as rapidfuzz_process
+    from rapidfuzz.distance import Indel
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Pattern định dạng, biên dịch một lần ở cấp module
+_PHONE_RE = re.compile(r'^0[1-9][0-9]{8,9}$')
+_HOUSEHOLD_RE = re.compile(r'^[A-Z0-9]{8,15}$')
+
 
 class BaseValidator:
     """Base validator class"""
@@ -32,6 +46,10 @@ class BaseValidator:
 class PhoneValidator(BaseValidator):
     """Phone number validator"""
     
+    def __init__(self):
+        super().__init__()
+        self._phone_prefixes = frozenset(self.normalization_maps['phone_prefixes'])
+    
     def validate(self, phone: str) -> ValidationResult:
         """Validate phone number"""
         errors = []
@@ -42,7 +60,7 @@ class PhoneValidator(BaseValidator):
             return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
         
         # Check Vietnam phone format
-        if not re.match(r'^0[1-9][0-9]{8,9}$', phone):
+        if not _PHONE_RE.match(phone):
             errors.append("Invalid Vietnam phone number format")
         
         # Check length
@@ -52,7 +70,7 @@ class PhoneValidator(BaseValidator):
         # Check known prefixes
         if len(phone) >= 3:
             prefix = phone[:3]
-            if prefix not in self.normalization_maps['phone_prefixes']:
+            if prefix not in self._phone_prefixes:
                 warnings.append(f"Unknown phone prefix: {prefix}")
         
         return ValidationResult(
@@ -93,6 +111,19 @@ class IncomeValidator(BaseValidator):
             errors=errors,
             warnings=warnings
         )
+    
+    def validate_many(self, amounts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Kiểm tra hàng loạt các amount đã parse thành công
+        
+        Returns: (is_valid, is_reasonable) dạng mảng bool, cùng kết quả với
+        validate(income).is_valid và income.is_reasonable của từng phần tử
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        is_valid = ~((amounts < VALIDATION_RANGES['income_min']) | (amounts > VALIDATION_RANGES['income_max']))
+        # Cùng khoảng với NormalizedIncome.is_reasonable
+        is_reasonable = (amounts >= 100000) & (amounts <= 100000000)
+        return is_valid, is_reasonable
 
 
 class BankValidator(BaseValidator):
@@ -135,7 +166,7 @@ class HouseholdCodeValidator(BaseValidator):
             return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
         
         # Check format
-        if not re.match(r'^[A-Z0-9]{8,15}$', code):
+        if not _HOUSEHOLD_RE.match(code):
             errors.append("Invalid household code format (should be 8-15 alphanumeric characters)")
         
         # Check length
@@ -154,18 +185,44 @@ class HouseholdCodeValidator(BaseValidator):
 class MemberInfoValidator(BaseValidator):
     """Member information validator"""
     
+    def __init__(self):
+        super().__init__()
+        self._valid_relationships = frozenset(self.normalization_maps['relationships'].values())
+        self._current_year = datetime.now().year
+    
     def validate(self, members: List[MemberInfo]) -> ValidationResult:
         """Validate member information"""
-        errors = []
-        warnings = []
-        
         if not members:
-            errors.append("No member information found")
-            return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+            return ValidationResult(is_valid=False, errors=["No member information found"], warnings=[])
+        
+        return self._validate_members(members, [self._check_birth_year(member.birth_year) for member in members])
+    
+    def validate_batch(self, members_per_household: List[List[MemberInfo]]) -> List[ValidationResult]:
+        """
+        validate() cho nhiều hộ cùng lúc, cùng kết quả với gọi validate() từng hộ
         
-        valid_relationships = set(self.normalization_maps['relationships'].values())
+        Năm sinh của mọi member (mọi hộ) được parse và kiểm tra khoảng trong một
+        lần vector NumPy, rồi chia lại theo từng hộ bằng offset.
+        """
+        birth_years = [member.birth_year for members in members_per_household if members for member in members]
+        year_warnings = self._check_birth_years(birth_years)
         
-        for i, member in enumerate(members):
+        results = []
+        offset = 0
+        for members in members_per_household:
+            if not members:
+                results.append(self.validate(members))
+                continue
+            results.append(self._validate_members(members, year_warnings[offset:offset + len(members)]))
+            offset += len(members)
+        return results
+    
+    def _validate_members(self, members: List[MemberInfo], year_warnings: List[Optional[str]]) -> ValidationResult:
+        """Kiểm tra từng member; year_warnings là kết quả kiểm tra năm sinh tương ứng"""
+        errors = []
+        warnings = []
+        
+        for i, (member, year_warning) in enumerate(zip(members, year_warnings)):
             member_prefix = f"Member {i+1}"
             
             # Check required fields
@@ -176,18 +233,12 @@ class MemberInfoValidator(BaseValidator):
                 errors.append(f"{member_prefix}: Missing relationship")
             
             # Validate relationship
-            if member.relationship and member.relationship not in valid_relationships:
+            if member.relationship and member.relationship not in self._valid_relationships:
                 warnings.append(f"{member_prefix}: Unknown relationship type '{member.relationship}'")
             
             # Validate birth year if provided
-            if member.birth_year:
-                try:
-                    year = int(member.birth_year)
-                    current_year = 2025  # Using current time reference
-                    if year < 1900 or year > current_year:
-                        warnings.append(f"{member_prefix}: Birth year {year} seems unreasonable")
-                except ValueError:
-                    warnings.append(f"{member_prefix}: Invalid birth year format '{member.birth_year}'")
+            if year_warning:
+                warnings.append(f"{member_prefix}: {year_warning}")
             
             # Check completeness
             if not member.is_complete:
@@ -198,13 +249,48 @@ class MemberInfoValidator(BaseValidator):
             errors=errors,
             warnings=warnings
         )
+    
+    def _check_birth_year(self, birth_year: Any) -> Optional[str]:
+        """Cảnh báo (chưa có tiền tố member) cho năm sinh, None nếu hợp lệ hoặc không có"""
+        if not birth_year:
+            return None
+        try:
+            year = int(birth_year)
+        except ValueError:
+            return f"Invalid birth year format '{birth_year}'"
+        if year < 1900 or year > self._current_year:
+            return f"Birth year {year} seems unreasonable"
+        return None
+    
+    def _check_birth_years(self, birth_years: List[Any]) -> List[Optional[str]]:
+        """_check_birth_year cho cả danh sách, chuỗi chỉ gồm chữ số ASCII được xét bằng NumPy"""
+        # Chuỗi quá dài (tràn int64) hoặc không phải str đi đường scalar
+        values = np.array(
+            [year if type(year) is str and len(year) <= 18 else '' for year in birth_years], dtype=str
+        )
+        lengths = np.char.str_len(values)
+        is_digits = (lengths > 0) & (np.char.str_len(np.char.strip(values, '0123456789')) == 0)
+        
+        years = np.zeros(len(values), dtype=np.int64)
+        years[is_digits] = values[is_digits].astype(np.int64)
+        unreasonable = is_digits & ((years < 1900) | (years > self._current_year))
+        
+        year_warnings: List[Optional[str]] = [None] * len(birth_years)
+        for i in np.flatnonzero(unreasonable).tolist():
+            year_warnings[i] = f"Birth year {int(years[i])} seems unreasonable"
+        for i in np.flatnonzero(~is_digits).tolist():
+            year_warnings[i] = self._check_birth_year(birth_years[i])
+        return year_warnings
 
 
 class CrossValidator:
     """Cross-validator for comparing extracted values with input data"""
     
     def __init__(self):
+        from ..normalizers.field_normalizers import PhoneNormalizer
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Tạo 1 lần cho mỗi validator thay vì mỗi lần so sánh số điện thoại
+        self._phone_normalizer = PhoneNormalizer()
     
     def validate_field_consistency(self, field_name: str, extracted_value: Any, input_data: Dict) -> Dict[str, Any]:
         """Validate consistency of một field với input data"""
@@ -258,8 +344,7 @@ class CrossValidator:
     
     def _compare_phone_values(self, extracted: str, input_val: str) -> Dict[str, Any]:
         """Compare phone numbers"""
-        from ..normalizers.field_normalizers import PhoneNormalizer
-        normalizer = PhoneNormalizer()
+        normalizer = self._phone_normalizer
         
         norm_extracted = normalizer.normalize(str(extracted))
         norm_input = normalizer.normalize(str(input_val))
@@ -296,20 +381,74 @@ class CrossValidator:
         except ValueError:
             return {'match': False, 'similarity': 0.0, 'notes': 'Cannot compare as numbers'}
     
+    def compare_income_batch(self, extracted_values: Sequence[Any], input_values: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """
+        So sánh thu nhập hàng loạt, cùng kết quả với _compare_income_values từng cặp
+        
+        Returns: dict các mảng 'match', 'similarity', 'diff_percent' (NaN khi không
+        so được dạng số; khi đó match=False, similarity=0.0)
+        """
+        count = len(extracted_values)
+        extracted = np.full(count, np.nan)
+        inputs = np.full(count, np.nan)
+        comparable = np.zeros(count, dtype=bool)
+        
+        for i, (extracted_value, input_val) in enumerate(zip(extracted_values, input_values)):
+            if isinstance(extracted_value, NormalizedIncome):
+                extracted_value = extracted_value.amount
+            try:
+                inputs[i] = float(str(input_val).replace(',', ''))
+                extracted[i] = float(str(extracted_value).replace(',', ''))
+                comparable[i] = True
+            except ValueError:
+                continue
+        
+        result = self._compare_income_arrays(extracted, inputs)
+        result['match'] &= comparable
+        result['similarity'][~comparable] = 0.0
+        result['diff_percent'][~comparable] = np.nan
+        return result
+    
+    @staticmethod
+    def _compare_income_arrays(extracted: np.ndarray, inputs: np.ndarray) -> Dict[str, np.ndarray]:
+        """Phiên bản vector của phép so sánh trong _compare_income_values"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            diff_percent = np.abs(extracted - inputs) / np.maximum(inputs, 1) * 100
+            return {
+                'match': diff_percent < 10,  # Allow 10% difference
+                # fmax bỏ qua NaN giống max(0, ...) của bản scalar
+                'similarity': np.fmax(0, 1 - diff_percent / 100),
+                'diff_percent': diff_percent
+            }
+    
+    def compare_generic_batch(self, extracted_values: Sequence[Any], input_values: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """
+        So sánh chuỗi hàng loạt theo cặp, cùng kết quả với _compare_generic_values
+        
+        Returns: dict các mảng 'match' và 'similarity'
+        """
+        extracted = [str(value).lower().strip() for value in extracted_values]
+        inputs = [str(value).lower().strip() for value in input_values]
+        
+        if RAPIDFUZZ_AVAILABLE and hasattr(rapidfuzz_process, 'cpdist'):
+            # cpdist so từng cặp (không phải ma trận mọi cặp như cdist) trên nhiều thread
+            similarity = rapidfuzz_process.cpdist(
+                extracted, inputs, scorer=Indel.normalized_similarity, dtype=np.float64, workers=-1
+            )
+        else:
+            similarity = np.array([_indel_similarity(a, b) for a, b in zip(extracted, inputs)], dtype=np.float64)
+        
+        match = np.array([a == b for a, b in zip(extracted, inputs)], dtype=bool)
+        similarity[match] = 1.0
+        return {'match': match, 'similarity': similarity}
+    
     def _compare_generic_values(self, extracted: Any, input_val: Any) -> Dict[str, Any]:
         """Generic string comparison"""
         str_extracted = str(extracted).lower().strip()
         str_input = str(input_val).lower().strip()
         
         match = str_extracted == str_input
-        
-        # Calculate similarity (simple)
-        if match:
-            similarity = 1.0
-        elif str_extracted in str_input or str_input in str_extracted:
-            similarity = 0.7
-        else:
-            similarity = 0.0
+        similarity = 1.0 if match else _indel_similarity(str_extracted, str_input)
         
         return {
             'match': match,
@@ -318,6 +457,45 @@ class CrossValidator:
         }
 
 
+def _indel_similarity(a: str, b: str) -> float:
+    """
+    Độ tương đồng Indel chuẩn hoá 1 - (số ký tự thêm/xoá) / (tổng độ dài), như fuzz.ratio / 100
+
+    Dùng rapidfuzz nếu có; không thì tính LCS bit-parallel trên int Python
+    (mỗi ký tự của chuỗi ngắn là vài phép toán trên số len(chuỗi dài) bit).
+    """
+    if RAPIDFUZZ_AVAILABLE:
+        return Indel.normalized_similarity(a, b)
+    
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if len(a) < len(b):
+        a, b = b, a
+    mask = (1 << len(a)) - 1
+    positions: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        positions[char] = positions.get(char, 0) | (1 << i)
+    row = mask
+    for char in b:
+        matches = row & positions.get(char, 0)
+        row = ((row + matches) | (row - matches)) & mask
+    lcs = len(a) - bin(row).count('1')
+    return 1 - (total - 2 * lcs) / total
+
+
+# Validator mà is_valid chỉ phụ thuộc định dạng: (pattern, độ dài tối thiểu, tối đa)
+_FORMAT_RULES = {
+    PhoneValidator: (
+        _PHONE_RE, VALIDATION_RANGES['phone_min_length'], VALIDATION_RANGES['phone_max_length']
+    ),
+    HouseholdCodeValidator: (
+        _HOUSEHOLD_RE, VALIDATION_RANGES['household_code_min_length'],
+        VALIDATION_RANGES['household_code_max_length']
+    ),
+}
+
+
 class ValidatorFactory:
     """Factory for creating validators"""
     
@@ -338,6 +516,27 @@ class ValidatorFactory:
         else:
             return BaseValidator()
     
+    @classmethod
+    def validate_batch(cls, field_name: str, values: List[Any]) -> List[bool]:
+        """
+        is_valid cho từng value, giống validator.validate(value).is_valid
+
+        Field chỉ kiểm tra định dạng (phone, mã hộ) được xét thẳng bằng pattern và
+        độ dài, không dựng ValidationResult/message cho từng record; field khác
+        (hoặc validator đã được đăng ký thay thế) đi qua validate() như thường.
+        """
+        rule = _FORMAT_RULES.get(cls._validators.get(field_name))
+        if rule is None:
+            validator = cls.get_validator(field_name)
+            return [validator.validate(value).is_valid for value in values]
+        
+        pattern, min_length, max_length = rule
+        match = pattern.match
+        return [
+            bool(value) and match(value) is not None and min_length <= len(value) <= max_length
+            for value in values
+        ]
+    
     @classmethod
     def register_validator(cls, field_name: str, validator_class: type):
         """Register custom validator"""
@@ -10,26 +10,73 @@ Version: 2.0
 
 import asyncio
 import aiohttp
-import requests
 import logging
+import threading
 import json
 import time
-from typing import Dict, Any, List, Optional, Union, Callable
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
+from functools import lru_cache
+from datetime import datetime
 from pathlib import Path
 from contextlib import asynccontextmanager
+import re
 import urllib.parse
 import ssl
+from collections import OrderedDict
 import certifi
 
 # Import configuration classes
 from .config_manager import ApiConfig, ProxyConfig
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Content-Type được coi là JSON (cùng quy tắc với aiohttp ClientResponse.json)
+_JSON_CONTENT_TYPE_RE = re.compile(r'^application/(?:[\w.+-]+?\+)?json')
+# Số byte tối đa đọc từ body lỗi / non-JSON để ghi log
+_PREVIEW_BYTES = 256
+# Charset mà orjson parse trực tiếp được từ bytes
+_UTF8_CHARSETS = frozenset(('utf-8', 'utf8'))
+
+
+def _loads_json(body: bytes, charset: Optional[str] = None) -> Any:
+    """
+    Parse body JSON: orjson khi có và body là UTF-8, còn lại (hoặc orjson
+    từ chối, vd. NaN) dùng json chuẩn. Lỗi parse raise ValueError.
+    """
+    if ORJSON_AVAILABLE and (charset is None or charset.lower() in _UTF8_CHARSETS):
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(body.decode(charset or 'utf-8'))
+
+
+@lru_cache(maxsize=None)
+def _shared_ssl_context() -> ssl.SSLContext:
+    """SSL context (CA bundle của certifi) dùng chung cho mọi client trong process"""
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+@lru_cache(maxsize=512)
+def _join_url(base_url: str, endpoint: str) -> str:
+    """Ghép base URL với endpoint (thêm leading slash nếu thiếu)"""
+    if not endpoint.startswith('/'):
+        endpoint = '/' + endpoint
+    return base_url.rstrip('/') + endpoint
+
 
 class VSSApiClient:
     """
     Chuyên dụng API client để giao tiếp với VSS system
     Hỗ trợ cả synchronous và asynchronous requests
+    
+    Sync API (get/post/...) chạy trên event loop riêng ở background thread với
+    session riêng: dùng `with VSSApiClient(...) as client:` hoặc gọi close_sync()
+    khi xong, nếu không thread và session đó tồn tại tới khi process kết thúc.
     """
     
     def __init__(self, 
@@ -54,17 +101,45 @@ class VSSApiClient:
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
+        # Proxy URL, SSL context và timeout mặc định chỉ tính một lần
+        self._proxy_url: Optional[str] = None
+        if proxy_config and proxy_config.enabled:
+            if proxy_config.username and proxy_config.password:
+                self._proxy_url = f"http://{proxy_config.username}:{proxy_config.password}@{proxy_config.host}:{proxy_config.port}"
+            else:
+                self._proxy_url = f"http://{proxy_config.host}:{proxy_config.port}"
+        self._ssl_context = _shared_ssl_context()
+        self._default_timeout = aiohttp.ClientTimeout(
+            total=session_timeout,
+            connect=10,
+            sock_read=session_timeout
+        )
+        
         # Session management
         self._aiohttp_session: Optional[aiohttp.ClientSession] = None
-        self._requests_session: Optional[requests.Session] = None
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # Sync API chạy qua aiohttp trên một event loop riêng ở background thread
+        self._sync_session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        # Giới hạn đồng thời: đếm số request đang chạy dưới Condition thay cho Semaphore,
+        # để đổi được max_concurrent lúc runtime qua set_max_concurrent()
+        self._cond = asyncio.Condition()
+        self._active = 0
         
         # Connection pooling và caching
         self._connection_pool_size = 20
-        self._response_cache: Dict[str, Dict[str, Any]] = {}
+        # Future của các GET có cache đang chạy, theo cache key (single-flight)
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # LRU theo thứ tự truy cập: key -> (thời điểm lưu theo time.monotonic(), data,
+        # ETag, Last-Modified); entry hết hạn chỉ bị loại khi được tra tới, trừ khi còn
+        # validator để revalidate bằng conditional request
+        self._response_cache: Dict[tuple, Tuple[float, Any, Optional[str], Optional[str]]] = OrderedDict()
+        self._cache_max = 1024
         self._cache_ttl = 300  # 5 minutes
         
-        # Statistics tracking
+        # Statistics tracking; last_request_time lưu epoch float, get_stats() đổi sang ISO
+        self._response_time_sum = 0.0
         self.stats = {
             'total_requests': 0,
             'successful_requests': 0,
@@ -87,7 +162,7 @@ class VSSApiClient:
     
     def __enter__(self):
         """Sync context manager entry"""
-        self._ensure_requests_session()
+        self._ensure_loop_thread()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -97,67 +172,38 @@ class VSSApiClient:
     async def _ensure_aiohttp_session(self):
         """Đảm bảo aiohttp session được khởi tạo"""
         if not self._aiohttp_session or self._aiohttp_session.closed:
-            # SSL context với certificate verification
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            # Connection configuration
-            connector = aiohttp.TCPConnector(
-                limit=self._connection_pool_size,
-                limit_per_host=10,
-                ttl_dns_cache=300,
-                use_dns_cache=True,
-                ssl=ssl_context,
-                enable_cleanup_closed=True
-            )
-            
-            # Request timeout configuration
-            timeout = aiohttp.ClientTimeout(
-                total=self.session_timeout,
-                connect=10,
-                sock_read=self.session_timeout
-            )
-            
-            # Proxy configuration nếu có
-            proxy_url = None
-            if self.proxy_config and self.proxy_config.enabled:
-                if self.proxy_config.username and self.proxy_config.password:
-                    proxy_url = f"http://{self.proxy_config.username}:{self.proxy_config.password}@{self.proxy_config.host}:{self.proxy_config.port}"
-                else:
-                    proxy_url = f"http://{self.proxy_config.host}:{self.proxy_config.port}"
-            
-            self._aiohttp_session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers=self.api_config.headers,
-                trust_env=True
-            )
-            
+            self._aiohttp_session = self._create_session()
             self.logger.debug("AioHTTP session initialized")
     
-    def _ensure_requests_session(self):
-        """Đảm bảo requests session được khởi tạo"""
-        if not self._requests_session:
-            self._requests_session = requests.Session()
-            
-            # Update headers
-            self._requests_session.headers.update(self.api_config.headers)
-            
-            # Proxy configuration
-            if self.proxy_config and self.proxy_config.enabled:
-                if self.proxy_config.username and self.proxy_config.password:
-                    proxy_url = f"http://{self.proxy_config.username}:{self.proxy_config.password}@{self.proxy_config.host}:{self.proxy_config.port}"
-                else:
-                    proxy_url = f"http://{self.proxy_config.host}:{self.proxy_config.port}"
-                
-                self._requests_session.proxies = {
-                    'http': proxy_url,
-                    'https': proxy_url
-                }
-            
-            # SSL verification
-            self._requests_session.verify = True
-            
-            self.logger.debug("Requests session initialized")
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Tạo aiohttp session gắn với event loop đang chạy"""
+        # Connection configuration
+        connector = aiohttp.TCPConnector(
+            limit=self._connection_pool_size,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            ssl=self._ssl_context,
+            enable_cleanup_closed=True
+        )
+        
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self._default_timeout,
+            headers=self.api_config.headers,
+            trust_env=True
+        )
+    
+    def _ensure_loop_thread(self) -> asyncio.AbstractEventLoop:
+        """Đảm bảo event loop cho sync API đang chạy ở daemon thread"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='VSSApiClient-loop', daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+                self.logger.debug("Sync event loop thread started")
+            return self._loop
     
     def _build_url(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
         """
@@ -170,12 +216,8 @@ class VSSApiClient:
         Returns:
             URL đầy đủ
         """
-        # Đảm bảo endpoint bắt đầu bằng /
-        if not endpoint.startswith('/'):
-            endpoint = '/' + endpoint
-        
-        base_url = self.api_config.base_url.rstrip('/')
-        full_url = base_url + endpoint
+        # Phần base + endpoint được memo hoá, không phụ thuộc params
+        full_url = _join_url(self.api_config.base_url, endpoint)
         
         if params:
             # Encode parameters
@@ -184,21 +226,19 @@ class VSSApiClient:
         
         return full_url
     
-    def _get_cache_key(self, method: str, url: str, params: Optional[Dict] = None) -> str:
-        """Tạo cache key cho request"""
-        key_parts = [method.upper(), url]
-        if params:
-            key_parts.append(json.dumps(params, sort_keys=True))
-        return "|".join(key_parts)
+    def _get_cache_key(self, method: str, url: str, params: Optional[Dict] = None) -> tuple:
+        """Tạo cache key cho request (tuple hashable, không serialize params)"""
+        items = tuple(sorted(params.items())) if params else ()
+        try:
+            hash(items)
+        except TypeError:
+            # Giá trị không hashable (list, dict lồng nhau): dùng repr làm khóa
+            items = repr(items)
+        return (method.upper(), url, items)
     
-    def _is_cache_valid(self, cache_entry: Dict[str, Any]) -> bool:
+    def _is_cache_valid(self, cache_entry: Tuple[float, Any, Optional[str], Optional[str]]) -> bool:
         """Kiểm tra cache entry còn hợp lệ không"""
-        if 'timestamp' not in cache_entry:
-            return False
-        
-        cache_time = cache_entry['timestamp']
-        current_time = time.time()
-        return (current_time - cache_time) < self._cache_ttl
+        return (time.monotonic() - cache_entry[0]) < self._cache_ttl
     
     def _update_stats(self, success: bool, response_time: float):
         """Cập nhật thống kê requests"""
@@ -208,11 +248,10 @@ class VSSApiClient:
         else:
             self.stats['failed_requests'] += 1
         
-        # Update average response time
-        current_avg = self.stats['average_response_time']
-        total_requests = self.stats['total_requests']
-        self.stats['average_response_time'] = (current_avg * (total_requests - 1) + response_time) / total_requests
-        self.stats['last_request_time'] = datetime.now().isoformat()
+        # Update average response time từ tổng cộng dồn
+        self._response_time_sum += response_time
+        self.stats['average_response_time'] = self._response_time_sum / self.stats['total_requests']
+        self.stats['last_request_time'] = time.time()
     
     # =============================================================================
     # ASYNC METHODS
@@ -293,95 +332,256 @@ class VSSApiClient:
         
         # Check cache for GET requests
         cache_key = None
+        # Entry hết hạn dùng để revalidate; giữ lại vì có thể bị LRU/clear_cache()
+        # xoá khỏi cache trong lúc request đang chạy
+        stale_entry = None
         if method.upper() == 'GET' and use_cache:
             cache_key = self._get_cache_key(method, url, params)
-            if cache_key in self._response_cache:
-                cache_entry = self._response_cache[cache_key]
+            cache_entry = self._response_cache.get(cache_key)
+            if cache_entry is not None:
                 if self._is_cache_valid(cache_entry):
+                    self._response_cache.move_to_end(cache_key)
                     self.stats['cached_responses'] += 1
                     self.logger.debug(f"Cache hit for {url}")
-                    return cache_entry['data']
+                    return cache_entry[1]
+                if cache_entry[2] or cache_entry[3]:
+                    # Hết hạn nhưng có ETag/Last-Modified: gửi conditional request
+                    headers = dict(headers) if headers else {}
+                    if cache_entry[2]:
+                        headers['If-None-Match'] = cache_entry[2]
+                    if cache_entry[3]:
+                        headers['If-Modified-Since'] = cache_entry[3]
+                    stale_entry = cache_entry
+                else:
+                    del self._response_cache[cache_key]
         
-        # Acquire semaphore for concurrency control
-        async with self._semaphore:
-            start_time = time.time()
-            
+        if cache_key is None:
+            return await self._send_request(method, url, data, json_data, headers, timeout, None)
+        
+        # Single-flight: các lời gọi trùng cache key trong lúc request đang chạy
+        # cùng chờ một Future thay vì gửi thêm request lên VSS
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
             try:
-                # Prepare request kwargs
-                request_kwargs = {
-                    'url': url,
-                    'method': method.upper()
-                }
-                
-                # Add headers
-                if headers:
-                    request_kwargs['headers'] = headers
-                
-                # Add data
-                if json_data:
-                    request_kwargs['json'] = json_data
-                elif data:
-                    request_kwargs['data'] = data
-                
-                # Custom timeout
-                if timeout:
-                    request_kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+                response_data = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # Request dẫn đầu bị hủy: tự gửi request
+                return await self._send_request(
+                    method, url, data, json_data, headers, timeout, cache_key, stale_entry
+                )
+            self.stats['cached_responses'] += 1
+            return response_data
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response_data = await self._send_request(
+                method, url, data, json_data, headers, timeout, cache_key, stale_entry
+            )
+            future.set_result(response_data)
+            return response_data
+        finally:
+            del self._inflight[cache_key]
+            if not future.done():
+                future.cancel()
+    
+    async def _send_request(self,
+                            method: str,
+                            url: str,
+                            data: Optional[Dict[str, Any]],
+                            json_data: Optional[Dict[str, Any]],
+                            headers: Optional[Dict[str, str]],
+                            timeout: Optional[int],
+                            cache_key: Optional[tuple],
+                            stale_entry: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """Gửi một request qua async session, trong giới hạn đồng thời"""
+        # Acquire slot for concurrency control
+        await self._acquire_slot()
+        try:
+            return await self._perform_request(
+                self._aiohttp_session, method, url, data, json_data, headers, timeout,
+                cache_key, stale_entry
+            )
+        finally:
+            await self._release_slot()
+    
+    async def _perform_request(self,
+                               session: aiohttp.ClientSession,
+                               method: str,
+                               url: str,
+                               data: Optional[Dict[str, Any]],
+                               json_data: Optional[Dict[str, Any]],
+                               headers: Optional[Dict[str, str]],
+                               timeout: Optional[int],
+                               cache_key: Optional[tuple],
+                               stale_entry: Optional[tuple] = None,
+                               lenient_json: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Gửi một request qua session đã cho; cache response nếu có cache_key
+
+        stale_entry là entry cache đã gửi ETag/Last-Modified của nó; response 304
+        trả về dữ liệu của entry này kể cả khi nó không còn trong cache.
+        
+        lenient_json=True (sync API, giống requests.Response.json()): response 200
+        có Content-Type không phải JSON vẫn được thử parse như JSON.
+        """
+        start_time = time.monotonic()
+        
+        try:
+            # Prepare request kwargs
+            request_kwargs = {
+                'url': url,
+                'method': method.upper()
+            }
+            
+            # Add headers
+            if headers:
+                request_kwargs['headers'] = headers
+            
+            # Add data
+            if json_data:
+                request_kwargs['json'] = json_data
+            elif data:
+                request_kwargs['data'] = data
+            
+            # Custom timeout (không truyền thì session dùng timeout mặc định)
+            if timeout and timeout != self.session_timeout:
+                request_kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout)
+            
+            # aiohttp không lấy proxy từ ClientSession, phải truyền theo từng request
+            if self._proxy_url:
+                request_kwargs['proxy'] = self._proxy_url
+            
+            # Make request
+            async with session.request(**request_kwargs) as response:
+                # Log request
+                self.logger.debug(f"{method.upper()} {url} - Status: {response.status}")
                 
-                # Make request
-                async with self._aiohttp_session.request(**request_kwargs) as response:
-                    # Log request
-                    self.logger.debug(f"{method.upper()} {url} - Status: {response.status}")
+                # Check status
+                if response.status == 200:
+                    content_type = response.headers.get('Content-Type', '').lower()
+                    is_json = _JSON_CONTENT_TYPE_RE.match(content_type) is not None
+                    if not is_json and not lenient_json:
+                        # Response không phải JSON: chỉ đọc phần đầu body để log
+                        text_response = await self._read_preview(response)
+                        self.logger.warning(f"Non-JSON response from {url}: {text_response[:200]}")
+                        
+                        response_time = time.monotonic() - start_time
+                        self._update_stats(False, response_time)
+                        return None
                     
-                    # Check status
-                    if response.status == 200:
+                    body = (await response.read()).strip()
+                    if is_json:
+                        response_data = _loads_json(body, response.charset) if body else None
+                    else:
                         try:
-                            response_data = await response.json()
-                            
-                            # Cache successful GET responses
-                            if method.upper() == 'GET' and use_cache and cache_key:
-                                self._response_cache[cache_key] = {
-                                    'data': response_data,
-                                    'timestamp': time.time()
-                                }
-                            
-                            response_time = time.time() - start_time
-                            self._update_stats(True, response_time)
-                            
-                            return response_data
-                            
-                        except aiohttp.ContentTypeError:
-                            # Response không phải JSON
-                            text_response = await response.text()
+                            response_data = _loads_json(body, response.charset)
+                        except ValueError:
+                            text_response = body[:_PREVIEW_BYTES].decode(response.charset or 'utf-8', 'replace')
                             self.logger.warning(f"Non-JSON response from {url}: {text_response[:200]}")
                             
-                            response_time = time.time() - start_time
+                            response_time = time.monotonic() - start_time
                             self._update_stats(False, response_time)
                             return None
                     
-                    elif response.status == 404:
-                        self.logger.warning(f"Resource not found: {url}")
-                        response_time = time.time() - start_time
-                        self._update_stats(False, response_time)
-                        return None
+                    # Cache successful GET responses (kèm validator cho lần revalidate sau)
+                    if cache_key is not None:
+                        self._response_cache[cache_key] = (
+                            time.monotonic(), response_data,
+                            response.headers.get('ETag'), response.headers.get('Last-Modified')
+                        )
+                        self._response_cache.move_to_end(cache_key)
+                        if len(self._response_cache) > self._cache_max:
+                            self._response_cache.popitem(last=False)
                     
-                    else:
-                        error_text = await response.text()
-                        self.logger.error(f"HTTP {response.status} for {url}: {error_text[:200]}")
-                        response_time = time.time() - start_time
-                        self._update_stats(False, response_time)
-                        return None
-            
-            except asyncio.TimeoutError:
-                response_time = time.time() - start_time
-                self.logger.error(f"Timeout for {url}")
-                self._update_stats(False, response_time)
-                return None
-            
-            except Exception as e:
-                response_time = time.time() - start_time
-                self.logger.error(f"Request error for {url}: {e}")
-                self._update_stats(False, response_time)
-                return None
+                    response_time = time.monotonic() - start_time
+                    self._update_stats(True, response_time)
+                    
+                    return response_data
+                
+                elif response.status == 304 and cache_key is not None and stale_entry is not None:
+                    # Not Modified: làm mới TTL của entry cũ (đưa lại vào cache nếu đã bị xoá)
+                    _, response_data, etag, last_modified = stale_entry
+                    self._response_cache[cache_key] = (
+                        time.monotonic(), response_data,
+                        response.headers.get('ETag', etag), response.headers.get('Last-Modified', last_modified)
+                    )
+                    self._response_cache.move_to_end(cache_key)
+                    if len(self._response_cache) > self._cache_max:
+                        self._response_cache.popitem(last=False)
+                    self.logger.debug(f"Not modified: {url}")
+                    
+                    response_time = time.monotonic() - start_time
+                    self._update_stats(True, response_time)
+                    
+                    return response_data
+                
+                elif response.status == 404:
+                    self.logger.warning(f"Resource not found: {url}")
+                    response_time = time.monotonic() - start_time
+                    self._update_stats(False, response_time)
+                    return None
+                
+                else:
+                    error_text = await self._read_preview(response)
+                    self.logger.error(f"HTTP {response.status} for {url}: {error_text[:200]}")
+                    response_time = time.monotonic() - start_time
+                    self._update_stats(False, response_time)
+                    return None
+        
+        except asyncio.TimeoutError:
+            response_time = time.monotonic() - start_time
+            self.logger.error(f"Timeout for {url}")
+            self._update_stats(False, response_time)
+            return None
+        
+        except Exception as e:
+            response_time = time.monotonic() - start_time
+            self.logger.error(f"Request error for {url}: {e}")
+            self._update_stats(False, response_time)
+            return None
+    
+    @staticmethod
+    async def _read_preview(response: aiohttp.ClientResponse, limit: int = _PREVIEW_BYTES) -> str:
+        """
+        Đọc tối đa limit byte đầu của body (để log), không nạp cả body vào bộ nhớ
+        
+        Phần còn lại không được đọc; connection bị đóng thay vì trả về pool
+        khi response được release.
+        """
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(4096):
+            buf += chunk
+            if len(buf) >= limit:
+                break
+        return buf[:limit].decode(response.charset or 'utf-8', 'replace')
+    
+    async def _acquire_slot(self):
+        """Chờ tới khi số request đang chạy nhỏ hơn max_concurrent rồi chiếm một slot"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.max_concurrent)
+            self._active += 1
+    
+    async def _release_slot(self):
+        """Trả slot và đánh thức một request đang chờ"""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def set_max_concurrent(self, max_concurrent: int):
+        """
+        Đổi số request đồng thời tối đa lúc runtime
+        
+        Request đang chạy không bị ảnh hưởng; khi giảm giới hạn, request mới
+        chờ tới khi số request đang chạy xuống dưới mức mới.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        async with self._cond:
+            self.max_concurrent = max_concurrent
+            self._cond.notify_all()
     
     # =============================================================================
     # SYNC METHODS
@@ -449,78 +649,33 @@ class VSSApiClient:
                           headers: Optional[Dict[str, str]] = None,
                           timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
-        Core sync request method với error handling
-        """
-        self._ensure_requests_session()
+        Core sync request method: chạy request aiohttp trên event loop riêng
+        của client (background thread) và chờ kết quả
         
-        # Build URL
+        Thread và session này chỉ được giải phóng bởi close_sync() (hoặc thoát `with`).
+        """
+        loop = self._ensure_loop_thread()
         url = self._build_url(endpoint, params)
-        
-        start_time = time.time()
-        
-        try:
-            # Prepare request kwargs
-            request_kwargs = {
-                'timeout': timeout or self.session_timeout
-            }
-            
-            # Add headers
-            if headers:
-                request_kwargs['headers'] = headers
-            
-            # Add data
-            if json_data:
-                request_kwargs['json'] = json_data
-            elif data:
-                request_kwargs['data'] = data
-            
-            # Make request
-            response = self._requests_session.request(
-                method=method.upper(),
-                url=url,
-                **request_kwargs
-            )
-            
-            # Log request
-            self.logger.debug(f"{method.upper()} {url} - Status: {response.status_code}")
-            
-            # Check status
-            if response.status_code == 200:
-                try:
-                    response_data = response.json()
-                    response_time = time.time() - start_time
-                    self._update_stats(True, response_time)
-                    return response_data
-                    
-                except requests.exceptions.JSONDecodeError:
-                    self.logger.warning(f"Non-JSON response from {url}: {response.text[:200]}")
-                    response_time = time.time() - start_time
-                    self._update_stats(False, response_time)
-                    return None
-            
-            elif response.status_code == 404:
-                self.logger.warning(f"Resource not found: {url}")
-                response_time = time.time() - start_time
-                self._update_stats(False, response_time)
-                return None
-            
-            else:
-                self.logger.error(f"HTTP {response.status_code} for {url}: {response.text[:200]}")
-                response_time = time.time() - start_time
-                self._update_stats(False, response_time)
-                return None
-        
-        except requests.exceptions.Timeout:
-            response_time = time.time() - start_time
-            self.logger.error(f"Timeout for {url}")
-            self._update_stats(False, response_time)
-            return None
-        
-        except Exception as e:
-            response_time = time.time() - start_time
-            self.logger.error(f"Request error for {url}: {e}")
-            self._update_stats(False, response_time)
-            return None
+        future = asyncio.run_coroutine_threadsafe(
+            self._sync_request(method, url, data, json_data, headers, timeout or self.session_timeout),
+            loop
+        )
+        return future.result()
+    
+    async def _sync_request(self,
+                            method: str,
+                            url: str,
+                            data: Optional[Dict[str, Any]],
+                            json_data: Optional[Dict[str, Any]],
+                            headers: Optional[Dict[str, str]],
+                            timeout: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Chạy trên event loop của sync API, dùng session riêng của loop đó"""
+        if not self._sync_session or self._sync_session.closed:
+            self._sync_session = self._create_session()
+        return await self._perform_request(
+            self._sync_session, method, url, data, json_data, headers, timeout, None,
+            lenient_json=True
+        )
     
     # =============================================================================
     # VSS SPECIFIC METHODS
@@ -549,6 +704,31 @@ class VSSApiClient:
         response = await self.get_async(endpoint, use_cache=True)
         return response.get('hospitals', []) if response else None
     
+    async def get_province_bundle_async(self, province_code: str) -> Dict[str, Any]:
+        """
+        Lấy đồng thời thông tin tỉnh, quận/huyện, phường/xã và bệnh viện
+        
+        Bốn request chạy song song qua asyncio.gather, mỗi request vẫn chiếm
+        một slot giới hạn đồng thời như khi gọi riêng lẻ.
+        
+        Returns:
+            Dict với các key province/districts/wards/hospitals; phần nào lỗi là None
+        """
+        results = await asyncio.gather(
+            self.get_province_data_async(province_code),
+            self.get_districts_async(province_code),
+            self.get_wards_async(province_code),
+            self.get_hospitals_async(province_code),
+            return_exceptions=True
+        )
+        bundle = {}
+        for key, result in zip(('province', 'districts', 'wards', 'hospitals'), results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Error fetching {key} for province {province_code}: {result}")
+                result = None
+            bundle[key] = result
+        return bundle
+    
     def get_province_data(self, province_code: str) -> Optional[Dict[str, Any]]:
         """Sync version: Lấy thông tin tỉnh thành theo mã"""
         endpoint = f"/api/provinces/{province_code}"
@@ -583,7 +763,10 @@ class VSSApiClient:
     
     def get_stats(self) -> Dict[str, Any]:
         """Lấy thống kê performance"""
-        return self.stats.copy()
+        stats = self.stats.copy()
+        if stats['last_request_time'] is not None:
+            stats['last_request_time'] = datetime.fromtimestamp(stats['last_request_time']).isoformat()
+        return stats
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Lấy thông tin cache"""
@@ -600,6 +783,7 @@ class VSSApiClient:
             'total_entries': len(self._response_cache),
             'valid_entries': valid_entries,
             'expired_entries': expired_entries,
+            'max_entries': self._cache_max,
             'cache_ttl_seconds': self._cache_ttl
         }
     
@@ -632,10 +816,20 @@ class VSSApiClient:
             self.logger.debug("AioHTTP session closed")
     
     def close_sync(self):
-        """Đóng sync session"""
-        if self._requests_session:
-            self._requests_session.close()
-            self.logger.debug("Requests session closed")
+        """Đóng session của sync API và dừng event loop background"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None:
+            return
+        
+        if self._sync_session and not self._sync_session.closed:
+            asyncio.run_coroutine_threadsafe(self._sync_session.close(), loop).result()
+        self._sync_session = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        self.logger.debug("Sync session closed")
     
     async def health_check(self) -> bool:
         """
@@ -653,4 +847,4 @@ class VSSApiClient:
             return False
     
     def __repr__(self):
-        return f"VSSApiClient(base_url='{self.api_config.base_url}', stats={self.stats})"
+        return f"VSSApiClient(base_url='{self.api_config.base_url}', stats={self.get_stats()})"
@@ -56,17 +56,18 @@ class VSS_EnhancedExtractor(BaseExtractor):
         """
         try:
             # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = self.parse_html(html_content)
+            css_tree = self.build_css_tree(html_content, soup)
             
             # Initialize results container
-            extraction_results = self._initialize_results_container(soup, input_data)
+            extraction_results = self._initialize_results_container(css_tree, input_data)
             
             # Extract từng field
             for field_name in self.field_patterns.keys():
                 self.logger.info(f"Extracting field: {field_name}")
                 
                 field_result = self._extract_single_field(
-                    soup, field_name, html_content, input_data
+                    soup, field_name, html_content, input_data, css_tree
                 )
                 
                 extraction_results['extracted_fields'][field_name] = field_result
@@ -89,7 +90,7 @@ class VSS_EnhancedExtractor(BaseExtractor):
             self.logger.error(f"Error in extract_enhanced_fields: {e}")
             return self._create_error_response(str(e))
 
-    def _initialize_results_container(self, soup: BeautifulSoup, input_data: Dict = None) -> Dict[str, Any]:
+    def _initialize_results_container(self, soup: Any, input_data: Dict = None) -> Dict[str, Any]:
         """Initialize results container with metadata"""
         html_analysis = self.analyze_html_structure(soup)
         
@@ -105,7 +106,8 @@ class VSS_EnhancedExtractor(BaseExtractor):
         }
 
     def _extract_single_field(self, soup: BeautifulSoup, field_name: str, 
-                            html_content: str, input_data: Dict = None) -> ExtractionResult:
+                            html_content: str, input_data: Dict = None,
+                            css_tree: Any = None) -> ExtractionResult:
         """Extract một field với multiple strategies và fallback"""
         
         pattern = self.field_patterns[field_name]
@@ -113,7 +115,9 @@ class VSS_EnhancedExtractor(BaseExtractor):
         
         try:
             # Strategy 1: CSS Selectors
-            css_result = self.extract_by_css_selectors(soup, field_name, pattern.css_selectors)
+            css_result = self.extract_by_css_selectors(
+                css_tree if css_tree is not None else soup, field_name, pattern.css_selectors
+            )
             if css_result:
                 extraction_attempts.append(('css_selector', css_result, 0.9))
             
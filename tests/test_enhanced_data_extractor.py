@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test cases cho fast path regex của EnhancedDataExtractor (bảng nhãn/giá trị VSS)
+"""
+
+import unittest
+import sys
+import os
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.enhanced_data_extractor import EnhancedDataExtractor
+
+MEMBERS_KEY = 'enhanced_thong_tin_thanh_vien_hgd'
+
+LABEL_ROWS = """
+<tr><td>Họ và tên:</td><td>NGUYỄN VĂN ANH</td></tr>
+<tr><td>Ngày sinh:</td><td>15/03/1985</td></tr>
+<tr><td>Số BHXH:</td><td>0312345678</td></tr>
+"""
+
+# Có nhãn "Mã hộ gia đình" và một bảng 3 cột không liên quan tới thành viên
+UNRELATED_TABLE_HTML = """
+<html><body>
+<table>""" + LABEL_ROWS + """<tr><td>Mã hộ gia đình:</td><td>HGD202301234</td></tr>
+</table>
+<table>
+<tr><td>Kỳ</td><td>Số tiền</td><td>Trạng thái</td></tr>
+<tr><td>01/2024</td><td>1.200.000</td><td>Đã đóng</td></tr>
+<tr><td>02/2024</td><td>1.200.000</td><td>Đã đóng</td></tr>
+</table>
+</body></html>
+"""
+
+# Bảng thành viên có header nhắc tới thành viên
+MEMBER_HEADER_HTML = """
+<html><body>
+<table>""" + LABEL_ROWS + """</table>
+<table>
+<tr><th>Thành viên</th><th>Quan hệ</th><th>Năm sinh</th></tr>
+<tr><td>Trần Thị Bình</td><td>Vợ</td><td>1987</td></tr>
+<tr><td>Nguyễn Văn Cường</td><td>Con</td><td>2015</td></tr>
+</table>
+</body></html>
+"""
+
+# Bảng thành viên chỉ có heading ngay trước bảng (như HTML mẫu VSS)
+MEMBER_HEADING_HTML = """
+<html><body>
+<table>""" + LABEL_ROWS + """<tr><td>Mã hộ gia đình:</td><td>HGD202301234</td></tr>
+</table>
+<table>
+<tr><td>01/2024</td><td>1.200.000</td><td>Đã đóng</td></tr>
+</table>
+<h3>Thành viên hộ gia đình</h3>
+<table>
+<tr><th>Tên</th><th>Quan hệ</th><th>Năm sinh</th></tr>
+<tr><td>Demo Spouse</td><td>Vợ/Chồng</td><td>1975</td></tr>
+</table>
+</body></html>
+"""
+
+# Trang mẫu VSS (như _build_sample_vss_html của enhanced_vss_collector)
+SAMPLE_VSS_HTML = """
+<html><body>
+<h2>Thông tin Bảo hiểm xã hội - CCCD: 031073001234</h2>
+<table>""" + LABEL_ROWS + """<tr><td>Trạng thái:</td><td>Đang đóng</td></tr>
+<tr><td>Đơn vị làm việc:</td><td>Công ty Demo 34</td></tr>
+<tr><td>Mã hộ gia đình:</td><td>HGD001234</td></tr>
+<tr><td>Điện thoại:</td><td>0980001234</td></tr>
+<tr><td>Thu nhập:</td><td>12,500,000 VND</td></tr>
+<tr><td>Ngân hàng:</td><td>VCB</td></tr>
+</table>
+<div class='household-info'>
+<h3>Thành viên hộ gia đình</h3>
+<table>
+<tr><th>Tên</th><th>Quan hệ</th><th>Năm sinh</th></tr>
+<tr><td>Demo Spouse</td><td>Vợ/Chồng</td><td>1975</td></tr>
+<tr><td>Demo Child</td><td>Con</td><td>2000</td></tr>
+</table>
+</div>
+</body></html>
+"""
+
+# Từ khóa địa chỉ buộc parse_enhanced_bhxh_data dùng đường BeautifulSoup
+ADDRESS_LINE = '<p>Địa chỉ thường trú: Số 1, phường A, quận B, thành phố Hải Phòng</p>'
+
+# Metadata khác nhau giữa hai đường parse
+PATH_METADATA_KEYS = ('extraction_timestamp', 'extraction_method', 'soup_elements_count', 'html_length')
+
+
+class TestEnhancedDataExtractorFastPath(unittest.TestCase):
+    """Fast path chỉ đọc thành viên trong bảng thành viên hộ gia đình"""
+    
+    def setUp(self):
+        self.extractor = EnhancedDataExtractor()
+    
+    def _parse(self, html):
+        result = self.extractor.parse_enhanced_bhxh_data(html, '031073001234')
+        self.assertEqual(result['extraction_method'], 'enhanced_parser_v1.0_regex_table')
+        return result
+    
+    def _parse_dom(self, html):
+        with patch.object(EnhancedDataExtractor, '_parse_label_table', return_value=None):
+            return self.extractor.parse_enhanced_bhxh_data(html, '031073001234')
+    
+    def test_unrelated_three_column_table_is_not_members(self):
+        """Bảng 3 cột không liên quan không được coi là thành viên hộ gia đình"""
+        result = self._parse(UNRELATED_TABLE_HTML)
+        self.assertFalse(result.get(MEMBERS_KEY))
+        self.assertEqual(result['ho_ten'], 'NGUYỄN VĂN ANH')
+    
+    def test_member_table_with_header_matches_dom_path(self):
+        """Bảng có header thành viên: cùng danh sách thành viên với đường BeautifulSoup"""
+        result = self._parse(MEMBER_HEADER_HTML)
+        expected = [
+            {'ten': 'Trần Thị Bình', 'quan_he': 'Vợ', 'nam_sinh': '1987'},
+            {'ten': 'Nguyễn Văn Cường', 'quan_he': 'Con', 'nam_sinh': '2015'},
+        ]
+        self.assertEqual(result[MEMBERS_KEY], expected)
+        self.assertEqual(self._parse_dom(MEMBER_HEADER_HTML)[MEMBERS_KEY], expected)
+    
+    def test_member_table_after_heading(self):
+        """Heading ngay trước bảng đánh dấu bảng thành viên; bảng khác bị bỏ qua"""
+        result = self._parse(MEMBER_HEADING_HTML)
+        self.assertEqual(result[MEMBERS_KEY],
+                         [{'ten': 'Demo Spouse', 'quan_he': 'Vợ/Chồng', 'nam_sinh': '1975'}])
+
+
+class TestEnhancedDataExtractorPathConsistency(unittest.TestCase):
+    """Fast path regex và đường BeautifulSoup cho cùng kết quả"""
+    
+    def _both_paths(self, html, parser):
+        extractor = EnhancedDataExtractor(parser=parser)
+        fast = extractor.parse_enhanced_bhxh_data(html, '031073001234')
+        with patch.object(EnhancedDataExtractor, '_parse_label_table', return_value=None):
+            dom = extractor.parse_enhanced_bhxh_data(html, '031073001234')
+        strip = lambda result: {k: v for k, v in result.items() if k not in PATH_METADATA_KEYS}
+        return fast, strip(fast), strip(dom)
+    
+    def test_sample_page(self):
+        """Trang mẫu: cùng họ tên, mã hộ và thành viên trên cả hai đường"""
+        for parser in ('html.parser', 'lxml'):
+            with self.subTest(parser=parser):
+                fast, fast_data, dom_data = self._both_paths(SAMPLE_VSS_HTML, parser)
+                self.assertEqual(fast['extraction_method'], 'enhanced_parser_v1.0_regex_table')
+                self.assertEqual(fast_data, dom_data)
+                self.assertEqual(dom_data['ho_ten'], 'NGUYỄN VĂN ANH')
+                self.assertEqual(dom_data['enhanced_ma_ho_gia_dinh'], 'HGD001234')
+                self.assertEqual(dom_data[MEMBERS_KEY], [
+                    {'ten': 'Demo Spouse', 'quan_he': 'Vợ/Chồng', 'nam_sinh': '1975'},
+                    {'ten': 'Demo Child', 'quan_he': 'Con', 'nam_sinh': '2000'},
+                ])
+    
+    def test_sample_page_with_address(self):
+        """Thêm dòng địa chỉ (đi đường BeautifulSoup) chỉ thêm địa chỉ chi tiết"""
+        html = SAMPLE_VSS_HTML.replace('</body>', ADDRESS_LINE + '</body>')
+        _, _, sample_data = self._both_paths(SAMPLE_VSS_HTML, 'html.parser')
+        for parser in ('html.parser', 'lxml'):
+            with self.subTest(parser=parser):
+                fast, fast_data, dom_data = self._both_paths(html, parser)
+                self.assertEqual(fast['extraction_method'], 'enhanced_parser_v1.0')
+                self.assertEqual(fast_data, dom_data)
+                self.assertIn('thường trú', dom_data.pop('enhanced_dia_chi_chi_tiet'))
+                self.assertEqual(dom_data, sample_data)
+    
+    def test_fixtures_match(self):
+        """Các HTML fixture khác cũng cho cùng kết quả trên hai đường"""
+        for html in (UNRELATED_TABLE_HTML, MEMBER_HEADER_HTML, MEMBER_HEADING_HTML):
+            _, fast_data, dom_data = self._both_paths(html, 'html.parser')
+            self.assertEqual(fast_data, dom_data)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
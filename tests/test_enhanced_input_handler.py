@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test cases cho EnhancedInputHandler (xử lý theo cột và lỗi từng dòng)
+"""
+
+import unittest
+import logging
+import json
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.enhanced_input_handler import EnhancedInputHandler
+
+
+def _new_format_frame(bhxh_values):
+    """DataFrame như read_enhanced_input tạo ra (tên cột đã chuẩn hóa)"""
+    count = len(bhxh_values)
+    return pd.DataFrame({
+        'HỌ VÀ TÊN': ['Nguyễn Văn An', 'Trần Thị Bình', 'Lê Văn Cường'][:count],
+        'SỐ CCCD': ['001100000001', '001100000002', '001100000003'][:count],
+        'TỈNH, THÀNH PHỐ': ['Hà Nội', 'Hải Phòng', 'Hải Phòng'][:count],
+        'SỐ BẢO HIỂM XÃ HỘI': pd.Series(bhxh_values, dtype=object),
+        'NĂM SINH': [1980, 1990, 1985][:count],
+    })
+
+
+class TestRowErrors(unittest.TestCase):
+    """Dòng có ô lỗi được ghi vào validation_errors, không làm hỏng cả file"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.handler = EnhancedInputHandler()
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def _process(self, bhxh_values):
+        df = self.handler._cast_text_columns(
+            _new_format_frame(bhxh_values), EnhancedInputHandler._INPUT_TEXT_COLUMNS
+        )
+        records = self.handler._process_new_format(df)
+        self.handler._store_frame(records)
+        return records
+
+    def test_malformed_cell_is_recorded(self):
+        """Ô số BHXH vô hạn: dòng đó vào validation_errors, các dòng khác vẫn xử lý"""
+        records = self._process(['0123456789', float('inf'), '0123456780'])
+
+        self.assertEqual(records['input_row_index'].tolist(), [1, 3])
+        self.assertEqual(records['ho_ten'].tolist(), ['Nguyễn Văn An', 'Lê Văn Cường'])
+        self.assertEqual(len(self.handler.validation_errors), 1)
+        error = self.handler.validation_errors[0]
+        self.assertEqual(error['row'], 2)
+        self.assertEqual(error['data']['HỌ VÀ TÊN'], 'Trần Thị Bình')
+        self.assertEqual(self.handler.get_processing_summary()['validation_errors'], 1)
+
+    def test_clean_file_has_no_errors(self):
+        """File không có ô lỗi: cùng kết quả, validation_errors rỗng"""
+        records = self._process(['0123456789', '0123456781', '0123456780'])
+
+        self.assertEqual(records['input_row_index'].tolist(), [1, 2, 3])
+        self.assertEqual(records['validation_status'].tolist(), ['valid', 'valid', 'valid'])
+        self.assertEqual(self.handler.validation_errors, [])
+
+    def test_report_contains_row_errors(self):
+        """Báo cáo JSON ghi lại dòng lỗi"""
+        self._process(['0123456789', float('inf'), '0123456780'])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_path = os.path.join(tmp_dir, 'report.json')
+            self.handler.save_processing_report(report_path)
+            with open(report_path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(report['summary']['validation_errors'], 1)
+        self.assertEqual([error['row'] for error in report['validation_errors']], [2])
+        self.assertEqual(len(report['processed_records']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test cases cho IncomeNormalizer (số tiền và đơn vị trong một lần regex search)
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.normalizers.field_normalizers import IncomeNormalizer
+
+
+class TestIncomeNormalizer(unittest.TestCase):
+    """Test parse số tiền thu nhập"""
+
+    def setUp(self):
+        self.normalizer = IncomeNormalizer()
+
+    def test_amount_with_separators(self):
+        """Dấu phân cách nghìn bị bỏ, không có đơn vị thì không nhân"""
+        result = self.normalizer.normalize('12.500.000 VNĐ')
+
+        self.assertTrue(result.parsing_successful)
+        self.assertEqual(result.amount, 12500000)
+        self.assertIsNone(result.multiplier_applied)
+        self.assertEqual(result.formatted, '12,500,000 VND')
+
+    def test_unit_after_amount(self):
+        """Đơn vị đứng ngay sau số tiền được áp dụng, không phân biệt hoa thường"""
+        cases = [
+            ('15 triệu', 15000000, 'triệu'),
+            ('500k', 500000, 'k'),
+            ('Lương 800 nghìn đồng', 800000, 'nghìn'),
+            ('3 Million', 3000000, 'million'),
+        ]
+        for income, amount, unit in cases:
+            with self.subTest(income=income):
+                result = self.normalizer.normalize(income)
+                self.assertEqual(result.amount, amount)
+                self.assertEqual(result.multiplier_applied, unit)
+
+    def test_unit_letter_inside_word_is_ignored(self):
+        """Chữ 'k' trong 'khoảng' không phải đơn vị nghìn"""
+        result = self.normalizer.normalize('khoảng 5.000.000 VND')
+
+        self.assertEqual(result.amount, 5000000)
+        self.assertIsNone(result.multiplier_applied)
+
+    def test_range_uses_first_amount(self):
+        """Khoảng thu nhập chỉ lấy số đầu tiên thay vì ghép mọi chữ số"""
+        result = self.normalizer.normalize('5.000.000 - 10.000.000 VND')
+
+        self.assertEqual(result.amount, 5000000)
+
+    def test_range_unit_applies_to_first_bound(self):
+        """Đơn vị chỉ ghi sau cận trên vẫn áp dụng cho cận dưới"""
+        cases = [
+            ('Lương 10 - 15 triệu', 10000000, 'triệu'),
+            ('10 đến 15 triệu', 10000000, 'triệu'),
+            ('500-800k', 500000, 'k'),
+            ('2 triệu - 500 nghìn', 2000000, 'triệu'),
+        ]
+        for income, amount, unit in cases:
+            with self.subTest(income=income):
+                result = self.normalizer.normalize(income)
+                self.assertEqual(result.amount, amount)
+                self.assertEqual(result.multiplier_applied, unit)
+
+    def test_compound_units(self):
+        """Số tiền ghép nhiều đơn vị được cộng lại"""
+        cases = [
+            ('12 triệu 500 nghìn', 12500000),
+            ('1 tỷ 200 triệu đồng', 1200000000),
+            ('3 triệu 200k - 4 triệu', 3200000),
+            # Đơn vị sau không nhỏ hơn: không phải số ghép
+            ('5 nghìn 2 triệu', 5000),
+        ]
+        for income, amount in cases:
+            with self.subTest(income=income):
+                result = self.normalizer.normalize(income)
+                self.assertEqual(result.amount, amount)
+                self.assertEqual(result.formatted, f"{amount:,} VND")
+
+    def test_no_amount(self):
+        """Không có số thì parsing_successful=False; chuỗi rỗng trả về None"""
+        result = self.normalizer.normalize('không có')
+
+        self.assertFalse(result.parsing_successful)
+        self.assertEqual(result.amount, 0)
+        self.assertIsNone(self.normalizer.normalize(''))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test cases cho các đường batch/vector của validators, so với đường scalar
+"""
+
+import unittest
+import random
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.config.data_models import MemberInfo, NormalizedIncome
+from src.validators.field_validators import (
+    CrossValidator, IncomeValidator, MemberInfoValidator, PhoneValidator, ValidatorFactory,
+    _indel_similarity
+)
+
+
+def _income(amount: int) -> NormalizedIncome:
+    return NormalizedIncome(amount=amount, currency='VND', formatted=f"{amount:,} VND", original=str(amount))
+
+
+def _lcs_length(a: str, b: str) -> int:
+    """LCS quy hoạch động O(len(a) * len(b)) làm mốc cho bản bit-parallel"""
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+class TestIndelSimilarity(unittest.TestCase):
+    """Test _indel_similarity và CrossValidator.compare_generic_batch"""
+
+    def setUp(self):
+        self.cross_validator = CrossValidator()
+
+    def test_known_values(self):
+        """Giá trị giống fuzz.ratio / 100 của rapidfuzz"""
+        self.assertEqual(_indel_similarity('', ''), 1.0)
+        self.assertEqual(_indel_similarity('abc', ''), 0.0)
+        self.assertAlmostEqual(_indel_similarity('abc', 'abd'), 2 / 3)
+        self.assertAlmostEqual(_indel_similarity('this is a test', 'this is a test!'), 28 / 29)
+        self.assertAlmostEqual(_indel_similarity('vietcombank', 'vcb'), 6 / 14)
+
+    def test_matches_dynamic_programming_lcs(self):
+        """Bằng 1 - (tổng độ dài - 2 * LCS) / tổng độ dài trên các cặp ngẫu nhiên"""
+        rng = random.Random(20250913)
+        alphabet = 'abcđêô '
+        for _ in range(500):
+            a = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+            b = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+            total = len(a) + len(b)
+            expected = 1.0 if not total else 1 - (total - 2 * _lcs_length(a, b)) / total
+            self.assertAlmostEqual(_indel_similarity(a, b), expected, msg=(a, b))
+
+    def test_generic_batch_matches_scalar(self):
+        """compare_generic_batch cùng kết quả với _compare_generic_values từng cặp"""
+        extracted = ['Vietcombank', ' BIDV ', 'HGD12345678', 'abc', '', 12345]
+        inputs = ['vietcombank', 'bidv', 'HGD1234567', 'xyz', '', '12346']
+
+        batch = self.cross_validator.compare_generic_batch(extracted, inputs)
+
+        for i, (extracted_value, input_value) in enumerate(zip(extracted, inputs)):
+            scalar = self.cross_validator._compare_generic_values(extracted_value, input_value)
+            self.assertEqual(bool(batch['match'][i]), scalar['match'], i)
+            self.assertAlmostEqual(float(batch['similarity'][i]), scalar['similarity'], msg=i)
+        self.assertEqual(batch['match'].dtype, np.bool_)
+
+
+class TestValidateBatch(unittest.TestCase):
+    """Test ValidatorFactory.validate_batch so với validate(value).is_valid"""
+
+    def _assert_matches_scalar(self, field_name, values):
+        validator = ValidatorFactory.get_validator(field_name)
+        self.assertEqual(
+            ValidatorFactory.validate_batch(field_name, values),
+            [validator.validate(value).is_valid for value in values]
+        )
+
+    def test_phone(self):
+        """Số điện thoại: pattern và độ dài"""
+        self._assert_matches_scalar(
+            'so_dien_thoai', ['0912345678', '09123456789', '0012345678', '091234567', '', None, '0912 345 678']
+        )
+
+    def test_household_code(self):
+        """Mã hộ gia đình: pattern và độ dài"""
+        self._assert_matches_scalar(
+            'ma_ho_gia_dinh', ['HGD12345678', 'hgd12345678', 'HGD123', 'A' * 16, '', None]
+        )
+
+    def test_field_without_format_rule(self):
+        """Field khác đi qua validate() như thường"""
+        self._assert_matches_scalar('thu_nhap', [
+            NormalizedIncome(amount=5000000, currency='VND', formatted='5,000,000 VND', original='5000000'),
+            NormalizedIncome(amount=0, currency='VND', formatted='x', original='x', parsing_successful=False),
+            None
+        ])
+
+    def test_registered_validator_replaces_format_rule(self):
+        """Validator đăng ký thay thế không dùng format rule của validator cũ"""
+        class AcceptAllPhoneValidator(PhoneValidator):
+            def validate(self, phone):
+                return super().validate('0912345678')
+
+        ValidatorFactory.register_validator('so_dien_thoai', AcceptAllPhoneValidator)
+        try:
+            self.assertEqual(ValidatorFactory.validate_batch('so_dien_thoai', ['abc']), [True])
+        finally:
+            ValidatorFactory.register_validator('so_dien_thoai', PhoneValidator)
+
+
+class TestIncomeBatch(unittest.TestCase):
+    """Test IncomeValidator.validate_many và CrossValidator.compare_income_batch"""
+
+    def test_validate_many_matches_scalar(self):
+        """is_valid/is_reasonable giống validate() và NormalizedIncome.is_reasonable"""
+        amounts = [0, 99999, 100000, 5000000, 100000000, 100000001, 10 ** 12]
+        validator = IncomeValidator()
+
+        is_valid, is_reasonable = validator.validate_many(np.array(amounts))
+
+        self.assertEqual(is_valid.tolist(), [validator.validate(_income(a)).is_valid for a in amounts])
+        self.assertEqual(is_reasonable.tolist(), [_income(a).is_reasonable for a in amounts])
+
+    def test_compare_income_batch_matches_scalar(self):
+        """match/similarity giống _compare_income_values từng cặp"""
+        cross_validator = CrossValidator()
+        extracted = [_income(5000000), 5400000, '5,600,000', 0, 1000, 'abc', _income(8000000)]
+        inputs = ['5000000', 5000000, '5,000,000', 0, '0', 5000000, 'n/a']
+
+        batch = cross_validator.compare_income_batch(extracted, inputs)
+
+        for i, (extracted_value, input_value) in enumerate(zip(extracted, inputs)):
+            scalar = cross_validator._compare_income_values(extracted_value, input_value)
+            self.assertEqual(bool(batch['match'][i]), scalar['match'], i)
+            self.assertAlmostEqual(float(batch['similarity'][i]), scalar['similarity'], msg=i)
+        # Cặp không so được dạng số
+        self.assertTrue(np.isnan(batch['diff_percent'][5]))
+        self.assertTrue(np.isnan(batch['diff_percent'][6]))
+
+
+class TestMemberValidateBatch(unittest.TestCase):
+    """Test MemberInfoValidator.validate_batch so với validate() từng hộ"""
+
+    def test_matches_scalar(self):
+        """Cùng is_valid, errors và warnings (kể cả thứ tự) với validate() từng hộ"""
+        households = [
+            [MemberInfo('Nguyễn Văn An', 'Con', '2005'), MemberInfo('Trần Thị Bình', 'Vợ', '1980')],
+            [],
+            None,
+            [MemberInfo('', 'Bạn', '1850'), MemberInfo('Lê Văn C', '', 'abc')],
+            [MemberInfo('Phạm Thị D', 'Mẹ', '9999'), MemberInfo('Hoàng E', 'Cha', None),
+             MemberInfo('Vũ F', 'Con', '０２０１０'), MemberInfo('Đỗ G', 'Em', '1' * 25),
+             MemberInfo('Bùi H', 'Chị', 1990)],
+        ]
+        validator = MemberInfoValidator()
+
+        batch = validator.validate_batch(households)
+
+        self.assertEqual(len(batch), len(households))
+        for members, result in zip(households, batch):
+            expected = validator.validate(members)
+            self.assertEqual(result.is_valid, expected.is_valid)
+            self.assertEqual(result.errors, expected.errors)
+            self.assertEqual(result.warnings, expected.warnings)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test cases cho src.utils (ConfigManager, ResultExporter, ExtractionLogger)
+"""
+
+import unittest
+import sys
+import os
+import gc
+import json
+import logging
+import tempfile
+import threading
+import weakref
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.constants import ExtractionQuality
+from src.config.data_models import ExtractionResult
+from src import utils
+from src.utils import ConfigManager, ExtractionLogger, ResultExporter
+
+
+class TestConfigManager(unittest.TestCase):
+    """Test load_config với cache parse dùng chung"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp_dir.name, 'app.json'), 'w', encoding='utf-8') as f:
+            json.dump({'timeout': 30, 'retry': {'max': 3}, 'hosts': ['a']}, f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_mutation_does_not_leak_between_managers(self):
+        """Sửa config của một ConfigManager không đổi config của manager khác"""
+        first = ConfigManager(self.tmp_dir.name).load_config('app')
+        first['timeout'] = 1
+        first['retry']['max'] = 0
+        first['hosts'].append('b')
+
+        second = ConfigManager(self.tmp_dir.name).load_config('app')
+
+        self.assertEqual(second, {'timeout': 30, 'retry': {'max': 3}, 'hosts': ['a']})
+        self.assertIsNot(first, second)
+
+    def test_repeated_load_returns_fresh_copy(self):
+        """Hai lần load_config trên cùng manager trả về hai object độc lập"""
+        manager = ConfigManager(self.tmp_dir.name)
+        first = manager.load_config('app')
+        first['retry']['max'] = 0
+
+        self.assertEqual(manager.load_config('app')['retry'], {'max': 3})
+
+    def test_missing_file_returns_empty_dict(self):
+        """File không tồn tại trả về {}"""
+        self.assertEqual(ConfigManager(self.tmp_dir.name).load_config('missing'), {})
+
+
+class TestConvertToSerializable(unittest.TestCase):
+    """Test ResultExporter._convert_to_serializable"""
+
+    def test_enum_serializes_to_value(self):
+        """Enum xuất ra .value thay vì {}"""
+        converted = ResultExporter._convert_to_serializable(
+            {'levels': [ExtractionQuality.GOOD, (ExtractionQuality.FAILED,)]}
+        )
+
+        self.assertEqual(converted, {'levels': ['good', ['failed']]})
+
+    def test_extraction_result_quality_level(self):
+        """quality_level của ExtractionResult được giữ trong kết quả export"""
+        result = ExtractionResult(
+            field_name='ngan_hang', extracted_value='BIDV', confidence_score=0.9,
+            quality_level=ExtractionQuality.EXCELLENT, extraction_method='css_selector'
+        )
+
+        converted = ResultExporter._convert_to_serializable(result)
+
+        self.assertEqual(converted['quality_level'], 'excellent')
+        self.assertEqual(
+            list(converted),
+            ['field_name', 'extracted_value', 'confidence_score', 'quality_level', 'extraction_method',
+             'fallback_used', 'validation_errors', 'normalization_applied', 'extraction_timestamp']
+        )
+        json.dumps(converted)
+
+    def test_order_and_nesting(self):
+        """Giữ thứ tự key/phần tử và không vượt giới hạn đệ quy với dữ liệu lồng sâu"""
+        converted = ResultExporter._convert_to_serializable({'b': 1, 'a': (3, 2)})
+        self.assertEqual(list(converted.items()), [('b', 1), ('a', [3, 2])])
+
+        deep = leaf = []
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = []
+            leaf.append(child)
+            leaf = child
+        self.assertIsInstance(ResultExporter._convert_to_serializable(deep), list)
+
+    def test_circular_reference(self):
+        """Vòng tham chiếu được thay bằng chuỗi đánh dấu"""
+        class Node:
+            pass
+        node = Node()
+        node.value = 1
+        node.self_ref = node
+
+        self.assertEqual(
+            ResultExporter._convert_to_serializable(node),
+            {'value': 1, 'self_ref': '<circular reference to Node>'}
+        )
+
+
+class TestExtractionLogger(unittest.TestCase):
+    """Test listener dùng chung theo file log"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmp_dir.name, 'extract.log')
+        self.shared_logger = logging.getLogger('VSS_ExtractorLogger')
+        self.shared_logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        utils._stop_log_listener(os.path.abspath(self.log_file))
+        self.shared_logger.setLevel(logging.NOTSET)
+        self.tmp_dir.cleanup()
+
+    def test_instances_share_one_listener(self):
+        """Nhiều instance cùng file: 1 handler trên logger, 1 listener thread"""
+        handlers_before = len(self.shared_logger.handlers)
+        threads_before = threading.active_count()
+
+        loggers = [ExtractionLogger(self.log_file) for _ in range(5)]
+
+        self.assertEqual(len(self.shared_logger.handlers), handlers_before + 1)
+        self.assertEqual(threading.active_count(), threads_before + 1)
+
+        loggers[0].log_extraction_start(3, 100)
+        loggers[-1].log_extraction_start(4, 200)
+        loggers[0].close()
+        with open(self.log_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Starting extraction for 3 fields', lines[0])
+        self.assertEqual(len(self.shared_logger.handlers), handlers_before)
+
+    def test_instance_is_not_pinned(self):
+        """Instance không bị giữ lại tới khi thoát (không đăng ký atexit theo instance)"""
+        ref = weakref.ref(ExtractionLogger(self.log_file))
+        gc.collect()
+
+        self.assertIsNone(ref())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test cases cho revalidate cache (ETag/304) và sync API của VSSApiClient
+"""
+
+import unittest
+import logging
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.config_manager import ApiConfig
+from src.vss_api_client import VSSApiClient
+
+ETAG = '"v1"'
+
+
+class TestConditionalRevalidation(unittest.IsolatedAsyncioTestCase):
+    """Test entry hết hạn được revalidate bằng If-None-Match"""
+
+    async def asyncSetUp(self):
+        logging.disable(logging.CRITICAL)
+        self.hits = {'200': 0, '304': 0}
+        # Gọi trong handler khi nhận conditional request (mô phỏng cache bị xoá giữa chừng)
+        self.on_conditional = None
+
+        async def etag_handler(request):
+            if request.headers.get('If-None-Match') == ETAG:
+                self.hits['304'] += 1
+                if self.on_conditional is not None:
+                    self.on_conditional()
+                return web.Response(status=304)
+            self.hits['200'] += 1
+            return web.json_response({'v': 1}, headers={'ETag': ETAG})
+
+        app = web.Application()
+        app.router.add_get('/etag', etag_handler)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.client = VSSApiClient(ApiConfig(base_url=str(self.server.make_url(''))))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+        logging.disable(logging.NOTSET)
+
+    async def _prime_expired_entry(self):
+        self.assertEqual(await self.client.get_async('/etag'), {'v': 1})
+        # TTL 0: entry vừa cache đã hết hạn ở lần gọi sau
+        self.client._cache_ttl = 0
+
+    async def test_not_modified_reuses_cached_data(self):
+        """304 trả về dữ liệu cũ và tính là request thành công"""
+        await self._prime_expired_entry()
+
+        self.assertEqual(await self.client.get_async('/etag'), {'v': 1})
+        self.assertEqual(self.hits, {'200': 1, '304': 1})
+        self.assertEqual(self.client.get_stats()['failed_requests'], 0)
+
+    async def test_not_modified_after_entry_cleared_in_flight(self):
+        """304 vẫn dùng entry đã gửi validator dù cache bị clear_cache() trong lúc chờ"""
+        await self._prime_expired_entry()
+        self.on_conditional = self.client.clear_cache
+
+        self.assertEqual(await self.client.get_async('/etag'), {'v': 1})
+        self.assertEqual(self.hits, {'200': 1, '304': 1})
+        self.assertEqual(self.client.get_stats()['failed_requests'], 0)
+        self.assertEqual(len(self.client._response_cache), 1)
+
+
+class _ContentTypeHandler(BaseHTTPRequestHandler):
+    """GET /<path> trả về body và Content-Type cố định theo path"""
+
+    RESPONSES = {
+        '/plain-json': ('text/plain; charset=utf-8', b'{"a": 1}'),
+        '/html': ('text/html', '<html><body>Bảo trì</body></html>'.encode('utf-8')),
+        '/json': ('application/json', b'{"b": 2}'),
+    }
+
+    def do_GET(self):
+        content_type, body = self.RESPONSES[self.path]
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSyncJsonParsing(unittest.TestCase):
+    """Sync get() parse body JSON bất kể Content-Type, như requests.Response.json()"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _ContentTypeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        base_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        self.client = VSSApiClient(ApiConfig(base_url=base_url))
+
+    def tearDown(self):
+        self.client.close_sync()
+        self.server.shutdown()
+        self.server.server_close()
+        logging.disable(logging.NOTSET)
+
+    def test_json_body_with_text_content_type(self):
+        """Body JSON với Content-Type text/plain vẫn được parse"""
+        with self.client:
+            self.assertEqual(self.client.get('/plain-json'), {'a': 1})
+            self.assertEqual(self.client.get('/json'), {'b': 2})
+        self.assertEqual(self.client.get_stats()['failed_requests'], 0)
+
+    def test_non_json_body_returns_none(self):
+        """Body không phải JSON trả về None và tính là request lỗi"""
+        with self.client:
+            self.assertIsNone(self.client.get('/html'))
+        self.assertEqual(self.client.get_stats()['failed_requests'], 1)
+
+    def test_close_sync_stops_loop_thread(self):
+        """Thoát `with` dừng event loop thread của sync API"""
+        with self.client:
+            self.client.get('/json')
+            loop_thread = self.client._loop_thread
+        self.assertFalse(loop_thread.is_alive())
+        self.assertIsNone(self.client._loop)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test cases cho soup dùng chung (parse_html) và quality level của VSS_EnhancedExtractor
+"""
+
+import unittest
+import logging
+import sys
+import os
+from unittest.mock import patch
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from src.config.constants import ExtractionQuality
+from src.extractors import base_extractor
+from src.vss_enhanced_extractor_v2 import VSS_EnhancedExtractor
+
+# <select> nằm ngay dưới <body>, không bọc trong table/div
+TOP_LEVEL_SELECT_HTML = """
+<html><body>
+<select name="bank_code">
+<option value="TCB">Techcombank</option>
+<option value="BIDV" selected>BIDV</option>
+</select>
+</body></html>
+"""
+
+
+class TestSharedSoup(unittest.TestCase):
+    """Test soup từ parse_html() dùng chung cho mọi strategy"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.CRITICAL)
+        cls.extractor = VSS_EnhancedExtractor()
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_top_level_select_uses_css_selector(self):
+        """Ngân hàng trong <select> top-level được lấy bằng CSS selector"""
+        result = self.extractor.extract_enhanced_fields(TOP_LEVEL_SELECT_HTML)
+        bank = result['extracted_fields']['ngan_hang']
+
+        self.assertEqual(bank.extraction_method, 'css_selector')
+        self.assertEqual(bank.extracted_value.code, 'BID')
+        self.assertAlmostEqual(bank.confidence_score, 0.9)
+        self.assertEqual(bank.quality_level, ExtractionQuality.EXCELLENT)
+
+    def test_css_selectors_match_full_tree(self):
+        """CSS selector trên tree từ parse_html() cho kết quả như trên toàn bộ document"""
+        full_soup = BeautifulSoup(TOP_LEVEL_SELECT_HTML, 'lxml')
+        soup = self.extractor.parse_html(TOP_LEVEL_SELECT_HTML)
+
+        for field_name, pattern in self.extractor.field_patterns.items():
+            self.assertEqual(
+                self.extractor.extract_by_css_selectors(soup, field_name, pattern.css_selectors),
+                self.extractor.extract_by_css_selectors(full_soup, field_name, pattern.css_selectors),
+                field_name
+            )
+
+    def test_context_search_outside_common_tags(self):
+        """Text trong <font>/<center> vẫn được context search tìm thấy"""
+        cases = [
+            ('<html><body><font>Điện thoại</font> <font>0912345678</font></body></html>',
+             'so_dien_thoai', '0912345678'),
+            ('<html><body><center>Ngân hàng</center><center>BIDV</center></body></html>',
+             'ngan_hang', 'BIDV'),
+        ]
+        for html, field_name, expected in cases:
+            with self.subTest(field_name=field_name):
+                soup = self.extractor.parse_html(html)
+                keywords = self.extractor.field_patterns[field_name].context_keywords
+                self.assertEqual(self.extractor.extract_by_context(soup, field_name, keywords), expected)
+
+    def test_single_parse_per_page(self):
+        """extract_enhanced_fields chỉ dựng một BeautifulSoup cho mỗi trang"""
+        with patch.object(base_extractor, 'BeautifulSoup', wraps=BeautifulSoup) as soup_class:
+            self.extractor.extract_enhanced_fields(TOP_LEVEL_SELECT_HTML)
+        self.assertEqual(soup_class.call_count, 1)
+
+
+class TestQualityLevel(unittest.TestCase):
+    """Test determine_quality_level theo ngưỡng confidence"""
+
+    def test_thresholds(self):
+        """Mỗi ngưỡng >= thì lên mức, 0 và số âm là FAILED"""
+        extractor = VSS_EnhancedExtractor()
+        cases = [
+            (-0.1, ExtractionQuality.FAILED), (0.0, ExtractionQuality.FAILED),
+            (1e-9, ExtractionQuality.POOR), (0.5, ExtractionQuality.MODERATE),
+            (0.7, ExtractionQuality.GOOD), (0.9, ExtractionQuality.EXCELLENT),
+            (1.0, ExtractionQuality.EXCELLENT),
+        ]
+        for confidence, expected in cases:
+            with self.subTest(confidence=confidence):
+                self.assertEqual(extractor.determine_quality_level(confidence), expected)
+
+    def test_nan_is_failed(self):
+        """Confidence NaN là FAILED thay vì EXCELLENT"""
+        extractor = VSS_EnhancedExtractor()
+        self.assertEqual(extractor.determine_quality_level(float('nan')), ExtractionQuality.FAILED)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)